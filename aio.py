@@ -0,0 +1,276 @@
+import time
+import asyncio
+import functools
+import logging
+from urllib.parse import urljoin
+
+import aiohttp
+import requests
+
+from pycf.auth import access_token_expired, access_token_request, refresh_token_request
+from pycf.cloudfoundry import CloudFoundry
+from pycf.requests_api_wrapper import codec
+from pycf.requests_api_wrapper.base import ApiError, next_page_url, page_number, page_url, total_pages
+from pycf.requests_api_wrapper.retry import RetryPolicy
+
+logger = logging.getLogger(__name__)
+
+TRANSIENT_ERRORS = (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+
+
+class AsyncResponse(object):
+    # the parts of a requests.Response that callers of the synchronous client rely on
+    def __init__(self, url, status_code, headers, content):
+        self.url = url
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+        self.retries = 0
+
+    def json(self):
+        return codec.decode_response(self)
+
+
+class AsyncCloudFoundryAuth(object):
+    def __init__(self, username=None, password=None, auth_endpoint=None):
+        if not username or not password or not auth_endpoint:
+            raise Exception("Unable to authenticate to Cloud Foundry (missing credentials)")
+
+        self.username = username
+        self.password = password
+        self.access_token = None
+        self.refresh_token = None
+        self.access_token_expiry = None
+        self.auth_endpoint = auth_endpoint
+        self._lock = None
+
+    @classmethod
+    def from_auth(cls, auth):
+        # reuses the credentials and any live token of a synchronous CloudFoundryAuth
+        async_auth = cls(auth.username, auth.password, auth.auth_endpoint)
+        async_auth.access_token = auth.access_token
+        async_auth.refresh_token = auth.refresh_token
+        async_auth.access_token_expiry = auth.access_token_expiry
+
+        return async_auth
+
+    async def authorization(self, session):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:  # one token request at a time, however many calls are waiting on it
+            if self.access_token is None:
+                await self._token(session, access_token_request(self.username, self.password), "Couldn't get new access token!")
+
+            elif access_token_expired(self.access_token_expiry):
+                await self._token(session, refresh_token_request(self.refresh_token.split(' ')[-1]), "Couldn't refresh access token!")
+
+        return self.access_token
+
+    async def _token(self, session, token_request, error_message):
+        auth_headers, auth_data = token_request
+
+        async with session.post(urljoin(self.auth_endpoint, "oauth/token"), headers=auth_headers, data=auth_data) as resp:
+            content = await resp.read()
+
+            if resp.status not in [200, 201]:
+                raise Exception("{} -- {}".format(error_message, content))
+
+        token_info = codec.loads(content)
+        self.access_token = "{} {}".format(token_info['token_type'], token_info['access_token'])
+        self.refresh_token = token_info['refresh_token']
+        self.access_token_expiry = int(time.time()) + int(token_info['expires_in'])
+
+
+class AsyncApiObjectWrapper(object):
+    def __init__(self, client, api_name, endpoints):
+        self.client = client
+        self.api_name = api_name
+        self.endpoints = endpoints
+
+    def __getattr__(self, attribute):
+        if attribute in self.__dict__.get('endpoints', ()):
+            method = functools.partial(self._call_endpoint, attribute)
+            self.__dict__[attribute] = method
+            return method
+
+        else:
+            raise AttributeError("No such method '{}'!".format(attribute))
+
+    async def _call_endpoint(self, attribute, *args, **kwargs):
+        endpoint = self.endpoints[attribute]
+        kwargs = endpoint.bind(args, kwargs)
+
+        return await self.client._send(endpoint.http_method, endpoint.path(self.client.api_domain, args), endpoint.expected_status, **kwargs)
+
+    async def iter(self, *args, **kwargs):
+        # async counterpart of ApiObjectWrapper.iter()
+        method = kwargs.pop('method', 'list')
+        prefetch = kwargs.pop('prefetch', False)
+        record = kwargs.pop('record', None)
+        headers = self.endpoints[method].request_headers(kwargs.get('headers'))
+
+        page = (await self._call_endpoint(method, *args, **kwargs)).json()
+        pending = None
+
+        try:
+            while True:
+                next_url = next_page_url(self.client.api_domain, page)
+
+                if next_url and prefetch:
+                    pending = asyncio.ensure_future(self._get_page(next_url, headers))
+
+                for resource in page['resources']:
+                    yield record(resource) if record else resource
+
+                if not next_url:
+                    break
+
+                page = await pending if pending else await self._get_page(next_url, headers)
+                pending = None
+
+        finally:
+            if pending:
+                pending.cancel()
+
+    async def list_all(self, *args, **kwargs):
+        # fetches every remaining page at once; concurrency is bounded by the client's connection limits
+        method = kwargs.pop('method', 'list')
+        record = kwargs.pop('record', None)
+        headers = self.endpoints[method].request_headers(kwargs.get('headers'))
+
+        page = (await self._call_endpoint(method, *args, **kwargs)).json()
+        resources = page['resources']
+        next_url = next_page_url(self.client.api_domain, page)
+
+        if next_url and total_pages(page) > 1:
+            pages = await asyncio.gather(*[
+                self._get_page(page_url(next_url, n), headers) for n in range(page_number(next_url), total_pages(page) + 1)
+            ])
+
+            resources = list(resources)  # the first page's list is memoized on its response
+
+            for p in pages:
+                resources.extend(p['resources'])
+
+        if record:
+            return [record(resource) for resource in resources]
+
+        return resources
+
+    async def _get_page(self, url, headers=None):
+        response = await self.client._send(requests.get, url, headers=headers)
+
+        return response.json()
+
+
+class AsyncCloudFoundry(object):
+    endpoints = CloudFoundry.endpoints
+
+    def __init__(self, api_domain=None, auth=None, username=None, password=None, limit=100, limit_per_host=50, timeout=60, retry_policy=None):
+        if auth is not None and not isinstance(auth, AsyncCloudFoundryAuth):
+            auth = AsyncCloudFoundryAuth.from_auth(auth)
+
+        self.api_domain = api_domain
+        self.auth = auth
+        self.username = username
+        self.password = password
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self.retry_policy = retry_policy or RetryPolicy(transient_errors=TRANSIENT_ERRORS)
+        self.session = None
+
+    def __getattr__(self, item):
+        if item in self.endpoints:
+            api_object = AsyncApiObjectWrapper(self, item, self.endpoints[item])
+            self.__dict__[item] = api_object
+            return api_object
+
+        else:
+            raise AttributeError("No such attribute '{}'!".format(item))
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    def _session(self):
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.limit, limit_per_host=self.limit_per_host),
+                timeout=aiohttp.ClientTimeout(total=self.timeout)
+            )
+
+        return self.session
+
+    async def _authorization(self):
+        if self.auth is None and self.username and self.password:
+            async with self._session().get(urljoin(self.api_domain, "v2/info")) as resp:
+                auth_endpoint = codec.loads(await resp.read())['authorization_endpoint']
+
+            if self.auth is None:  # another call may have got here first while we were waiting
+                self.auth = AsyncCloudFoundryAuth(self.username, self.password, auth_endpoint)
+
+        if self.auth is None:
+            return None
+
+        return await self.auth.authorization(self._session())
+
+    async def _send(self, http_method, path, expected_status=None, headers=None, params=None, data=None):
+        if type(data) is dict:
+            data = codec.dumps(data)
+
+        elif data is not None and type(data) is not str:
+            raise ValueError("Request data must be either a string or a dictionary!")
+
+        if params:
+            # aiohttp only accepts string query values; lists become repeated parameters, as requests sends them
+            params = [(k, str(item)) for k, v in params.items() for item in (v if isinstance(v, (list, tuple)) else [v])]
+
+        method = http_method.__name__.upper()
+        policy = self.retry_policy
+        attempt = 0
+
+        while True:
+            response = None
+            request_headers = {"Content-Type": "application/json"}
+            request_headers.update(headers or {})
+            authorization = await self._authorization()
+
+            if authorization:
+                request_headers["Authorization"] = authorization
+
+            try:
+                async with self._session().request(method, path, headers=request_headers, params=params, data=data) as resp:
+                    response = AsyncResponse(str(resp.url), resp.status, resp.headers, await resp.read())
+
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if not policy.should_retry(http_method, attempt, exception=e):
+                    policy.record(attempt, failed=True)
+                    raise
+
+            else:
+                if policy.is_success(response):
+                    if not policy.is_expected(response, expected_status):
+                        logger.warning("{} {} returned {} (expected {})".format(method, path, response.status_code, ', '.join(map(str, sorted(expected_status)))))
+
+                    policy.record(attempt)
+                    response.retries = attempt
+                    return response
+
+                if not policy.should_retry(http_method, attempt, response=response):
+                    policy.record(attempt, failed=True)
+                    raise ApiError(response)
+
+            delay = policy.backoff(attempt, response)
+            logger.info("retrying {} {} in {:.2f}s (attempt {})".format(method, path, delay, attempt + 1))
+            await asyncio.sleep(delay)
+            attempt += 1
+
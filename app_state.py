@@ -0,0 +1,211 @@
+import time
+import threading
+from collections import OrderedDict, defaultdict
+
+from pycf.attribution import ACTEE_BATCH_SIZE
+from pycf.records import App, Event
+from pycf.utils import RESULTS_PER_PAGE, latest_event_timestamp, write_stdout
+from pycf.requests_api_wrapper.base import ApiError
+
+
+# app usage event states that count as a transition; BUILDPACK_SET and the task states don't
+USAGE_TRANSITIONS = {
+    'STARTED': 'start',
+    'STOPPED': 'stop'
+}
+
+# audit events for what usage events don't report: apps created or deleted without running, renames and scaling
+APP_EVENT_TYPES = ('app.crash', 'audit.app.create', 'audit.app.update', 'audit.app.delete-request')
+
+ORG_RELIST_INTERVAL = 1800  # seconds; an org's apps are listed afresh this often, in case an event was missed
+
+
+class AppStateTracker(object):
+    # keeps the apps of the orgs it has been asked about in memory and advances them from the app_usage_events
+    # after_guid cursor and the app audit events, so a sync only re-fetches the apps that changed since the last
+    # one; each org is still listed afresh every relist_interval seconds. Given space_guids, only the apps in those
+    # spaces are listed and followed (a sharded exporter's slice of the org). Also counts starts, stops (from usage
+    # events) and crashes (from app.crash audit events) per app.
+    # app_usage_events needs admin or global auditor access; without it every sync re-lists the org's apps
+    def __init__(self, workers=8, relist_interval=ORG_RELIST_INTERVAL):
+        self.workers = workers
+        self.relist_interval = relist_interval
+        self.apps = OrderedDict()  # guid -> App
+        self.transitions = defaultdict(int)  # (app guid, transition) -> count since the tracker started
+        self.usage_cursor = None
+        self.event_cursor = None
+        self.incremental = True
+        self._org_of = {}  # app guid -> org guid
+        self._listed_at = {}  # org guid -> when its apps were last listed
+        self._spaces = {}  # org guid -> the spaces its apps were listed for, or None for all of them
+        self._seen_events = set()  # guids of the audit events at event_cursor, which the next query returns again
+        self._lock = threading.Lock()
+        self._advance_lock = threading.Lock()  # one pass over the event feeds at a time
+
+    def sync(self, cf, org_guid, space_guids=None, advance=True):
+        # advance=False when the caller has already called advance() for this collection, e.g. once for all its orgs
+        spaces = frozenset(space_guids) if space_guids is not None else None
+
+        if advance:
+            self.advance(cf)
+
+        with self._lock:
+            listed_at = self._listed_at.get(org_guid)
+            relist = listed_at is None or not self.incremental or time.time() - listed_at > self.relist_interval or self._spaces[org_guid] != spaces
+
+        if relist:
+            self._load_org(cf, org_guid, spaces)
+
+        with self._lock:
+            return [app for guid, app in self.apps.items() if self._org_of[guid] == org_guid and self._follows(org_guid, app.space_guid)]
+
+    def advance(self, cf):
+        # reads the foundation-wide usage and audit event feeds once and applies them to every org being followed.
+        # the lock on the tracked apps is only taken to apply what was read, never across a request
+        with self._advance_lock:
+            if self.incremental and self.usage_cursor is None:
+                self._start(cf)
+
+            if self.incremental and self._listed_at:
+                self._advance(cf)
+
+        return self
+
+    def _start(self, cf):
+        try:
+            resources = cf.app_usage_event.list(params={'order-direction': 'desc', 'results-per-page': 1}).json()['resources']
+
+        except ApiError as e:
+            write_stdout("WARNING: can't read app usage events (status code: {}) -- re-listing apps on every scrape".format(e.status_code))
+            self.incremental = False
+            return
+
+        # usage events are ordered oldest first, so with no events at all there's nothing to start after yet
+        self.usage_cursor = resources[0]['metadata']['guid'] if resources else ''
+        # the event cursor starts at the newest app event, by the Cloud Controller's clock rather than ours; the events
+        # at it already happened, so they're noted as seen rather than counted by the first advance
+        self.event_cursor = latest_event_timestamp(cf, 'type IN {}'.format(','.join(APP_EVENT_TYPES)))
+        self.event_cursor, self._seen_events = self._read_events(cf, {})[2:]
+
+    def _load_org(self, cf, org_guid, spaces=None):
+        listed_at = time.time()
+
+        if spaces is None:
+            apps = list(cf.apps.iter(params={'q': 'organization_guid IN {}'.format(org_guid)}, record=App, prefetch=True))
+
+        else:  # a few spaces per query, so a large slice of the org doesn't overflow the url
+            apps = []
+            space_guids = sorted(spaces)
+
+            for i in range(0, len(space_guids), ACTEE_BATCH_SIZE):
+                batch = space_guids[i:i + ACTEE_BATCH_SIZE]
+                apps.extend(cf.apps.iter(params={'q': 'space_guid IN {}'.format(','.join(batch))}, record=App, prefetch=True))
+
+        listed = set(app.guid for app in apps)
+
+        with self._lock:
+            for guid in [guid for guid, org in self._org_of.items() if org == org_guid and guid not in listed]:
+                self._remove(guid)
+
+            for app in apps:  # apps still there keep their transition counts
+                self.apps[app.guid] = app
+                self._org_of[app.guid] = org_guid
+
+            self._listed_at[org_guid] = listed_at
+            self._spaces[org_guid] = spaces
+
+    def _follows(self, org_guid, space_guid):
+        return org_guid in self._listed_at and (self._spaces[org_guid] is None or space_guid in self._spaces[org_guid])
+
+    def _advance(self, cf):
+        # nothing is applied until every feed has been read and the changed apps fetched; if a read fails the next
+        # advance starts from the same cursors, so no transition is counted twice
+        changed = {}
+        transitions = defaultdict(int)
+        usage_cursor = self.usage_cursor
+        params = {'results-per-page': RESULTS_PER_PAGE}
+
+        if usage_cursor:
+            params['after_guid'] = usage_cursor
+
+        for usage in cf.app_usage_event.iter(params=params):
+            usage_cursor = usage['metadata']['guid']
+            entity = usage['entity']
+
+            if not self._follows(entity['org_guid'], entity['space_guid']):
+                continue
+
+            changed[entity['app_guid']] = entity['org_guid']
+            transition = USAGE_TRANSITIONS.get(entity['state'])
+
+            if transition:
+                transitions[(entity['app_guid'], transition)] += 1
+
+        deleted, crashed, event_cursor, seen_events = self._read_events(cf, changed)
+
+        for guid in deleted:
+            changed.pop(guid, None)
+
+        guids = sorted(changed)
+        results = cf.apps.map('get', guids, max_workers=self.workers)
+
+        with self._lock:
+            self.usage_cursor, self.event_cursor, self._seen_events = usage_cursor, event_cursor, seen_events
+
+            for key, count in transitions.items():
+                self.transitions[key] += count
+
+            for guid in crashed:
+                if guid in self.apps:
+                    self.transitions[(guid, 'crash')] += 1
+
+            for guid in deleted:
+                self._remove(guid)
+
+            for guid, result in zip(guids, results):
+                if result.ok:
+                    self.apps[guid] = App(result.response.json())
+                    self._org_of[guid] = changed[guid]
+
+                elif isinstance(result.error, ApiError) and result.error.status_code == 404:
+                    self._remove(guid)
+
+                else:
+                    write_stdout("WARNING: couldn't refresh app {}: {} raised! Message: {}".format(guid, type(result.error).__name__, result.error))
+
+    def _read_events(self, cf, changed):
+        # adds the apps created or updated in a tracked org to changed; returns the deleted apps, the apps that
+        # crashed (once per crash) and the event cursor with the guids of the events at it
+        params = {'q': ['type IN {}'.format(','.join(APP_EVENT_TYPES)), 'timestamp>={}'.format(self.event_cursor)], 'results-per-page': RESULTS_PER_PAGE}
+        cursor, seen = self.event_cursor, self._seen_events
+        deleted = set()
+        crashed = []
+
+        for event in cf.events.iter(params=params, record=Event):
+            if event.guid in self._seen_events:
+                continue
+
+            if event.type == 'app.crash':
+                crashed.append(event.actee)
+
+            elif event.type == 'audit.app.delete-request':
+                deleted.add(event.actee)
+
+            elif self._follows(event.organization_guid, event.space_guid):
+                changed[event.actee] = event.organization_guid
+                deleted.discard(event.actee)
+
+            if event.timestamp > cursor:
+                cursor, seen = event.timestamp, set()
+
+            if event.timestamp == cursor:
+                seen.add(event.guid)
+
+        return deleted, crashed, cursor, seen
+
+    def _remove(self, guid):
+        self.apps.pop(guid, None)
+        self._org_of.pop(guid, None)
+
+        for transition in ('start', 'stop', 'crash'):
+            self.transitions.pop((guid, transition), None)
@@ -0,0 +1,91 @@
+import threading
+
+from pycf.records import Event
+from pycf.utils import RESULTS_PER_PAGE, latest_event_timestamp
+
+
+ATTRIBUTION_EVENT_TYPES = (
+    'audit.app.create',
+    'audit.app.update',
+    'audit.service_instance.create',
+    'audit.service_instance.update'
+)
+
+# actees per 'actee IN ...' query; keeps the query string well under typical URL length limits
+ACTEE_BATCH_SIZE = 50
+
+
+class ActorIndex(object):
+    # the latest actor_name per (actee, event type), built from a few bulk event queries and kept up to date
+    # between scrapes by only asking for events newer than the last pass
+    def __init__(self, event_types=ATTRIBUTION_EVENT_TYPES, batch_size=ACTEE_BATCH_SIZE):
+        self.event_types = tuple(event_types)
+        self.batch_size = batch_size
+        self.cursor = None
+        self._latest = {}  # (actee, type) -> (timestamp, actor_name)
+        self._actees = set()
+        self._lock = threading.Lock()
+        self._advance_lock = threading.Lock()  # one pass over the event feed at a time
+
+    def update(self, cf, actees, advance=True):
+        # backfills the actees not seen before; advance=False when the caller has already called advance() for this
+        # collection, e.g. once for all its orgs
+        if advance:
+            self.advance(cf)
+
+        with self._lock:
+            new_actees = sorted(set(actees) - self._actees)
+
+        events = []
+
+        for i in range(0, len(new_actees), self.batch_size):
+            batch = new_actees[i:i + self.batch_size]
+            events.extend(cf.events.iter(params={'q': [self._type_filter(), 'actee IN {}'.format(','.join(batch))], 'results-per-page': RESULTS_PER_PAGE}, record=Event))
+
+        with self._lock:
+            self._index(events)
+            self._actees.update(new_actees)
+
+        return self
+
+    def advance(self, cf):
+        # one incremental pass over the foundation-wide event feed; the lock on the index is only taken to apply it
+        with self._advance_lock:
+            if self.cursor is None:
+                self.cursor = latest_event_timestamp(cf, self._type_filter())  # the Cloud Controller's clock, not ours
+                return self
+
+            cursor, events = self._newer_events(cf)
+
+            with self._lock:
+                self._index(e for e in events if e.actee in self._actees)  # the feed has resources we don't report on
+                self.cursor = cursor
+
+        return self
+
+    def actor(self, actee, event_type, default="NaN"):
+        latest = self._latest.get((actee, event_type))
+
+        return latest[1] if latest else default
+
+    def _type_filter(self):
+        return 'type IN {}'.format(','.join(self.event_types))
+
+    def _newer_events(self, cf):
+        # the events since the cursor and the latest timestamp among them; timestamp>= returns the events at the
+        # cursor again, which _index() takes in harmlessly
+        cursor, events = self.cursor, []
+
+        for event in cf.events.iter(params={'q': [self._type_filter(), 'timestamp>={}'.format(self.cursor)], 'results-per-page': RESULTS_PER_PAGE}, record=Event):
+            cursor = max(cursor, event.timestamp)
+            events.append(event)
+
+        return cursor, events
+
+    def _index(self, events):
+        for event in events:
+            key = (event.actee, event.type)
+            latest = self._latest.get(key)
+
+            if latest is None or event.timestamp >= latest[0]:
+                self._latest[key] = (event.timestamp, event.actor_name)
@@ -1,16 +1,22 @@
 import time
-import json
 import base64
+import threading
 import requests
 
-from urllib import urlencode
-from urlparse import urljoin
+try:
+    from urllib import urlencode
+    from urlparse import urljoin
 
+except ImportError:  # python 3, for pycf.aio
+    from urllib.parse import urlencode, urljoin
 
-BASIC_AUTH = "Basic {}".format(base64.b64encode("cf:"))
+from pycf.requests_api_wrapper import codec
 
 
-def init_access_token(username, password, endpoint):
+BASIC_AUTH = "Basic {}".format(base64.b64encode(b"cf:").decode('ascii'))
+
+
+def access_token_request(username, password):
     auth_headers = {
         "Authorization": BASIC_AUTH,
         "Content-Type": "application/x-www-form-urlencoded",
@@ -25,13 +31,33 @@ def init_access_token(username, password, endpoint):
         "scope": ""
     }
 
-    resp = requests.post(
+    return auth_headers, urlencode(auth_data)
+
+
+def refresh_token_request(refresh_token):
+    auth_headers = {
+        "Content-Type": "application/x-www-form-urlencoded",
+        "Accept": "application/json"
+    }
+
+    auth_data = {
+        "grant_type": "refresh_token",
+        "refresh_token": refresh_token
+    }
+
+    return auth_headers, urlencode(auth_data)
+
+
+def init_access_token(username, password, endpoint, session=None):
+    auth_headers, auth_data = access_token_request(username, password)
+
+    resp = (session or requests).post(
         urljoin(
             endpoint,
             "oauth/token"
         ),
         headers=auth_headers,
-        data=urlencode(auth_data)
+        data=auth_data
     )
 
     if resp.status_code not in [200, 201]:
@@ -40,24 +66,16 @@ def init_access_token(username, password, endpoint):
     return resp
 
 
-def refresh_access_token(refresh_token, endpoint):
-    auth_headers = {
-        "Content-Type": "application/x-www-form-urlencoded",
-        "Accept": "application/json"
-    }
-
-    auth_data = {
-        "grant_type": "refresh_token",
-        "refresh_token": refresh_token
-    }
+def refresh_access_token(refresh_token, endpoint, session=None):
+    auth_headers, auth_data = refresh_token_request(refresh_token)
 
-    resp = requests.post(
+    resp = (session or requests).post(
         urljoin(
             endpoint,
             "oauth/token"
         ),
         headers=auth_headers,
-        data=urlencode(auth_data)
+        data=auth_data
     )
 
     if resp.status_code not in [200, 201]:
@@ -90,14 +108,14 @@ class CloudFoundryTokenFileAuth(requests.auth.AuthBase):
 
     def _load_token_info(self):
         with open(self.token_file_path) as f:
-            token_info = json.load(f)
+            token_info = codec.loads(f.read())
 
         self.access_token = "{} {}".format(token_info['token_type'], token_info['access_token'])
         self.refresh_token = token_info['refresh_token']
 
 
 class CloudFoundryAuth(requests.auth.AuthBase):
-    def __init__(self, username=None, password=None, auth_endpoint=None):
+    def __init__(self, username=None, password=None, auth_endpoint=None, session=None):
         if not username or not password or not auth_endpoint:
             raise Exception("Unable to authenticate to Cloud Foundry (missing credentials)")
 
@@ -108,37 +126,43 @@ class CloudFoundryAuth(requests.auth.AuthBase):
         self.refresh_token = None
         self.access_token_expiry = None
         self.auth_endpoint = auth_endpoint
+        self.session = session  # token requests go through it when set (e.g. the client's, for cassettes)
+        self._lock = threading.Lock()
         self.default_headers = {
             "Content-Type": "application/json"
         }
 
     def __call__(self, r):
         r.headers.update(self.default_headers)
-        if self.access_token is None:
-            self._init_access_token()
 
-        elif access_token_expired(self.access_token_expiry):
-            self._refresh_access_token()
+        with self._lock:  # one token request at a time, however many pooled requests are waiting on it
+            if self.access_token is None:
+                self._init_access_token()
 
-        r.headers["Authorization"] = self.access_token
+            elif access_token_expired(self.access_token_expiry):
+                self._refresh_access_token()
+
+            access_token = self.access_token
+
+        r.headers["Authorization"] = access_token
         return r
 
     def _init_access_token(self):
         try:
-            resp = init_access_token(self.username, self.password, self.auth_endpoint)
-            self.access_token = "{} {}".format(resp.json()['token_type'], resp.json()['access_token'])
-            self.refresh_token = "{} {}".format(resp.json()['token_type'], resp.json()['refresh_token'])
-            self.access_token_expiry = int(time.time()) + int(resp.json()['expires_in'])
+            token_info = codec.decode_response(init_access_token(self.username, self.password, self.auth_endpoint, self.session))
+            self.access_token = "{} {}".format(token_info['token_type'], token_info['access_token'])
+            self.refresh_token = "{} {}".format(token_info['token_type'], token_info['refresh_token'])
+            self.access_token_expiry = int(time.time()) + int(token_info['expires_in'])
 
         except Exception as e:
             raise Exception("There was a problem retrieving a new access token -- " + e.message)
 
     def _refresh_access_token(self):
         try:
-            resp = refresh_access_token(self.refresh_token, self.auth_endpoint)
-            self.access_token = "{} {}".format(resp.json()['token_type'], resp.json()['access_token'])
-            self.refresh_token = resp.json()['refresh_token']
-            self.access_token_expiry = int(time.time()) + int(resp.json()['expires_in'])
+            token_info = codec.decode_response(refresh_access_token(self.refresh_token, self.auth_endpoint, self.session))
+            self.access_token = "{} {}".format(token_info['token_type'], token_info['access_token'])
+            self.refresh_token = token_info['refresh_token']
+            self.access_token_expiry = int(time.time()) + int(token_info['expires_in'])
 
         except Exception as e:
             raise Exception("There was a problem refreshing the access token -- " + e.message)
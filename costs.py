@@ -0,0 +1,114 @@
+import time
+import threading
+from datetime import datetime
+from requests.exceptions import RequestException
+
+from pycf.records import ServicePlan
+from pycf.utils import RESULTS_PER_PAGE, write_stdout
+from pycf.requests_api_wrapper import codec
+from pycf.requests_api_wrapper.base import ApiError
+
+try:
+    import numpy
+
+except ImportError:
+    numpy = None
+
+
+PLAN_CATALOG_TTL = 3600  # seconds; plan prices hardly ever change
+
+NAN = float('nan')
+
+
+def plan_cost(plan):
+    # monthly USD price from the plan's extra blob, NaN for plans without one
+    try:
+        return float(codec.loads(plan.extra)['costs'][0]['amount']['usd'])
+
+    except (TypeError, ValueError, KeyError, IndexError):
+        return NAN
+
+
+def month_bounds(now):
+    # epoch seconds of the start of now's month and of the next one
+    start = datetime(now.year, now.month, 1)
+    end = datetime(now.year + 1, 1, 1) if now.month == 12 else datetime(now.year, now.month + 1, 1)
+    epoch = datetime(1970, 1, 1)
+
+    return (start - epoch).total_seconds(), (end - epoch).total_seconds()
+
+
+def prorated_costs(monthly_costs, created_at, now=None):
+    # the share of each monthly cost charged so far this month: an instance is charged from the later of
+    # its creation and the start of the month. created_at holds epoch seconds
+    now = now or datetime.utcnow()
+    month_start, month_end = month_bounds(now)
+    now = (now - datetime(1970, 1, 1)).total_seconds()
+    month_seconds = month_end - month_start
+
+    if numpy is not None:
+        charged = now - numpy.maximum(numpy.asarray(created_at, dtype=float), month_start)
+        return (numpy.asarray(monthly_costs, dtype=float) * charged / month_seconds).tolist()
+
+    return [cost * (now - max(created, month_start)) / month_seconds for cost, created in zip(monthly_costs, created_at)]
+
+
+class PlanCatalog(object):
+    # name and monthly cost of every service plan, listed once and kept across scrapes for ttl seconds.
+    # a plan that isn't in the listing (created since) is fetched on its own. None for a plan that can't be fetched:
+    # a 404 is remembered until the next listing; other errors (a 5xx, a connection error or a timeout) are
+    # retried on the next scrape
+    def __init__(self, ttl=PLAN_CATALOG_TTL, workers=8):
+        self.ttl = ttl
+        self.workers = workers
+        self.loaded_at = None
+        self._plans = {}  # plan guid -> (name, monthly cost), or None
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()  # one listing at a time; the orgs of a collection wait for the same one
+
+    def plans(self, cf, plan_guids):
+        if self._stale():
+            with self._load_lock:
+                if self._stale():  # unless another org listed them while we waited
+                    self._load(cf)
+
+        with self._lock:
+            missing = sorted(set(plan_guids) - set(self._plans))
+
+        fetched = {}
+
+        for guid, result in zip(missing, cf.service_plans.map('get', missing, max_workers=self.workers)):
+            if result.ok:
+                plan = ServicePlan(result.response.json())
+                fetched[guid] = (plan.name, plan_cost(plan))
+
+            elif isinstance(result.error, ApiError) and result.error.status_code == 404:
+                fetched[guid] = None
+
+            elif isinstance(result.error, (ApiError, RequestException)):
+                write_stdout("WARNING: couldn't get service plan {}: {} raised! Message: {}".format(guid, type(result.error).__name__, result.error))
+
+            else:
+                raise result.error
+
+        with self._lock:
+            self._plans.update(fetched)
+
+            return dict((guid, self._plans.get(guid)) for guid in plan_guids)
+
+    def _stale(self):
+        return self.loaded_at is None or time.time() - self.loaded_at > self.ttl
+
+    def _load(self, cf):
+        started = time.time()
+
+        try:
+            plans = list(cf.service_plans.iter(params={'results-per-page': RESULTS_PER_PAGE}, record=ServicePlan, prefetch=True))
+
+        except (ApiError, RequestException) as e:  # plans are then fetched one by one as instances need them
+            write_stdout("WARNING: couldn't list service plans: {} raised! Message: {}".format(type(e).__name__, e))
+            plans = []
+
+        with self._lock:
+            self._plans = dict((plan.guid, (plan.name, plan_cost(plan))) for plan in plans)
+            self.loaded_at = started
@@ -1,7 +1,6 @@
 from __future__ import unicode_literals
 
 import os
-import json
 import shutil
 import base64
 import requests
@@ -9,6 +8,7 @@ import subprocess
 from ruamel.yaml import YAML
 from tempfile import mkdtemp, NamedTemporaryFile
 from utils import write_stdout, gather_facts, push_apps
+from pycf.requests_api_wrapper import codec
 
 
 s = requests.Session()
@@ -280,16 +280,16 @@ def deploy_exporter(cf, event_data, cf_org=None, cf_space=None, cf_locality=None
     ]
 
     def idempotently_create(url, data):
-        response = s.get(url).json()
+        response = codec.decode_response(s.get(url))
         write_stdout("Received response: " + str(response))
         if 'items' in response.keys():
-            thing_found = filter(lambda x: True if x['metadata']['name'] == data['metadata']['name'] else False, s.get(url).json()['items'])
+            thing_found = filter(lambda x: True if x['metadata']['name'] == data['metadata']['name'] else False, response['items'])
 
         else:
             thing_found = []
 
         if len(thing_found) == 0:
-            response = s.post(url, headers={'Content-Type': 'application/json'}, data=json.dumps(data))
+            response = s.post(url, headers={'Content-Type': 'application/json'}, data=codec.dumps(data))
 
             if response.status_code not in [200, 201, 204]:
                 raise Exception("{} creation failed! (Status: {}, Message: {})".format(data['kind'], response.status_code, response.content))
@@ -372,12 +372,18 @@ def deploy_ssh_gateway(cf, event_data, cf_org=None, cf_space=None):
     shutil.rmtree(d)
 
     # create service keys if necessary
-    for name, guid in cf_service_instances_facts.iteritems():
-        service_keys = cf.service_instances.list_service_keys(guid).json()['resources']
-        if len(service_keys) < 1:
+    names = cf_service_instances_facts.keys()
+    service_keys = cf.service_instances.map('list_service_keys', [cf_service_instances_facts[name] for name in names])
+
+    for name, result in zip(names, service_keys):
+        if not result.ok:
+            write_stdout("WARNING: couldn't list service keys for service '{}': {}".format(name, result.error))
+            continue
+
+        if len(result.response.json()['resources']) < 1:
             write_stdout("No service key found for service '{}'... creating one now!".format(cf_service_instances_facts[name]))
             d = {
-                'service_instance_guid': guid,
+                'service_instance_guid': cf_service_instances_facts[name],
                 'name': '{}-access'.format(name)
             }
             cf.service_keys.create(data=d)
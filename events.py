@@ -1,10 +1,9 @@
 from __future__ import unicode_literals
 
-import json
 import time
-import urllib
 from datetime import datetime, timedelta
-from pycf.utils import get_redis_db, write_stdout
+from pycf.utils import TIMESTAMP_FORMAT, get_redis_db, write_stdout
+from pycf.requests_api_wrapper import codec
 import pycf.event_callbacks as callbacks
 
 
@@ -16,45 +15,34 @@ CF_EVENT_TYPES = {
 }
 
 
-def params_from_query_string(q):
-    return {k: v for k, v in [param.split('=') for param in q.split('&')] if k != 'order-by'}
-
-
 def collection_loop(cf, event_types, dbs, interval, key_expire_seconds):
     write_stdout("Starting events collection for event types {}...".format(', '.join(event_types)))
     while True:
         timestamp = datetime.utcnow() - timedelta(seconds=int(key_expire_seconds))  # cutoff time for listing events
 
-        events_json = cf.events.list(
+        events = cf.events.iter(
             params={
-                'q': 'timestamp>{}'.format(datetime.strftime(timestamp, '%Y-%m-%dT%H:%M:%SZ'))
+                'q': 'timestamp>{}'.format(datetime.strftime(timestamp, TIMESTAMP_FORMAT))
             },
-        ).json()
-        events_resources = events_json['resources']
-
-        while events_json['next_url']:
-            params = params_from_query_string(
-                urllib.unquote(
-                    events_json['next_url']
-                ).split('?')[-1]
-            )
-            events_json = cf.events.list(params=params).json()
-            events_resources.extend(events_json['resources'])
-
-        write_stdout("Found {} total events!".format(str(len(events_resources))))
-        for e in events_resources:
+            prefetch=True
+        )
+
+        total_events = 0
+        for e in events:
+            total_events += 1
             write_stdout("Found event type '{}'".format(e['entity']['type']))
             if e['entity']['type'] in event_types:
                 try:
                     if not dbs[e['entity']['type']].exists(e['metadata']['guid']):
                         write_stdout("EVENT RECEIVED: {}".format(str(e)))
 
-                        dbs[e['entity']['type']].set(e['metadata']['guid'], json.dumps(e))
+                        dbs[e['entity']['type']].set(e['metadata']['guid'], codec.dumps(e))
                         dbs[e['entity']['type']].expire(e['metadata']['guid'], key_expire_seconds)
 
                 except Exception as e:
                     raise e
 
+        write_stdout("Found {} total events!".format(str(total_events)))
         time.sleep(float(interval))
 
 
@@ -75,7 +63,7 @@ def listen_loop(cf, event_type, db, callback, **callback_args):
             write_stdout('Received an event! ({})'.format(event['type']))
             write_stdout('Event key: {}'.format(event['data']))
 
-            event_data = json.loads(db.get(event['data']))
+            event_data = codec.loads(db.get(event['data']))
 
             try:
                 write_stdout(format_log_entry(**event_data))
@@ -0,0 +1,272 @@
+import os
+import gzip
+import time
+import hashlib
+import threading
+import SocketServer
+import BaseHTTPServer
+from cStringIO import StringIO
+
+from pycf.exposition import MetricRegistry, CONTENT_TYPE_TEXT, CONTENT_TYPE_OPENMETRICS
+from pycf.prometheus import CollectionState, collect_app_metrics, collect_quota_metrics, collect_org_metrics
+from pycf.utils import write_stdout
+
+
+COLLECTION_INTERVAL = 60  # seconds between the starts of two collections
+
+
+class Snapshot(object):
+    # the metrics of one collection; never modified once built, so handlers can serve it without locking.
+    # each format is rendered (and gzipped) on first use and kept for every later scrape of this snapshot;
+    # a concurrent first use just renders twice
+    __slots__ = ('registry', 'timestamp', 'duration', '_rendered', '_gzipped')
+
+    def __init__(self, registry, timestamp, duration):
+        self.registry = registry
+        self.timestamp = timestamp
+        self.duration = duration
+        self._rendered = {}
+        self._gzipped = {}
+
+    def body(self, openmetrics=False):
+        # (chunks, content length, etag)
+        rendered = self._rendered.get(openmetrics)
+
+        if rendered is None:
+            chunks = []
+            self.registry.write(chunks.append, openmetrics)
+
+            digest = hashlib.md5()
+            for chunk in chunks:
+                digest.update(chunk)
+
+            rendered = self._rendered[openmetrics] = (chunks, sum(len(chunk) for chunk in chunks), '"{}"'.format(digest.hexdigest()))
+
+        return rendered
+
+    def gzipped(self, openmetrics=False):
+        # (compressed body, etag)
+        gzipped = self._gzipped.get(openmetrics)
+
+        if gzipped is None:
+            chunks, _, etag = self.body(openmetrics)
+            buf = StringIO()
+            f = gzip.GzipFile(fileobj=buf, mode='wb', compresslevel=6, mtime=0)
+
+            for chunk in chunks:
+                f.write(chunk)
+
+            f.close()
+            gzipped = self._gzipped[openmetrics] = (buf.getvalue(), etag[:-1] + '-gzip"')
+
+        return gzipped
+
+
+class MetricsExporter(object):
+    # recomputes the metrics on an interval in the background; /metrics serves the last good snapshot.
+    # org is an org name, a list of org names, or None for every org the client can see; with more than
+    # one org the samples carry an org_name label. Given an ExporterShard, each replica collects only its
+    # slice of the spaces
+    def __init__(self, cf, org, interval=COLLECTION_INTERVAL, shard=None):
+        self.cf = cf
+        self.org = org
+        self.interval = interval
+        self.shard = shard
+        self.state = CollectionState(shard)  # carried from one collection to the next
+        self.snapshot = None
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self):
+        return self.snapshot is not None
+
+    def collect(self):
+        start = time.time()
+        registry = MetricRegistry()
+
+        if self.shard is not None:
+            self.shard.heartbeat()
+
+        try:
+            if isinstance(self.org, basestring):
+                collect_app_metrics(self.cf, self.org, registry, state=self.state)
+                collect_quota_metrics(self.cf, self.org, registry, state=self.state)
+
+            else:
+                collect_org_metrics(self.cf, registry, self.org, state=self.state)
+
+        except Exception as e:  # keep serving the previous snapshot
+            self.errors += 1
+            write_stdout("WARNING: metrics collection failed: {} raised! Message: {}".format(type(e).__name__, e))
+            return self.snapshot
+
+        duration = time.time() - start
+
+        if self.cf.metrics is not None:
+            self.cf.metrics.collect(registry)
+
+        registry.family('pycf_last_scrape_timestamp', 'Unix time at which the exposed metrics were collected').add((), start)
+        registry.family('pycf_scrape_duration_seconds', 'Time it took to collect the exposed metrics from the Cloud Controller').add((), duration)
+        registry.family('pycf_scrape_errors_total', 'Collections that failed, leaving the previous metrics exposed', 'counter').add((), self.errors)
+
+        snapshot = Snapshot(registry, start, duration)
+        snapshot.body()  # render the common case here rather than in the first scrape
+
+        self.snapshot = snapshot  # a single reference swap, so readers see the old or the new one
+
+        return snapshot
+
+    def start(self):
+        if self.shard is not None:
+            self.shard.start()
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+        self._thread.start()
+
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        if self.shard is not None:
+            self.shard.stop()
+
+    def _run(self):
+        while not self._stop.is_set():
+            started = time.time()
+            self.collect()
+            self._stop.wait(max(self.interval - (time.time() - started), 0))
+
+
+def wants_openmetrics(accept):
+    return 'application/openmetrics-text' in (accept or '')
+
+
+def accepts_gzip(accept_encoding):
+    for coding in (accept_encoding or '').split(','):
+        params = [p.strip() for p in coding.split(';')]
+
+        if params[0].lower() not in ('gzip', '*'):
+            continue
+
+        q = [p.split('=', 1)[1] for p in params[1:] if p.startswith('q=')]
+
+        try:
+            return float(q[0]) > 0 if q else True
+
+        except ValueError:
+            return False
+
+    return False
+
+
+class MetricsHandler(BaseHTTPServer.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, so Prometheus can reuse its connection
+
+    def do_GET(self):
+        self._respond(head_only=False)
+
+    def do_HEAD(self):
+        # per request: a keep-alive connection can carry a HEAD and then a GET on the same handler
+        self._respond(head_only=True)
+
+    def _respond(self, head_only):
+        path = self.path.split('?')[0]
+        exporter = self.server.exporter
+
+        if path == '/metrics':
+            self._metrics(exporter.snapshot, head_only)
+
+        elif path == '/healthz':
+            self._text(200, 'ok\n', head_only)
+
+        elif path == '/ready' and exporter.ready:
+            self._text(200, 'ready\n', head_only)
+
+        elif path == '/ready':
+            self._text(503, 'no metrics collected yet\n', head_only)
+
+        else:
+            self._text(404, 'not found\n', head_only)
+
+    def _metrics(self, snapshot, head_only=False):
+        if snapshot is None:
+            return self._text(503, 'no metrics collected yet\n', head_only)
+
+        openmetrics = wants_openmetrics(self.headers.get('Accept'))
+        headers = {'Vary': 'Accept, Accept-Encoding'}
+
+        if accepts_gzip(self.headers.get('Accept-Encoding')):
+            body, etag = snapshot.gzipped(openmetrics)
+            headers['Content-Encoding'] = 'gzip'
+
+        else:
+            chunks, length, etag = snapshot.body(openmetrics)
+            body = None
+
+        headers['ETag'] = etag
+
+        if etag in [t.strip() for t in (self.headers.get('If-None-Match') or '').split(',')]:
+            return self._send(304, None, headers=headers, head_only=head_only)
+
+        content_type = CONTENT_TYPE_OPENMETRICS if openmetrics else CONTENT_TYPE_TEXT
+
+        if body is not None:
+            self._send(200, body, content_type, headers, head_only)
+
+        else:
+            self._send_chunks(200, chunks, length, content_type, headers, head_only)
+
+    def _text(self, status, text, head_only=False):
+        self._send(status, text, 'text/plain; charset=utf-8', head_only=head_only)
+
+    def _send(self, status, body, content_type=None, headers=None, head_only=False):
+        self._send_chunks(status, [body] if body else [], len(body or ''), content_type, headers, head_only)
+
+    def _send_chunks(self, status, chunks, length, content_type=None, headers=None, head_only=False):
+        # the rendered exposition goes out chunk by chunk, as MetricRegistry.write() produced it
+        self.send_response(status)
+
+        if content_type:
+            self.send_header('Content-Type', content_type)
+
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+
+        self.send_header('Content-Length', str(length))
+        self.end_headers()
+
+        if not head_only:
+            for chunk in chunks:
+                self.wfile.write(chunk)
+
+    def log_message(self, format, *args):
+        pass  # a line per scrape is just noise
+
+
+class MetricsServer(SocketServer.ThreadingMixIn, BaseHTTPServer.HTTPServer):
+    # a thread per connection, so a slow client can't hold up anyone else's scrape
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, exporter):
+        BaseHTTPServer.HTTPServer.__init__(self, address, MetricsHandler)
+        self.exporter = exporter
+
+
+def serve_metrics(exporter, port=None):
+    port = int(port or os.environ['PORT'])
+    server = MetricsServer(('0.0.0.0', port), exporter)
+
+    orgs = exporter.org if isinstance(exporter.org, basestring) else ', '.join(exporter.org or ['all orgs'])
+    write_stdout("Serving metrics for {} on port {}...".format(orgs, port))
+    exporter.start()
+    server.serve_forever()
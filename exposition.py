@@ -0,0 +1,139 @@
+import math
+from collections import OrderedDict
+
+
+CONTENT_TYPE_TEXT = 'text/plain; version=0.0.4; charset=utf-8'
+CONTENT_TYPE_OPENMETRICS = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+CHUNK_LINES = 1024  # sample lines buffered per write() call
+
+
+def escape_label_value(value):
+    if not isinstance(value, basestring):
+        value = str(value)
+
+    if isinstance(value, unicode):
+        value = value.encode('utf-8')
+
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def format_value(value):
+    if isinstance(value, basestring):
+        return value  # already formatted (e.g. 'NaN', or str() of a number)
+
+    if isinstance(value, float):
+        if math.isnan(value):
+            return 'NaN'
+
+        if math.isinf(value):
+            return '+Inf' if value > 0 else '-Inf'
+
+        return repr(value)
+
+    return str(value)
+
+
+def _encode(chunk):
+    return chunk.encode('utf-8') if isinstance(chunk, unicode) else chunk
+
+
+class MetricFamily(object):
+    # the samples of one metric name; label names are encoded once here rather than for every sample
+    __slots__ = ('name', 'help', 'type', 'label_names', 'samples', '_registry', '_prefixes')
+
+    def __init__(self, registry, name, help, type='gauge', label_names=()):
+        self.name = name
+        self.help = help
+        self.type = type
+        self.label_names = tuple(label_names)
+        self.samples = []  # (suffix, escaped label values, extra labels, value)
+        self._registry = registry
+        self._prefixes = {
+            False: ['{}="'.format(n) if i == 0 else ', {}="'.format(n) for i, n in enumerate(self.label_names)],
+            True: ['{}="'.format(n) if i == 0 else ',{}="'.format(n) for i, n in enumerate(self.label_names)]
+        }
+
+    def add(self, label_values, value, suffix='', extra_labels=()):
+        # extra_labels: (name, value) pairs that only some samples carry, e.g. a histogram bucket's le
+        if len(label_values) != len(self.label_names):
+            raise ValueError("{} takes labels {}, got {} value(s)".format(self.name, ', '.join(self.label_names), len(label_values)))
+
+        intern = self._registry.intern
+        self.samples.append((suffix, tuple(intern(v) for v in label_values), extra_labels, value))
+
+    def __len__(self):
+        return len(self.samples)
+
+    def lines(self, openmetrics=False):
+        type_name = self.name[:-len('_total')] if openmetrics and self.type == 'counter' and self.name.endswith('_total') else self.name
+        separator = ',' if openmetrics else ', '
+        prefixes = self._prefixes[openmetrics]
+
+        yield '# HELP {} {}\n'.format(type_name, self.help.replace('\\', '\\\\').replace('\n', '\\n'))
+        yield '# TYPE {} {}\n'.format(type_name, self.type)
+
+        for suffix, values, extra_labels, value in self.samples:
+            labels = ''.join(prefix + v + '"' for prefix, v in zip(prefixes, values))
+
+            for name, v in extra_labels:
+                labels += '{}{}="{}"'.format(separator if labels else '', name, escape_label_value(v))
+
+            if labels:
+                yield '{}{}{{{}}} {}\n'.format(self.name, suffix, labels, format_value(value))
+
+            else:
+                yield '{}{} {}\n'.format(self.name, suffix, format_value(value))
+
+
+class MetricRegistry(object):
+    def __init__(self):
+        self.families = OrderedDict()
+        self._interned = {}  # raw label value -> escaped, encoded value; the same space/app names repeat across families
+
+    def family(self, name, help, type='gauge', label_names=()):
+        family = self.families.get(name)
+
+        if family is None:
+            family = self.families[name] = MetricFamily(self, name, help, type, label_names)
+
+        return family
+
+    def merge(self, other):
+        # appends another registry's samples; families missing here are added in the other registry's order
+        for family in other.families.values():
+            self.family(family.name, family.help, family.type, family.label_names).samples.extend(family.samples)
+
+        return self
+
+    def intern(self, value):
+        escaped = self._interned.get(value)
+
+        if escaped is None:
+            escaped = self._interned[value] = escape_label_value(value)
+
+        return escaped
+
+    def write(self, write, openmetrics=False, chunk_lines=CHUNK_LINES):
+        # streams the exposition to write() in chunks instead of building it as one string
+        buffered = []
+
+        for family in self.families.values():
+            for line in family.lines(openmetrics):
+                buffered.append(line)
+
+                if len(buffered) >= chunk_lines:
+                    write(_encode(''.join(buffered)))
+                    buffered = []
+
+        if openmetrics:
+            buffered.append('# EOF\n')
+
+        if buffered:
+            write(_encode(''.join(buffered)))
+
+    def render(self, openmetrics=False):
+        chunks = []
+        self.write(chunks.append, openmetrics)
+
+        return ''.join(chunks)
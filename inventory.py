@@ -0,0 +1,393 @@
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from collections import defaultdict
+
+from pycf.records import Organization, Space, App, ServiceInstance, ServiceBinding, ServicePlan, Event
+from pycf.utils import TIMESTAMP_FORMAT, latest_event_timestamp, write_stdout
+from pycf.requests_api_wrapper import codec
+from pycf.requests_api_wrapper.base import ApiError
+
+
+# load order matters: organizations and spaces must be indexed before the resources that point at them
+RECORD_TYPES = (
+    ('organizations', Organization),
+    ('spaces', Space),
+    ('apps', App),
+    ('service_instances', ServiceInstance),
+    ('service_bindings', ServiceBinding),
+    ('service_plans', ServicePlan)
+)
+
+EVENT_ACTEE_TYPES = {
+    'organization': 'organizations',
+    'space': 'spaces',
+    'app': 'apps',
+    'service_instance': 'service_instances',
+    'service_binding': 'service_bindings'
+}
+
+# audit events are only retained for a limited time, so an older snapshot can't be caught up incrementally
+MAX_SNAPSHOT_AGE = timedelta(days=7)
+SNAPSHOT_INTERVAL = timedelta(minutes=5)  # how often refreshes rewrite the warm start snapshot at most
+# refreshes only see what audit and usage events report (service plans, for one, have no events), so the
+# inventory is crawled afresh this often to pick up anything they missed
+FULL_RELOAD_INTERVAL = timedelta(hours=1)
+
+QUERY_PATTERN = re.compile(r'^\s*([a-z_]+)\s*( IN |:)\s*(.*?)\s*$')
+
+
+def _is_delete_event(event_type):
+    return event_type.endswith('.delete') or event_type.endswith('.delete-request')
+
+
+class CFInventory(object):
+    def __init__(self, cf, max_age=None, workers=8, full_reload_interval=FULL_RELOAD_INTERVAL):
+        self.cf = cf
+        self.max_age = max_age  # seconds after which facts() refreshes before answering
+        self.workers = workers
+        self.full_reload_interval = full_reload_interval
+        self.record_types = dict(RECORD_TYPES)
+        self.last_sync = None
+        self.last_load = None
+        self.event_cursor = None
+        self.usage_cursors = {'app_usage_event': None, 'service_usage_event': None}
+        self.snapshot_path = None  # set by warm_start(); kept current by later loads and refreshes
+        self.saved_at = None
+        self.reconciled = threading.Event()
+        self._lock = threading.RLock()
+        self._refresh_lock = threading.RLock()  # one load/refresh at a time: facts() and the warm start can both ask
+        self._clear()
+
+    def attach(self):
+        # makes utils.gather_facts answer from this inventory
+        self.cf.inventory = self
+        return self
+
+    def load(self):
+        with self._refresh_lock:
+            # replay anything that happens while we crawl, going by the Cloud Controller's clock rather than ours
+            event_cursor = latest_event_timestamp(self.cf)
+
+            try:
+                usage_cursors = dict((kind, self._latest_usage_event(kind)) for kind in ('app_usage_event', 'service_usage_event'))
+
+            except ApiError as e:
+                # usage events need admin or global auditor access; without them every refresh crawls afresh
+                if self.usage_cursors is not None:
+                    write_stdout("WARNING: can't read usage events (status code: {}) -- refreshing the inventory in full".format(e.status_code))
+
+                usage_cursors = None
+
+            resources = {}
+            for kind, record_type in RECORD_TYPES:
+                resources[kind] = list(getattr(self.cf, kind).iter(record=record_type, prefetch=True))
+
+            with self._lock:
+                self._clear()
+
+                for kind, _ in RECORD_TYPES:
+                    for record in resources[kind]:
+                        self._add(kind, record)
+
+                self.event_cursor = event_cursor
+                self.usage_cursors = usage_cursors
+                self.last_sync = self.last_load = datetime.utcnow()
+
+            self._save_snapshot()
+
+        return self
+
+    def refresh(self):
+        # the cursors only move on once every change they cover has been applied; if a fetch fails the next
+        # refresh reads the same events again (applying a change twice is harmless)
+        with self._refresh_lock:
+            if self.last_sync is None or self.usage_cursors is None or self._reload_due():
+                return self.load()
+
+            changed = defaultdict(set)
+            deleted = defaultdict(set)
+            event_cursor = self.event_cursor
+            usage_cursors = dict(self.usage_cursors)
+
+            for event in self.cf.events.iter(params={'q': 'timestamp>={}'.format(self.event_cursor)}, record=Event):
+                kind = EVENT_ACTEE_TYPES.get(event.actee_type)
+
+                if kind:
+                    (deleted if _is_delete_event(event.type) else changed)[kind].add(event.actee)
+
+                event_cursor = max(event_cursor, event.timestamp)
+
+            for usage in self._usage_events('app_usage_event', usage_cursors):
+                changed['apps'].add(usage['entity']['app_guid'])
+
+            for usage in self._usage_events('service_usage_event', usage_cursors):
+                if usage['entity']['state'] == 'DELETED':
+                    deleted['service_instances'].add(usage['entity']['service_instance_guid'])
+
+                else:
+                    changed['service_instances'].add(usage['entity']['service_instance_guid'])
+
+            fetched = {}
+            for kind, guids in changed.items():
+                guids = sorted(guids - deleted[kind])
+                fetched[kind] = zip(guids, getattr(self.cf, kind).map('get', guids, max_workers=self.workers))
+
+            failed = 0
+
+            with self._lock:
+                for kind, guids in deleted.items():
+                    for guid in guids:
+                        self._remove(kind, guid)
+
+                for kind, results in fetched.items():
+                    for guid, result in results:
+                        if result.ok:
+                            self._add(kind, self.record_types[kind](result.response.json()))
+
+                        elif isinstance(result.error, ApiError) and result.error.status_code == 404:
+                            self._remove(kind, guid)
+
+                        elif not isinstance(result.error, ApiError) or result.error.status_code >= 500:
+                            failed += 1  # transient; a 403 and the like wouldn't succeed on a retry either
+
+                if not failed:
+                    self.event_cursor = event_cursor
+                    self.usage_cursors = usage_cursors
+                    self.last_sync = datetime.utcnow()
+
+            if failed:
+                write_stdout("WARNING: couldn't fetch {} changed resource(s) -- the next inventory refresh retries them".format(failed))
+
+            else:
+                self._save_snapshot()
+
+        return self
+
+    def save(self, path):
+        # written to a temporary file and renamed over the old snapshot, so readers never see a partial one
+        tmp_path = path + '.tmp'
+
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+        with self._lock:
+            rows = [(kind, guid, codec.dumps(record.as_dict())) for kind, records in self._by_guid.items() for guid, record in records.items()]
+            state = {
+                'event_cursor': self.event_cursor,
+                'usage_cursors': self.usage_cursors,
+                'last_sync': self.last_sync.strftime(TIMESTAMP_FORMAT) if self.last_sync else None,
+                'last_load': self.last_load.strftime(TIMESTAMP_FORMAT) if self.last_load else None
+            }
+
+        db = sqlite3.connect(tmp_path)
+
+        try:
+            db.execute('CREATE TABLE records (kind TEXT, guid TEXT, data TEXT, PRIMARY KEY (kind, guid))')
+            db.execute('CREATE TABLE state (key TEXT PRIMARY KEY, value TEXT)')
+            db.executemany('INSERT INTO records VALUES (?, ?, ?)', rows)
+            db.executemany('INSERT INTO state VALUES (?, ?)', [(k, codec.dumps(v)) for k, v in state.items()])
+            db.commit()
+
+        finally:
+            db.close()
+
+        os.rename(tmp_path, path)
+        self.saved_at = datetime.utcnow()
+
+    def restore(self, path):
+        db = sqlite3.connect(path)
+
+        try:
+            state = dict((k, codec.loads(v)) for k, v in db.execute('SELECT key, value FROM state'))
+            rows = db.execute('SELECT kind, data FROM records').fetchall()
+
+        finally:
+            db.close()
+
+        with self._lock:
+            self._clear()
+            records = defaultdict(list)
+
+            for kind, data in rows:
+                if kind in self.record_types:
+                    records[kind].append(self.record_types[kind].from_dict(codec.loads(data)))
+
+            for kind, _ in RECORD_TYPES:
+                for record in records[kind]:
+                    self._add(kind, record)
+
+            self.event_cursor = state['event_cursor']
+            self.usage_cursors = state['usage_cursors']
+            self.last_sync = datetime.strptime(state['last_sync'], TIMESTAMP_FORMAT) if state['last_sync'] else None
+            # snapshots written before full reloads were tracked count as freshly loaded at their last sync
+            last_load = state.get('last_load', state['last_sync'])
+            self.last_load = datetime.strptime(last_load, TIMESTAMP_FORMAT) if last_load else None
+
+        return self
+
+    def warm_start(self, path, max_snapshot_age=MAX_SNAPSHOT_AGE):
+        # serve from the snapshot right away and catch up with the foundation in the background
+        self.snapshot_path = path
+
+        if os.path.exists(path):
+            try:
+                self.restore(path)
+
+            except (sqlite3.Error, KeyError, ValueError) as e:
+                write_stdout("WARNING: couldn't restore inventory snapshot '{}': {} -- crawling from scratch".format(path, e))
+                self.last_sync = None
+
+        stale = self.last_sync is None or datetime.utcnow() - self.last_sync > max_snapshot_age
+        thread = threading.Thread(target=self._reconcile, args=(path, stale))
+        thread.daemon = True
+        thread.start()
+
+        return self
+
+    def _reconcile(self, path, full):
+        try:
+            self.saved_at = None  # the first sync after a restart always rewrites the snapshot
+            self.load() if full else self.refresh()
+
+        except Exception as e:
+            write_stdout("WARNING: inventory reconciliation failed: {} raised! Message: {}".format(type(e).__name__, e))
+
+        finally:
+            self.reconciled.set()
+
+    def _reload_due(self):
+        return self.full_reload_interval is not None and (self.last_load is None or datetime.utcnow() - self.last_load >= self.full_reload_interval)
+
+    def _save_snapshot(self):
+        if self.snapshot_path is None or (self.saved_at and datetime.utcnow() - self.saved_at < SNAPSHOT_INTERVAL):
+            return
+
+        try:
+            self.save(self.snapshot_path)
+
+        except (sqlite3.Error, OSError) as e:  # the in-memory inventory is still good; the next refresh tries again
+            write_stdout("WARNING: couldn't save inventory snapshot '{}': {}".format(self.snapshot_path, e))
+
+    def get(self, kind, guid):
+        with self._lock:
+            return self._by_guid[kind].get(guid)
+
+    def find(self, kind, name=None, space_guid=None, org_guid=None):
+        with self._lock:
+            guids = None
+
+            for index, value in ((self._by_name, name), (self._by_space, space_guid), (self._by_org, org_guid)):
+                if value is not None:
+                    matches = index[kind].get(value, set())
+                    guids = matches if guids is None else guids & matches
+
+            if guids is None:
+                return list(self._by_guid[kind].values())
+
+            return [self._by_guid[kind][guid] for guid in guids]
+
+    def facts(self, api, mapping_schema='entity.name:metadata.guid', params=None):
+        # answers a utils.gather_facts() query, or returns None when it can't be answered from the inventory
+        if api not in self.record_types or (params and set(params.keys()) != set(['q'])):
+            return None
+
+        attributes = dict(('.'.join(path), name) for name, path in self.record_types[api].fields)
+        nlookup, glookup = mapping_schema.split(':')
+
+        if nlookup not in attributes or glookup not in attributes:
+            return None
+
+        if self.max_age is not None and (self.last_sync is None or datetime.utcnow() - self.last_sync > timedelta(seconds=self.max_age)):
+            self.refresh()
+
+        records = self._select(api, params['q'] if params else None)
+
+        if records is None:
+            return None
+
+        return dict((getattr(r, attributes[nlookup]), getattr(r, attributes[glookup])) for r in records)
+
+    def _select(self, kind, query):
+        if query is None:
+            return self.find(kind)
+
+        match = QUERY_PATTERN.match(query) if isinstance(query, basestring) else None
+
+        if not match:
+            return None
+
+        field, operator, value = match.groups()
+        values = value.split(',') if operator == ' IN ' else [value]
+        indexed = {'name': 'name', 'space_guid': 'space_guid', 'organization_guid': 'org_guid'}
+
+        if field in indexed:
+            records = []
+            for v in values:
+                records.extend(self.find(kind, **{indexed[field]: v}))
+
+            return records
+
+        if field in self.record_types[kind].__slots__:
+            values = set(values)
+            return [r for r in self.find(kind) if getattr(r, field) in values]
+
+        return None
+
+    def _clear(self):
+        self._by_guid = defaultdict(dict)
+        self._by_name = defaultdict(lambda: defaultdict(set))
+        self._by_space = defaultdict(lambda: defaultdict(set))
+        self._by_org = defaultdict(lambda: defaultdict(set))
+        self._index_keys = defaultdict(dict)  # kind -> guid -> the keys the record was indexed under
+
+    def _space_and_org(self, kind, record):
+        if kind == 'organizations':
+            return None, record.guid
+
+        if kind == 'spaces':
+            return record.guid, record.organization_guid
+
+        if kind == 'service_bindings':
+            app = self._by_guid['apps'].get(record.app_guid)
+            space_guid = app.space_guid if app else None
+
+        else:
+            space_guid = getattr(record, 'space_guid', None)
+
+        space = self._by_guid['spaces'].get(space_guid)
+
+        return space_guid, space.organization_guid if space else None
+
+    def _add(self, kind, record):
+        self._remove(kind, record.guid)
+        self._by_guid[kind][record.guid] = record
+        space_guid, org_guid = self._space_and_org(kind, record)
+        keys = self._index_keys[kind][record.guid] = (getattr(record, 'name', None), space_guid, org_guid)
+
+        for index, key in zip((self._by_name, self._by_space, self._by_org), keys):
+            if key is not None:
+                index[kind][key].add(record.guid)
+
+    def _remove(self, kind, guid):
+        if self._by_guid[kind].pop(guid, None) is None:
+            return
+
+        for index, key in zip((self._by_name, self._by_space, self._by_org), self._index_keys[kind].pop(guid)):
+            if key is not None:
+                index[kind][key].discard(guid)
+
+    def _latest_usage_event(self, kind):
+        resources = getattr(self.cf, kind).list(params={'order-direction': 'desc', 'results-per-page': 1}).json()['resources']
+
+        return resources[0]['metadata']['guid'] if resources else None
+
+    def _usage_events(self, kind, cursors):
+        # advances cursors[kind], a copy that refresh() commits once the events have been applied
+        params = {'after_guid': cursors[kind]} if cursors[kind] else None
+
+        for usage in getattr(self.cf, kind).iter(params=params):
+            cursors[kind] = usage['metadata']['guid']
+            yield usage
@@ -0,0 +1,58 @@
+import threading
+
+from pycf.exceptions import CloudFoundryError
+from pycf.records import Space
+from pycf.utils import gather_facts
+
+
+class Lookups(object):
+    # name lookups for one collection, shared by every org in it: the org and space listings are fetched once
+    # however many orgs ask for them. org_guids limits the space listing to the orgs being collected
+    def __init__(self, cf, org_guids=None):
+        self.cf = cf
+        self.org_guids = org_guids
+        self._orgs = None
+        self._spaces = {}  # org guid -> {space guid: space name}
+        self._lock = threading.RLock()
+
+    def orgs(self):
+        # org name -> guid, for every org the client can see
+        with self._lock:
+            if self._orgs is None:
+                self._orgs = gather_facts(self.cf, 'organizations')
+
+            return self._orgs
+
+    def org_guid(self, org):
+        with self._lock:
+            if self._orgs is None and self.org_guids is None:
+                # a single org is cheaper to look up by name than by listing them all
+                guids = gather_facts(self.cf, 'organizations', params={'q': 'name:{}'.format(org)})
+
+            else:
+                guids = self.orgs()
+
+        if org not in guids:
+            raise CloudFoundryError("unknown organization '{}'".format(org))
+
+        return guids[org]
+
+    def space_names(self, org_guid):
+        with self._lock:
+            if org_guid not in self._spaces:
+                # the first org to ask lists the spaces of every org in the collection
+                org_guids = self.org_guids if self.org_guids and org_guid in self.org_guids else [org_guid]
+
+                for guid in org_guids:
+                    self._spaces[guid] = {}
+
+                if self.cf.inventory is not None:
+                    spaces = [space for guid in org_guids for space in self.cf.inventory.find('spaces', org_guid=guid)]
+
+                else:
+                    spaces = self.cf.spaces.iter(params={'q': 'organization_guid IN {}'.format(','.join(org_guids))}, record=Space, prefetch=True)
+
+                for space in spaces:
+                    self._spaces.setdefault(space.organization_guid, {})[space.guid] = space.name
+
+            return self._spaces[org_guid]
@@ -1,438 +1,497 @@
 import os
-import json
+import math
 from requests import get
-from datetime import datetime, timedelta
-from pycf.utils import gather_facts, get_paginated_results, utc_to_epoch, write_stdout
+from collections import OrderedDict
+from pycf.app_state import AppStateTracker
+from pycf.attribution import ACTEE_BATCH_SIZE, ActorIndex
+from pycf.costs import PlanCatalog, prorated_costs
+from pycf.exceptions import CloudFoundryError
+from pycf.exposition import MetricRegistry
+from pycf.lookups import Lookups
+from pycf.records import ServiceBinding, ServiceInstance
+from pycf.stats import AppStatsCollector
+from pycf.utils import get_paginated_results, utc_to_epoch, write_stdout
+from pycf.requests_api_wrapper.batch import run_calls
+
+
+class OrgMetric(object):
+    # a metric family whose samples get a leading org_name label when a collection spans several orgs
+    def __init__(self, registry, name, help, type, label_names, org_name=None):
+        self.org_labels = (org_name,) if org_name is not None else ()
+        self.family = registry.family(name, help, type, (('org_name',) if org_name is not None else ()) + label_names)
+
+    def _add(self, label_values, value):
+        self.family.add(self.org_labels + label_values, value)
+
+
+class ApplicationResourceUtilization(OrgMetric):
+    def __init__(self, resource, registry, org_name=None):
+        self.resource = resource
+        super(ApplicationResourceUtilization, self).__init__(
+            registry,
+            '%s_utilization' % resource,
+            'Current CPU utilization for a Cloud Foundry application',
+            'gauge',
+            ('space_name', 'app_name', 'app_index'),
+            org_name
+        )
 
+    def add(self, space_name, app_name, app_index, value):
+        self._add((space_name, app_name, app_index), value)
 
-class ApplicationResourceUtilization(object):
-    def __init__(self, resource):
-        self.resource = resource
-        self.help = '# HELP %s_utilization Current CPU utilization for a Cloud Foundry application\n' % resource
-        self.type = '# TYPE %s_utilization gauge\n' % resource
-        self.metric_template = '%s_utilization{space_name="%s", app_name="%s", app_index="%s"} %s\n'
 
-    def generate_metric(self, space_name, app_name, app_index, value):
-        return self.metric_template % (self.resource, space_name, app_name, app_index, value)
+class AppStatus(OrgMetric):
+    def __init__(self, registry, org_name=None):
+        super(AppStatus, self).__init__(
+            registry,
+            'application_status',
+            'The current status of a Cloud Foundry application',
+            'gauge',
+            ('space_name', 'app_name', 'app_index', 'created_by', 'last_updated_by', 'status_text'),
+            org_name
+        )
+
+    def add(self, space_name, app_name, app_index, created_by, last_updated_by, status_text, up):
+        self._add((space_name, app_name, app_index, created_by, last_updated_by, status_text), up)
+
 
+class AppStatsFailures(OrgMetric):
+    def __init__(self, registry, org_name=None):
+        super(AppStatsFailures, self).__init__(registry, 'app_stats_failures_total', 'Application stats calls that failed or timed out', 'counter', (), org_name)
 
-class AppStatus(object):
-    def __init__(self):
-        self.help = '# HELP application_status The current status of a Cloud Foundry application\n'
-        self.type = '# TYPE application_status gauge\n'
-        self.metric_template = 'application_status{space_name="%s", app_name="%s", app_index="%s", created_by="%s", last_updated_by="%s", status_text="%s"} %s\n'
+    def add(self, failures):
+        self._add((), failures)
 
-    def generate_metric(self, space_name, app_name, app_index, created_by, last_updated_by, status_text, up):
-        return self.metric_template % (space_name, app_name, app_index, created_by, last_updated_by, status_text, up)
 
+class AppStateTransitions(OrgMetric):
+    def __init__(self, registry, org_name=None):
+        super(AppStateTransitions, self).__init__(
+            registry,
+            'application_state_transitions_total',
+            'Starts, stops and crashes of a Cloud Foundry application since the exporter started',
+            'counter',
+            ('space_name', 'app_name', 'transition'),
+            org_name
+        )
+
+    def add(self, space_name, app_name, transition, count):
+        self._add((space_name, app_name, transition), count)
 
-class ServiceInstanceStatus(object):
-    def __init__(self):
-        self.help = '# HELP service_instance_status The current status of a Cloud Foundry application\n'
-        self.type = '# TYPE service_instance_status gauge\n'
-        self.metric_template = 'service_instance_status{space_name="%s", service_instance_name="%s", service_plan_name="%s", create_time="%s", created_by="%s", last_updated_by="%s"} %s\n'
 
-    def generate_metric(self, space_name, service_instance_name, service_plan_name, create_time, created_by, last_updated_by, bound):
-        return self.metric_template % (space_name, service_instance_name, service_plan_name, create_time, created_by, last_updated_by, bound)
+class ServiceInstanceStatus(OrgMetric):
+    def __init__(self, registry, org_name=None):
+        super(ServiceInstanceStatus, self).__init__(
+            registry,
+            'service_instance_status',
+            'The current status of a Cloud Foundry application',
+            'gauge',
+            ('space_name', 'service_instance_name', 'service_plan_name', 'create_time', 'created_by', 'last_updated_by'),
+            org_name
+        )
 
+    def add(self, space_name, service_instance_name, service_plan_name, create_time, created_by, last_updated_by, bound):
+        self._add((space_name, service_instance_name, service_plan_name, create_time, created_by, last_updated_by), bound)
 
-class ServiceInstanceCost(object):
-    def __init__(self):
-        self.help = '# HELP service_instance_cost The current monthly cost (in USD) for currently deployed service instances\n'
-        self.type = '# TYPE service_instance_cost gauge\n'
-        self.metric_template = 'service_instance_cost{space_name="%s", service_instance_name="%s", service_instance_status="%s", service_plan_name="%s"} %s\n'
 
-    def generate_metric(self, space_name, service_instance_name, service_instance_status, service_plan_name, cost):
-        return self.metric_template % (space_name, service_instance_name, service_instance_status, service_plan_name, cost)
+class ServiceInstanceCost(OrgMetric):
+    def __init__(self, registry, org_name=None):
+        super(ServiceInstanceCost, self).__init__(
+            registry,
+            'service_instance_cost',
+            'The current monthly cost (in USD) for currently deployed service instances',
+            'gauge',
+            ('space_name', 'service_instance_name', 'service_instance_status', 'service_plan_name'),
+            org_name
+        )
 
+    def add(self, space_name, service_instance_name, service_instance_status, service_plan_name, cost):
+        self._add((space_name, service_instance_name, service_instance_status, service_plan_name), cost)
 
-def app_metrics(cf, org):
-    def generate_response(cf, org):
-        # gather facts about the given cf organization
-        org_guid = _get_org_guid(cf, org)
 
-        search_params = {
-            'q': 'organization_guid IN {}'.format(org_guid)
-        }
+class SpaceServiceCost(OrgMetric):
+    def __init__(self, registry, org_name=None):
+        super(SpaceServiceCost, self).__init__(
+            registry,
+            'space_service_instance_cost',
+            'The current monthly cost (in USD) for the service instances deployed in a space',
+            'gauge',
+            ('space_name',),
+            org_name
+        )
+
+    def add(self, space_name, cost):
+        self._add((space_name,), cost)
+
+
+class OrgServiceCost(OrgMetric):
+    def __init__(self, registry, org_name=None):
+        super(OrgServiceCost, self).__init__(
+            registry,
+            'org_service_instance_cost',
+            'The current monthly cost (in USD) for the service instances deployed in an organization',
+            'gauge',
+            (),
+            org_name
+        )
+
+    def add(self, cost):
+        self._add((), cost)
+
+
+ORG_WORKERS = 4
+
+
+class CollectionState(object):
+    # what a collection keeps for the next one, so later scrapes only ask for what changed. An exporter builds
+    # one and passes it to every collection; a collection without one starts from scratch.
+    # With an ExporterShard, collections only cover the spaces (and orgs) this replica owns
+    def __init__(self, shard=None):
+        self.shard = shard
+        self.actors = ActorIndex()
+        self.stats = AppStatsCollector()  # its failure counts accumulate across collections
+        self.app_state = AppStateTracker()
+        self.plans = PlanCatalog()
+
+    def advance(self, cf):
+        # reads the foundation-wide event feeds the trackers follow; once per collection, however many orgs it spans
+        self.app_state.advance(cf)
+        self.actors.advance(cf)
+
+
+def org_metrics(cf, orgs=None, openmetrics=False, state=None):
+    registry = MetricRegistry()
+    collect_org_metrics(cf, registry, orgs, state=state)
+
+    return registry.render(openmetrics)
+
+
+def collect_org_metrics(cf, registry, orgs=None, workers=ORG_WORKERS, state=None):
+    # app and quota metrics for several orgs (every org the client can see if orgs is None), collected concurrently
+    # into one registry with an org_name label; org, space and service plan lookups are shared between the orgs.
+    # an org that fails is logged and left out; returns the names of those orgs
+    state = state or CollectionState()
+    lookups = Lookups(cf)
+    org_guids = lookups.orgs()
+    orgs = sorted(org_guids) if orgs is None else list(orgs)
+    lookups.org_guids = [org_guids[org] for org in orgs if org in org_guids]
+
+    try:
+        state.advance(cf)
+
+    except Exception as e:  # the orgs are collected from what the trackers already hold; the next collection catches up
+        write_stdout("WARNING: couldn't read the event feeds: {} raised! Message: {}".format(type(e).__name__, e))
+
+    def collect(org):
+        org_registry = MetricRegistry()
+        collect_app_metrics(cf, org, org_registry, lookups=lookups, org_label=True, state=state, advance=False)
+        collect_quota_metrics(cf, org, org_registry, lookups=lookups, org_label=True, state=state)
+
+        return org_registry
+
+    failed = []
+
+    for org, result in zip(orgs, run_calls([(collect, (org,), {}) for org in orgs], workers)):
+        if result.ok:
+            registry.merge(result.response)  # merged in org order, so the exposition doesn't depend on which org finished first
+
+        else:
+            write_stdout("WARNING: couldn't collect metrics for org '{}': {} raised! Message: {}".format(org, type(result.error).__name__, result.error))
+            failed.append(org)
+
+    if orgs and len(failed) == len(orgs):
+        raise CloudFoundryError("couldn't collect metrics for any of the orgs {}".format(', '.join(orgs)))
+
+    return failed
+
+
+def app_metrics(cf, org, openmetrics=False, state=None):
+    registry = MetricRegistry()
+    collect_app_metrics(cf, org, registry, state=state)
+
+    return registry.render(openmetrics)
+
+
+def collect_app_metrics(cf, org, registry, lookups=None, org_label=False, state=None, advance=True):
+    # advance=False when the caller has already called state.advance() for this collection
+    state = state or CollectionState()
+    lookups = lookups or Lookups(cf)
+    org_name = org if org_label else None
+
+    # gather facts about the given cf organization
+    org_guid = lookups.org_guid(org)
+
+    spaces_facts = lookups.space_names(org_guid)
+    space_guids = None  # every space in the org
+
+    if state.shard is not None:
+        space_guids = sorted(guid for guid in spaces_facts if state.shard.owns(guid))
+
+    # compute metrics
+    cpu_utilization = ApplicationResourceUtilization('cpu', registry, org_name)
+    mem_utilization = ApplicationResourceUtilization('mem', registry, org_name)
+    disk_utilization = ApplicationResourceUtilization('disk', registry, org_name)
+    app_status = AppStatus(registry, org_name)
+    app_stats_failures = AppStatsFailures(registry, org_name)
+    app_state_transitions = AppStateTransitions(registry, org_name)
+    service_instance_status = ServiceInstanceStatus(registry, org_name)
+    service_instance_cost = ServiceInstanceCost(registry, org_name)
+    space_service_cost = SpaceServiceCost(registry, org_name)
+    org_service_cost = OrgServiceCost(registry, org_name)
+
+    # app metrics
+    # kept between scrapes and advanced from app usage and audit events, so only apps that changed are re-fetched
+    app_state = state.app_state
+    apps = app_state.sync(cf, org_guid, space_guids, advance=advance)
+
+    if space_guids is None:
+        service_queries = ['organization_guid IN {}'.format(org_guid)]
 
-        spaces_facts = gather_facts(cf, 'spaces', params=search_params, mapping_schema='metadata.guid:entity.name')
-
-        # compute metrics
-        cpu_utilization = ApplicationResourceUtilization('cpu')
-        cpu_utilization_block = []
-
-        mem_utilization = ApplicationResourceUtilization('mem')
-        mem_utilization_block = []
-
-        disk_utilization = ApplicationResourceUtilization('disk')
-        disk_utilization_block = []
-
-        app_status = AppStatus()
-        app_status_block = []
-
-        service_instance_status = ServiceInstanceStatus()
-        service_instance_status_block = []
-
-        service_instance_cost = ServiceInstanceCost()
-        service_instance_cost_block = []
-
-        # app metrics
-        apps = get_paginated_results(cf.api_domain, cf.auth.access_token, cf.apps.list(params=search_params).json())
-
-        for app_info in apps:
-            space_name = spaces_facts[app_info['entity']['space_guid']]
-            app_guid = app_info['metadata']['guid']
-            app_name = app_info['entity']['name']
-            app_instances = app_info['entity']['instances']
-            app_event_search_params = {
-                'q': 'actee:{}'.format(app_guid),
-                'order-by': 'timestamp',
-                'order-direction': 'desc'
-            }
-            app_events = get_paginated_results(cf.api_domain, cf.auth.access_token, cf.events.list(params=app_event_search_params).json())
-            app_create_events = filter(
-                lambda x: x['entity']['type'] == 'audit.app.create',
-                app_events
-            )
-
-            if len(app_create_events) > 0:
-                created_by = app_create_events[0]['entity']['actor_name']
-
-            else:
-                created_by = "NaN"
-
-            app_update_events = filter(
-                lambda x: x['entity']['type'] == 'audit.app.update',
-                app_events
-            )
-
-            if len(app_update_events) > 0:
-                last_updated_by = app_update_events[0]['entity']['actor_name']
-
-            else:
-                last_updated_by = created_by
-
-            status_text = app_info['entity']['state']
-
-            if status_text == 'STARTED':
-                up = str(1)
-                app_stats = cf.apps.stats(app_guid).json()
-                for app_index, data in app_stats.iteritems():
-                    app_index = str(app_index)
-                    cpu_utilization_block.append(
-                        cpu_utilization.generate_metric(
-                            space_name,
-                            app_name,
-                            app_index,
-                            str(data['stats']['usage']['cpu'])
-                        )
-                    )
-                    mem_utilization_block.append(
-                        mem_utilization.generate_metric(
-                            space_name,
-                            app_name,
-                            app_index,
-                            str(
-                                float(data['stats']['usage']['mem'])/data['stats']['mem_quota']
-                            )
-                        )
-                    )
-                    disk_utilization_block.append(
-                        disk_utilization.generate_metric(
-                            space_name,
-                            app_name,
-                            app_index,
-                            str(
-                                float(data['stats']['usage']['disk'])/data['stats']['disk_quota']
-                            )
-                        )
-                    )
-                    app_status_block.append(
-                        app_status.generate_metric(
-                            space_name,
-                            app_name,
-                            app_index,
-                            created_by,
-                            last_updated_by,
-                            status_text,
-                            up
-                        )
-                    )
-
-            else:
-                up = str(0)
-                for i in range(0, app_instances + 1):
-                    app_index = str(i)
-                    cpu_utilization_block.append(
-                        cpu_utilization.generate_metric(
-                            space_name,
-                            app_name,
-                            app_index,
-                            str(0)
-                        )
-                    )
-                    mem_utilization_block.append(
-                        mem_utilization.generate_metric(
-                            space_name,
-                            app_name,
-                            app_index,
-                            str(0)
-                        )
-                    )
-                    disk_utilization_block.append(
-                        disk_utilization.generate_metric(
-                            space_name,
-                            app_name,
-                            app_index,
-                            str(0)
-                        )
-                    )
-                    app_status_block.append(
-                        app_status.generate_metric(
-                            space_name,
-                            app_name,
-                            app_index,
-                            created_by,
-                            last_updated_by,
-                            status_text,
-                            up
-                        )
-                    )
-
-        # service and service plan metrics
-        services = get_paginated_results(
+    else:  # a few spaces per query, so a large slice of the org doesn't overflow the url
+        service_queries = ['space_guid IN {}'.format(','.join(space_guids[i:i + ACTEE_BATCH_SIZE])) for i in range(0, len(space_guids), ACTEE_BATCH_SIZE)]
+
+    services = []
+
+    for query in service_queries:
+        services.extend(get_paginated_results(
             cf.api_domain,
             cf.auth.access_token,
             cf.service_instances.list(
-                params=search_params
-            ).json()
-        )
+                params={'q': query}
+            ).json(),
+            api=cf.service_instances,
+            record=ServiceInstance
+        ))
 
-        service_bindings_search_params = {
-            'q': 'app_guid IN {}'.format(
-                ','.join(
-                    map(lambda x: x['metadata']['guid'], filter(lambda x: True if x['entity']['name'] != 'ssh-gateway' else False, apps))
+    # created_by/last_updated_by for every app and service instance, from a handful of bulk event queries
+    actors = state.actors.update(cf, [a.guid for a in apps] + [s.guid for s in services], advance=advance)
+
+    # stats for every started app, fetched concurrently; None for apps whose stats call failed
+    stats_by_app = state.stats.collect(cf, [a.guid for a in apps if a.state == 'STARTED'], org_guid)
+
+    for app_info in apps:
+        space_name = spaces_facts[app_info.space_guid]
+        app_guid = app_info.guid
+        app_name = app_info.name
+        app_instances = app_info.instances
+        created_by = actors.actor(app_guid, 'audit.app.create')
+        last_updated_by = actors.actor(app_guid, 'audit.app.update', default=created_by)
+
+        status_text = app_info.state
+
+        if status_text == 'STARTED':
+            up = str(1)
+            app_stats = stats_by_app[app_guid]
+
+            if app_stats is None:
+                app_stats = dict((i, None) for i in range(app_instances))
+
+            for app_index, data in app_stats.iteritems():
+                app_index = str(app_index)
+
+                if data is None:  # the stats call failed: NaN samples rather than no samples
+                    cpu, mem, disk = 'NaN', 'NaN', 'NaN'
+
+                else:
+                    cpu = str(data['stats']['usage']['cpu'])
+                    mem = str(float(data['stats']['usage']['mem'])/data['stats']['mem_quota'])
+                    disk = str(float(data['stats']['usage']['disk'])/data['stats']['disk_quota'])
+
+                cpu_utilization.add(
+                    space_name,
+                    app_name,
+                    app_index,
+                    cpu
+                )
+                mem_utilization.add(
+                    space_name,
+                    app_name,
+                    app_index,
+                    mem
+                )
+                disk_utilization.add(
+                    space_name,
+                    app_name,
+                    app_index,
+                    disk
+                )
+                app_status.add(
+                    space_name,
+                    app_name,
+                    app_index,
+                    created_by,
+                    last_updated_by,
+                    status_text,
+                    up
                 )
-            )
-        }
-        service_bindings = gather_facts(
-            cf,
-            'service_bindings',
-            params=service_bindings_search_params,
-            mapping_schema='metadata.guid:entity.service_instance_guid'
-        )
 
-        for service_info in services:
-            service_instance_guid = service_info['metadata']['guid']
-            space_name = spaces_facts[service_info['entity']['space_guid']]
-            service_plan_name = cf.service_plans.get(service_info['entity']['service_plan_guid']).json()['entity']['name']
-            create_time = str(int(utc_to_epoch(service_info['metadata']['created_at'])))
-            service_instance_name = service_info['entity']['name']
-            service_event_search_params = {
-                'q': 'actee:{}'.format(service_instance_guid),
-                'order-by': 'timestamp',
-                'order-direction': 'desc'
-            }
-            service_instance_events = get_paginated_results(cf.api_domain, cf.auth.access_token, cf.events.list(params=service_event_search_params).json())
-            service_create_events = filter(
-                lambda x: x['entity']['type'] == 'audit.service_instance.create',
-                service_instance_events
-            )
-
-            if len(service_create_events) > 0:
-                created_by = service_create_events[0]['entity']['actor_name']
-
-            else:
-                created_by = "NaN"
-
-            service_update_events = filter(
-                lambda x: x['entity']['type'] == 'audit.service_instance.update',
-                service_instance_events
-            )
-
-            if len(service_update_events) > 0:
-                last_updated_by = service_update_events[0]['entity']['actor_name']
-
-            else:
-                last_updated_by = "NaN"
-
-            if service_instance_guid in service_bindings.values():
-                bound = str(1)
-
-            else:
-                bound = str(0)
-
-            service_instance_status_block.append(
-                service_instance_status.generate_metric(
+        else:
+            up = str(0)
+            for i in range(0, app_instances + 1):
+                app_index = str(i)
+                cpu_utilization.add(
                     space_name,
-                    service_instance_name,
-                    service_plan_name,
-                    create_time,
+                    app_name,
+                    app_index,
+                    str(0)
+                )
+                mem_utilization.add(
+                    space_name,
+                    app_name,
+                    app_index,
+                    str(0)
+                )
+                disk_utilization.add(
+                    space_name,
+                    app_name,
+                    app_index,
+                    str(0)
+                )
+                app_status.add(
+                    space_name,
+                    app_name,
+                    app_index,
                     created_by,
                     last_updated_by,
-                    bound
+                    status_text,
+                    up
                 )
-            )
 
-            service_plan = cf.service_plans.get(service_info['entity']['service_plan_guid']).json()
-            service_plan_cost = json.loads(service_plan['entity']['extra'])['costs'][0]['amount']['usd']
+    for app_info in apps:
+        for transition in ('start', 'stop', 'crash'):
+            count = app_state.transitions.get((app_info.guid, transition))
 
-            current_time = datetime.utcnow()
-            total_seconds_this_month = (datetime(current_time.year, current_time.month + 1, 1, 0, 0, 0, 0) - datetime(current_time.year, current_time.month, 1, 0, 0, 0, 0)).total_seconds()
-            seconds_this_month = (current_time - datetime(current_time.year, current_time.month, 1, 0, 0, 0, 0)).total_seconds()
-            seconds_since_creation = (current_time - datetime.strptime(service_info['metadata']['created_at'], "%Y-%m-%dT%H:%M:%SZ")).total_seconds()
+            if count:
+                app_state_transitions.add(spaces_facts[app_info.space_guid], app_info.name, transition, count)
 
-            if seconds_since_creation >= seconds_this_month:
-                seconds_charged = seconds_this_month
+    # service and service plan metrics
+    # looked up by instance, so an instance bound from a space another replica owns still counts as bound;
+    # bindings of the ssh-gateway app (which lives in the instance's space) don't count
+    ssh_gateways = set(a.guid for a in apps if a.name == 'ssh-gateway')
+    bound_instances = set()
 
-            else:
-                seconds_charged = seconds_since_creation
+    service_guids = [s.guid for s in services]
 
-            current_cost = service_plan_cost * (float(seconds_charged)/float(total_seconds_this_month))
+    for i in range(0, len(service_guids), ACTEE_BATCH_SIZE):  # batched like the space queries above
+        service_bindings_search_params = {
+            'q': 'service_instance_guid IN {}'.format(','.join(service_guids[i:i + ACTEE_BATCH_SIZE]))
+        }
 
-            service_instance_cost_block.append(
-                service_instance_cost.generate_metric(
-                    space_name,
-                    service_info['entity']['name'],
-                    bound,
-                    service_plan['entity']['name'],
-                    current_cost
-                )
-            )
-
-        return cpu_utilization.help + \
-               cpu_utilization.type + \
-               ''.join(cpu_utilization_block) + \
-               mem_utilization.help + \
-               mem_utilization.type + \
-               ''.join(mem_utilization_block) + \
-               disk_utilization.help + \
-               disk_utilization.type + \
-               ''.join(disk_utilization_block) + \
-               app_status.help + \
-               app_status.type + \
-               ''.join(app_status_block) + \
-               service_instance_status.help + \
-               service_instance_status.type + \
-               ''.join(service_instance_status_block) + \
-                service_instance_cost.help + \
-                service_instance_cost.type + \
-                ''.join(service_instance_cost_block)
-
-    return generate_response(cf, org)
-
-
-def quota_metrics(cf, org):
-    def generate_response(cf, org):
-        service_instance_quota_block = (
-            '# HELP service_instance_quota_usage The proportion of allowed service instances currently in use\n'
-            '# TYPE service_instance_quota_usage gauge\n'
-            'service_instance_quota_usage {service_instance_quota_usage}\n'
+        for binding in cf.service_bindings.iter(params=service_bindings_search_params, record=ServiceBinding, prefetch=True):
+            if binding.app_guid not in ssh_gateways:
+                bound_instances.add(binding.service_instance_guid)
+
+    # plan names and prices are cached across scrapes; costs are prorated for all instances at once below
+    service_plans = state.plans.plans(cf, [s.service_plan_guid for s in services])
+    costs = []
+
+    for service_info in services:
+        service_instance_guid = service_info.guid
+        space_name = spaces_facts[service_info.space_guid]
+        service_plan = service_plans[service_info.service_plan_guid]
+        service_plan_name, service_plan_cost = service_plan or ("NaN", float('nan'))
+        create_time = utc_to_epoch(service_info.created_at)
+        service_instance_name = service_info.name
+        created_by = actors.actor(service_instance_guid, 'audit.service_instance.create')
+        last_updated_by = actors.actor(service_instance_guid, 'audit.service_instance.update')
+
+        if service_instance_guid in bound_instances:
+            bound = str(1)
+
+        else:
+            bound = str(0)
+
+        service_instance_status.add(
+            space_name,
+            service_instance_name,
+            service_plan_name,
+            str(int(create_time)),
+            created_by,
+            last_updated_by,
+            bound
         )
 
-        routes_quota_block = (
-            '# HELP routes_quota_usage The proportion of allowed routes currently in use\n'
-            '# TYPE routes_quota_usage gauge\n'
-            'routes_quota_usage {routes_quota_usage}\n'
-        )
+        costs.append((space_name, service_instance_name, bound, service_plan_name, service_plan_cost, create_time))
 
-        private_domains_quota_block = (
-            '# HELP private_domains_quota_usage The proportion of allowed private domains currently in use\n'
-            '# TYPE private_domains_quota_usage gauge\n'
-            'private_domains_quota_usage {private_domains_quota_usage}\n'
-        )
+    current_costs = prorated_costs([c[4] for c in costs], [c[5] for c in costs])
+    space_costs = OrderedDict()
 
-        memory_quota_block = (
-            '# HELP memory_quota_usage The proportion of allocated memory currently in use\n'
-            '# TYPE memory_quota_usage gauge\n'
-            'memory_quota_usage {memory_quota_usage}\n'
+    for (space_name, service_instance_name, bound, service_plan_name, _, _), current_cost in zip(costs, current_costs):
+        service_instance_cost.add(
+            space_name,
+            service_instance_name,
+            bound,
+            service_plan_name,
+            current_cost
         )
 
-        app_instances_quota_block = (
-            '# HELP app_instances_quota_usage The proportion of allowed app instances currently in use\n'
-            '# TYPE app_instances_quota_usage gauge\n'
-            'app_instances_quota_usage {app_instances_quota_usage}\n'
-        )
+        if not math.isnan(current_cost):
+            space_costs[space_name] = space_costs.get(space_name, 0.0) + current_cost
 
-        service_keys_quota_block = (
-            '# HELP service_keys_quota_usage The proportion of allowed service keys currently in use\n'
-            '# TYPE service_keys_quota_usage gauge\n'
-            'service_keys_quota_usage {service_keys_quota_usage}\n'
-        )
+    for space_name, cost in space_costs.items():
+        space_service_cost.add(space_name, cost)
 
-        response = []
-        org_guid = _get_org_guid(cf, org)
-        org_info = cf.organizations.get(org_guid).json()
+    if state.shard is None:  # a replica only sees part of the org; sum the space costs instead
+        org_service_cost.add(sum(space_costs.values()))
 
-        if len(org_info) == 0:
-            return "ERROR: unknown organization '{}'".format(org), 404
+    app_stats_failures.add(state.stats.failures[org_guid])
 
-        quota_definition_guid = os.path.basename(org_info['entity']['quota_definition_url'])
-        org_quota_definition = cf.organization_quota_definitions.get(quota_definition_guid).json()
+    return registry
 
-        if org_quota_definition['entity']['total_services'] != -1:
-            total_service_instances = cf.service_instances.list().json()['total_results']
-            response.append(
-                service_instance_quota_block.format(
-                    service_instance_quota_usage=float(total_service_instances)/org_quota_definition['entity']['total_services']
-                )
-            )
 
-        if org_quota_definition['entity']['total_routes'] != -1:
-            total_routes = cf.routes.list().json()['total_results']
-            response.append(
-                routes_quota_block.format(
-                    routes_quota_usage=float(total_routes)/org_quota_definition['entity']['total_routes']
-                )
-            )
+QUOTA_USAGE_METRICS = (
+    ('service_instance_quota_usage', 'The proportion of allowed service instances currently in use', 'total_services'),
+    ('routes_quota_usage', 'The proportion of allowed routes currently in use', 'total_routes'),
+    ('private_domains_quota_usage', 'The proportion of allowed private domains currently in use', 'total_private_domains'),
+    ('memory_quota_usage', 'The proportion of allocated memory currently in use', 'memory_limit'),
+    ('app_instances_quota_usage', 'The proportion of allowed app instances currently in use', 'app_instance_limit'),
+    ('service_keys_quota_usage', 'The proportion of allowed service keys currently in use', 'total_service_keys')
+)
 
-        if org_quota_definition['entity']['total_private_domains'] != -1:
-            total_private_domains = cf.private_domains.list().json()['total_results']
-            response.append(
-                private_domains_quota_block.format(
-                    private_domains_quota_usage=float(total_private_domains)/org_quota_definition['entity']['total_private_domains']
-                )
-            )
 
-        if org_quota_definition['entity']['memory_limit'] != -1:
-            total_memory = cf.organizations.memory_usage(org_guid).json()['memory_usage_in_mb']
-            response.append(
-                memory_quota_block.format(
-                    memory_quota_usage=float(total_memory)/org_quota_definition['entity']['memory_limit']
-                )
-            )
+def quota_metrics(cf, org, openmetrics=False, state=None):
+    registry = MetricRegistry()
+    collect_quota_metrics(cf, org, registry, state=state)
 
-        if org_quota_definition['entity']['app_instance_limit'] != -1:
-            total_app_instances = cf.organizations.instance_usage(org_guid).json()['instance_usage']
-            response.append(
-                app_instances_quota_block.format(
-                    app_instances_quota_usage=float(total_app_instances)/org_quota_definition['entity']['app_instance_limit']
-                )
-            )
+    return registry.render(openmetrics)
 
-        if org_quota_definition['entity']['total_service_keys'] != -1:
-            total_service_keys = cf.service_keys.list().json()['total_results']
-            response.append(
-                service_keys_quota_block.format(
-                    service_keys_quota_usage=float(total_service_keys)/org_quota_definition['entity']['total_service_keys']
-                )
-            )
 
-        # total_reserved_route_ports = None  not sure how to find this info
-        # total_app_tasks = None not sure how to find this info
+def collect_quota_metrics(cf, org, registry, lookups=None, org_label=False, state=None):
+    lookups = lookups or Lookups(cf)
+    org_guid = lookups.org_guid(org)
+
+    if state is not None and state.shard is not None and not state.shard.owns(org_guid):
+        return registry  # another replica reports this org's quotas
+
+    org_info = cf.organizations.get(org_guid).json()
+    org_labels = ((org,), ('org_name',)) if org_label else ((), ())
+
+    quota_definition_guid = os.path.basename(org_info['entity']['quota_definition_url'])
+    org_quota_definition = cf.organization_quota_definitions.get(quota_definition_guid).json()
+
+    usage = {
+        'total_services': cf.service_instances.count,
+        'total_routes': cf.routes.count,
+        'total_private_domains': cf.private_domains.count,
+        'memory_limit': lambda: cf.organizations.memory_usage(org_guid).json()['memory_usage_in_mb'],
+        'app_instance_limit': lambda: cf.organizations.instance_usage(org_guid).json()['instance_usage'],
+        'total_service_keys': cf.service_keys.count
+    }
 
-        return ''.join(response)
+    for name, help, limit_name in QUOTA_USAGE_METRICS:
+        limit = org_quota_definition['entity'][limit_name]
 
-    return generate_response(cf, org)
+        if limit != -1:
+            registry.family(name, help, label_names=org_labels[1]).add(org_labels[0], float(usage[limit_name]())/limit)
 
+    # total_reserved_route_ports = None  not sure how to find this info
+    # total_app_tasks = None not sure how to find this info
 
-def _get_org_guid(cf, org):
-    org = filter(lambda x: True if x['entity']['name'] == org else False, cf.organizations.list().json()['resources'])
+    return registry
 
-    if len(org) == 0:
-        return "ERROR: unknown organization '{}'".format(org), 404
 
-    return org[-1]['metadata']['guid']
+def client_metrics(cf):
+    # latency, status and volume of the API calls made through cf, to append to the other expositions
+    return cf.metrics.collect(MetricRegistry()).render() if cf.metrics is not None else ''
 
 
 def _get_mysql_db_size(service_key):
@@ -0,0 +1,123 @@
+def _fields(**paths):
+    return tuple(sorted((name, tuple(path.split('.'))) for name, path in paths.items()))
+
+
+def _lookup(resource, path):
+    value = resource
+
+    for key in path:
+        if value is None:
+            return None
+
+        value = value.get(key)
+
+    return value
+
+
+class Record(object):
+    # a fixed-size projection of a v2 resource; fields maps each attribute to its path in the resource
+    __slots__ = ()
+    fields = ()
+
+    def __init__(self, resource):
+        for name, path in self.fields:
+            setattr(self, name, _lookup(resource, path))
+
+    @classmethod
+    def from_dict(cls, values):
+        record = cls.__new__(cls)
+
+        for name, _ in cls.fields:
+            setattr(record, name, values.get(name))
+
+        return record
+
+    def as_dict(self):
+        return dict((name, getattr(self, name)) for name, _ in self.fields)
+
+    def __repr__(self):
+        return '{}({})'.format(type(self).__name__, ', '.join('{}={!r}'.format(name, getattr(self, name)) for name, _ in self.fields))
+
+
+class Organization(Record):
+    fields = _fields(
+        guid='metadata.guid',
+        created_at='metadata.created_at',
+        name='entity.name',
+        status='entity.status',
+        quota_definition_guid='entity.quota_definition_guid'
+    )
+    __slots__ = tuple(name for name, _ in fields)
+
+
+class Space(Record):
+    fields = _fields(
+        guid='metadata.guid',
+        created_at='metadata.created_at',
+        name='entity.name',
+        organization_guid='entity.organization_guid'
+    )
+    __slots__ = tuple(name for name, _ in fields)
+
+
+class App(Record):
+    fields = _fields(
+        guid='metadata.guid',
+        created_at='metadata.created_at',
+        updated_at='metadata.updated_at',
+        name='entity.name',
+        space_guid='entity.space_guid',
+        state='entity.state',
+        instances='entity.instances',
+        memory='entity.memory',
+        disk_quota='entity.disk_quota'
+    )
+    __slots__ = tuple(name for name, _ in fields)
+
+
+class ServiceInstance(Record):
+    fields = _fields(
+        guid='metadata.guid',
+        created_at='metadata.created_at',
+        name='entity.name',
+        space_guid='entity.space_guid',
+        service_plan_guid='entity.service_plan_guid',
+        last_operation_state='entity.last_operation.state'
+    )
+    __slots__ = tuple(name for name, _ in fields)
+
+
+class ServicePlan(Record):
+    fields = _fields(
+        guid='metadata.guid',
+        name='entity.name',
+        service_guid='entity.service_guid',
+        extra='entity.extra'
+    )
+    __slots__ = tuple(name for name, _ in fields)
+
+
+class ServiceBinding(Record):
+    fields = _fields(
+        guid='metadata.guid',
+        created_at='metadata.created_at',
+        app_guid='entity.app_guid',
+        service_instance_guid='entity.service_instance_guid'
+    )
+    __slots__ = tuple(name for name, _ in fields)
+
+
+class Event(Record):
+    fields = _fields(
+        guid='metadata.guid',
+        type='entity.type',
+        actor='entity.actor',
+        actor_name='entity.actor_name',
+        actee='entity.actee',
+        actee_type='entity.actee_type',
+        actee_name='entity.actee_name',
+        timestamp='entity.timestamp',
+        space_guid='entity.space_guid',
+        organization_guid='entity.organization_guid'
+    )
+    __slots__ = tuple(name for name, _ in fields)
@@ -1,128 +1,362 @@
+from __future__ import absolute_import
+
+import re
 import json
+import time
 import requests
 import functools
 import logging
+from time import sleep
+from multiprocessing.pool import ThreadPool
+from . import codec
+from .batch import Batch, run_calls
+from .cache import ResponseCache, request_key
+from .metrics import ClientMetrics
+from .retry import RetryPolicy
+from .singleflight import SingleFlight
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+COUNT_TTL = 15  # seconds a count() result is reused for
+
+PAGE_PARAMETER = re.compile(r'([?&]page=)(\d+)')
+
+
+class ApiError(Exception):
+    def __init__(self, response):
+        super(ApiError, self).__init__("Couldn't call endpoint {}! (status code: {}, reason: {})".format(response.url, response.status_code, response.content))
+        self.response = response
+        self.status_code = response.status_code
+
+
+class Endpoint(object):
+    __slots__ = ('name', 'http_method', 'path_template', 'arg_count', 'kwargs', 'required_headers',
+                 'default_headers', 'default_params', 'default_data', 'expected_status', 'query_kwargs', 'implemented')
+
+    def __init__(self, name, endpoint, method_spec):
+        self.name = name
+        self.implemented = isinstance(method_spec, dict)
+
+        if not self.implemented:
+            return
+
+        self.http_method = method_spec['http_method']
+        self.path_template = ('/' + '/'.join([endpoint, method_spec['path_spec']])).rstrip('/')
+        self.arg_count = len(method_spec['args'])
+        self.kwargs = frozenset(method_spec['kwargs'])
+        self.required_headers = frozenset(method_spec.get('required_headers') or []) or None
+        self.default_headers = method_spec.get('default_headers')
+        self.default_params = method_spec.get('default_params')
+        self.default_data = method_spec.get('default_data')
+        self.expected_status = frozenset(method_spec['expected_status']) if method_spec.get('expected_status') else None
+        self.query_kwargs = frozenset(method_spec.get('query_kwargs') or [])  # keyword arguments sent as query parameters
+
+    def path(self, api_domain, args):
+        return api_domain + self.path_template % args
+
+    def bind(self, args, kwargs):
+        # validates a call against the spec and returns the request kwargs with the spec defaults applied
+        if not self.implemented:
+            raise NotImplementedError("Method '%s' appears not to have been implemented yet!" % self.name)
+
+        if len(args) != self.arg_count:
+            if self.arg_count > 1:
+                raise TypeError("%s() takes exactly %s arguments (%s given)" % (self.name, str(self.arg_count), str(len(args))))
+
+            else:
+                raise TypeError("%s() takes exactly 1 argument (%s given)" % (self.name, str(len(args))))
+
+        unknown_kwargs = [k for k in kwargs if k not in self.kwargs and k not in self.query_kwargs]
+
+        if unknown_kwargs:
+            raise TypeError("Unknown parameter(s) '%s' -- refer to the official Cloud Foundry API documentation for additional info." % ', '.join(unknown_kwargs))
+
+        query = [k for k in kwargs if k in self.query_kwargs]
+
+        if query:
+            params = dict(kwargs.get('params') or {})
+
+            for name in query:
+                params.update(encode_query(name, kwargs.pop(name)))
+
+            kwargs['params'] = params
+
+        if self.default_headers:
+            kwargs['headers'] = self.request_headers(kwargs.get('headers'))
+
+        if self.required_headers:
+            missing_headers = self.required_headers.difference(kwargs.get('headers') or {})
+
+            if missing_headers:
+                raise Exception("Required headers {} not provided in request!".format(', '.join(missing_headers)))
+
+        if self.default_params:
+            kwargs['params'] = _merge_defaults(self.default_params, kwargs.get('params'))
+
+        if self.default_data:
+            kwargs['data'] = _merge_defaults(self.default_data, kwargs.get('data'))
+
+        return kwargs
+
+
+    def request_headers(self, headers):
+        # the headers bind() sends: the given ones over the spec's defaults
+        return _merge_defaults(self.default_headers, headers) if self.implemented and self.default_headers else headers
+
+
+def compile_api_methods(api_spec):
+    return dict((name, Endpoint(name, api_spec['endpoint'], method_spec)) for name, method_spec in api_spec['api_methods'].items())
+
+
+def compile_api_spec(api_spec):
+    return dict((api, compile_api_methods(spec)) for api, spec in api_spec.items())
+
+
+def next_page_url(api_domain, page):
+    # v2 pages carry a relative next_url, v3 pages an absolute pagination.next.href
+    if 'pagination' in page:
+        next_link = page['pagination'].get('next')
+        return next_link['href'] if next_link else None
+
+    return api_domain.rstrip('/') + page['next_url'] if page.get('next_url') else None
+
+
+def page_number(next_url):
+    return int(PAGE_PARAMETER.search(next_url).group(2))
+
+
+def page_url(next_url, page):
+    # only the page number is replaced; re-encoding the whole query would mangle (or fail on) escaped unicode filters
+    return PAGE_PARAMETER.sub(lambda match: match.group(1) + str(page), next_url, count=1)
+
+
+def total_pages(page):
+    return page['pagination']['total_pages'] if 'pagination' in page else page['total_pages']
+
+
+def total_results(page):
+    return page['pagination']['total_results'] if 'pagination' in page else page['total_results']
+
+
+def encode_query(name, value):
+    # v3 style query values: lists become comma separated, dicts become name[key]=... (e.g. fields[space]=name,guid)
+    if isinstance(value, dict):
+        return [('{}[{}]'.format(name, key), encode_query(name, v)[0][1]) for key, v in sorted(value.items())]
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [(name, ','.join(str(v) for v in value))]
+
+    return [(name, str(value))]
+
+
+def _merge_defaults(defaults, given):
+    merged = dict(defaults)  # never mutate the shared spec defaults
+
+    if given:
+        merged.update(given)
+
+    return merged
+
 
 class ApiObjectWrapper(object):
-    def __init__(self, api_domain, api_spec, session, auth=None):
+    def __init__(self, api_domain, api_spec, session, auth=None, api_name=None, cache=None, retry_policy=None, endpoints=None, metrics=None, single_flight=None, count_cache=None):
         self.api_domain = api_domain
         self.api_spec = api_spec
         self.session = session
         self.auth = auth
-        
+        self.api_name = api_name
+        self.cache = cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.endpoints = endpoints if endpoints is not None else compile_api_methods(api_spec)
+        self.metrics = metrics
+        self.single_flight = single_flight
+        self.count_cache = count_cache
+
     def __getattr__(self, attribute):
-        if attribute in self.api_spec['api_methods'].keys():
-            return functools.partial(self._call_endpoint, attribute)
+        if attribute in self.__dict__.get('endpoints', ()):
+            method = functools.partial(self._call_endpoint, attribute)
+            self.__dict__[attribute] = method  # later lookups skip __getattr__ entirely
+            return method
 
         else:
             raise AttributeError("No such method '{}'!".format(attribute))
 
     def _call_endpoint(self, attribute, *args, **kwargs):
-        try:
-            given_args = len(args)
-            expected_args = len(self.api_spec['api_methods'][attribute]['args'])
+        endpoint = self.endpoints[attribute]
+        timeout = kwargs.pop('timeout', None)  # transport options rather than part of the api spec: seconds per attempt,
+        deadline = kwargs.pop('deadline', None)  # and seconds for the whole call, retries and backoff included
+        kwargs = endpoint.bind(args, kwargs)
 
-            given_kwargs = set(kwargs.keys())
-            expected_kwargs = set(self.api_spec['api_methods'][attribute]['kwargs'])
+        path = endpoint.path(self.api_domain, args)
+        deadline = time.time() + deadline if deadline is not None else None
+        send = functools.partial(self._send, endpoint.http_method, path, endpoint.expected_status, method_name=attribute, timeout=timeout, deadline=deadline, **kwargs)
 
-            if 'required_headers' in self.api_spec['api_methods'][attribute].keys():
-                required_headers = self.api_spec['api_methods'][attribute]['required_headers']
+        if endpoint.http_method is not requests.get:
+            response = send()
 
-            else:
-                required_headers = None
+            if self.cache is not None:
+                self.cache.invalidate(self.api_name)  # writes make cached reads of this api stale
 
-            if 'default_headers' in self.api_spec['api_methods'][attribute].keys():
-                default_headers = self.api_spec['api_methods'][attribute]['default_headers']
+            return response
 
-            else:
-                default_headers = None
+        key = request_key(self.api_name, endpoint.http_method, path, kwargs.get('params'), kwargs.get('headers'))
 
-            if 'default_params' in self.api_spec['api_methods'][attribute].keys():
-                default_params = self.api_spec['api_methods'][attribute]['default_params']
+        if self.cache is not None:
+            response = self.cache.get(key)
 
-            else:
-                default_params = None
+            if response is not None:
+                return response
 
-            if 'default_data' in self.api_spec['api_methods'][attribute].keys():
-                default_data = self.api_spec['api_methods'][attribute]['default_data']
+        if self.single_flight is not None:
+            response = self.single_flight.do(key, send)  # identical GETs already in flight share one request
 
-            else:
-                default_data = None
+        else:
+            response = send()
+
+        if self.cache is not None:
+            self.cache.set(key, response)
 
-        except TypeError as e:
-            raise NotImplementedError("Method '%s' appears not to have been implemented yet!" % attribute)
+        return response
 
-        if given_args == expected_args:
-                if given_kwargs.issubset(expected_kwargs):
-                    if default_headers:
-                        try:
-                            default_headers.update(kwargs['headers'])
+    def map(self, method, items, max_workers=8, **kwargs):
+        # calls one method for every item (a single positional arg or a tuple of them) over a thread pool
+        func = getattr(self, method)
+        calls = [(func, item if type(item) is tuple else (item,), kwargs) for item in items]
 
-                        except KeyError:
-                            pass
+        return run_calls(calls, max_workers)
 
-                        kwargs['headers'] = default_headers
+    def count(self, *args, **kwargs):
+        # the total_results of a list-style method, read from the smallest page the api will return
+        method = kwargs.pop('method', 'list')
+        endpoint = self.endpoints[method]
+        params = dict(kwargs.get('params') or {})
+        params['per_page' if endpoint.path_template.startswith('/v3/') else 'results-per-page'] = 1
+        kwargs['params'] = params
 
-                    if required_headers:
-                        req_set = set(required_headers)
-                        given_set = set(kwargs['headers'].keys())
+        key = request_key(self.api_name, endpoint.http_method, '{}#count'.format(endpoint.path(self.api_domain, args)), params, kwargs.get('headers'))
 
-                        if not req_set.issubset(given_set):
-                            raise Exception("Required headers {} not provided in request!".format(', '.join(list(req_set - given_set))))
+        def fetch():
+            if self.count_cache is not None:
+                count = self.count_cache.get(key)
 
-                    if default_params:
-                        try:
-                            default_params.update(kwargs['params'])
+                if count is not None:
+                    return count
 
-                        except KeyError:
-                            pass
+            count = total_results(self._call_endpoint(method, *args, **kwargs).json())
 
-                        kwargs['params'] = default_params
+            if self.count_cache is not None:
+                self.count_cache.set(key, count)
 
-                    if default_data:
-                        try:
-                            default_data.update(kwargs['data'])
+            return count
 
-                        except KeyError:
-                            pass
+        if self.single_flight is not None:
+            # the cache is read inside the flight, so a caller that missed it can't start a second request
+            # just after the first one has stored its count
+            return self.single_flight.do(key, fetch)
 
-                        kwargs['data'] = default_data
+        return fetch()
 
-                    path = '/'.join([self.api_domain, self.api_spec['endpoint'], self.api_spec['api_methods'][attribute]['path_spec']]).rstrip('/') % tuple(args)
-                    retries = 3
-                    while retries > 0:
-                        response = self._request(self.api_spec['api_methods'][attribute]['http_method'],
-                                            path,
-                                            **kwargs
-                                            )
+    def pages(self, *args, **kwargs):
+        # yields whole pages (v2 or v3); prefetch=True requests the next page while the current one is consumed
+        method = kwargs.pop('method', 'list')
+        prefetch = kwargs.pop('prefetch', False)
+        headers = self.endpoints[method].request_headers(kwargs.get('headers'))  # later pages need the spec's defaults too
 
-                        if response.status_code >= 400:
-                            retries -= 1
+        page = self._call_endpoint(method, *args, **kwargs).json()
+        pool = ThreadPool(1) if prefetch else None
 
-                        else:
-                            return response
+        try:
+            while True:
+                next_url = next_page_url(self.api_domain, page)
+                pending = None
 
-                    raise Exception("Couldn't call endpoint {}! (status code: {}, reason: {})".format(response.url, response.status_code, response.content))
+                if next_url and pool:
+                    pending = pool.apply_async(self._get_page, (next_url, headers, method))
 
-                else:
-                    raise TypeError("Unknown parameter(s) '%s' -- refer to the official Cloud Foundry API documentation for additional info." % ', '.join(list(given_kwargs.difference(expected_kwargs))))
+                yield page
 
-        else:
-            if expected_args > 1:
-                raise TypeError("%s() takes exactly %s arguments (%s given)" % (attribute, str(expected_args), str(given_args)))
+                if not next_url:
+                    break
+
+                page = pending.get() if pending else self._get_page(next_url, headers, method)
+
+        finally:
+            if pool:
+                pool.terminate()
+
+    def iter(self, *args, **kwargs):
+        # yields resources page by page; record=<callable> yields record(resource) instead of the raw resource dict
+        record = kwargs.pop('record', None)
+
+        for page in self.pages(*args, **kwargs):
+            for resource in page['resources']:
+                yield record(resource) if record else resource
+
+    def _get_page(self, url, headers=None, method_name=None):
+        return self._send(requests.get, url, method_name=method_name, headers=headers).json()
+
+    def _send(self, http_method, path, expected_status=None, method_name=None, deadline=None, **kwargs):
+        # deadline (epoch seconds) bounds every attempt's timeout and stops the retries once it has passed
+        policy = self.retry_policy
+        attempt = 0
+
+        while True:
+            response = None
+            error = None
+
+            if deadline is not None:
+                remaining = deadline - time.time()
+
+                if remaining <= 0:
+                    policy.record(attempt, failed=True)
+                    raise requests.exceptions.Timeout("{} {}: deadline passed before the request was sent".format(http_method.__name__.upper(), path))
+
+                kwargs['timeout'] = min(kwargs.get('timeout') or remaining, remaining)
+
+            try:
+                response = self._request(http_method, path, method_name=method_name, attempt=attempt, **kwargs)
+
+            except requests.exceptions.RequestException as e:
+                if not policy.should_retry(http_method, attempt, exception=e):
+                    policy.record(attempt, failed=True)
+                    raise
+
+                error = e
 
             else:
-                raise TypeError("%s() takes exactly 1 argument (%s given)" % (attribute, str(given_args)))
+                if policy.is_success(response):
+                    if not policy.is_expected(response, expected_status):
+                        logger.warning("{} {} returned {} (expected {})".format(http_method.__name__.upper(), path, response.status_code, ', '.join(map(str, sorted(expected_status)))))
 
-    def _request(self, request_type, path, headers=None, params=None, data=None):
+                    policy.record(attempt)
+                    response.retries = attempt
+                    response.json = functools.partial(codec.decode_response, response)  # memoized, pluggable decoding
+                    return response
+
+                if not policy.should_retry(http_method, attempt, response=response):
+                    policy.record(attempt, failed=True)
+                    raise ApiError(response)
+
+            delay = policy.backoff(attempt, response)
+
+            if deadline is not None and time.time() + delay >= deadline:  # no time left for another attempt
+                policy.record(attempt, failed=True)
+
+                if error is not None:
+                    raise error
+
+                raise ApiError(response)
+
+            logger.info("retrying {} {} in {:.2f}s (attempt {})".format(http_method.__name__.upper(), path, delay, attempt + 1))
+            sleep(delay)
+            attempt += 1
+
+    def _request(self, request_type, path, headers=None, params=None, data=None, method_name=None, attempt=0, timeout=None):
         request_data = data
 
         if type(data) is dict:
-            request_data = json.dumps(data)
+            request_data = codec.dumps(data)
 
         elif type(data) is str:
             request_data = data
@@ -134,17 +368,35 @@ class ApiObjectWrapper(object):
             raise ValueError("Request data must be either a string or a dictionary!")
 
         logger.info("request-headers: " + json.dumps(headers))
-        return self.session.request(request_type.__name__,
-                                path,
-                                headers=headers,
-                                params=params,
-                                data=request_data,
-                                auth=self.auth
-                                )
+        start = time.time()
+
+        try:
+            response = self.session.request(request_type.__name__,
+                                    path,
+                                    headers=headers,
+                                    params=params,
+                                    data=request_data,
+                                    auth=self.auth,
+                                    timeout=timeout
+                                    )
+
+        except requests.exceptions.RequestException:
+            if self.metrics is not None:
+                self.metrics.observe(self.api_name, method_name, 'error', attempt, time.time() - start)
+
+            raise
+
+        if self.metrics is not None:
+            self.metrics.observe(self.api_name, method_name, response.status_code, attempt, time.time() - start, len(response.content))
+
+        return response
 
 
 class ApiWrapper(object):
-    def __init__(self, api_domain=None, auth=None, session=None):
+    api_spec = None
+    endpoints = None  # api_spec compiled by compile_api_spec(); subclasses should share one at class level
+
+    def __init__(self, api_domain=None, auth=None, session=None, cache=None, retry_policy=None, metrics=None, single_flight=None, count_cache=None):
         if session:
             self.session = session
         else:
@@ -152,18 +404,26 @@ class ApiWrapper(object):
 
         self.auth = auth
         self.api_domain = api_domain
+        self.cache = cache
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.metrics = metrics if metrics is not None else ClientMetrics()
+        self.single_flight = single_flight if single_flight is not None else SingleFlight()
+        self.count_cache = count_cache if count_cache is not None else ResponseCache(ttl=COUNT_TTL)
 
     def __getattr__(self, item):
-        if 'api_spec' in self.__dict__.keys():
-            if item in self.__dict__['api_spec'].keys():
-                return ApiObjectWrapper(self.api_domain, self.api_spec[item], self.session, auth=self.auth)
+        if item.startswith('__') or self.api_spec is None:
+            raise AttributeError("No such attribute '{}'!".format(item))
 
-            else:
-                try:
-                    return self.__dict__[item]
+        if self.endpoints is None:
+            self.endpoints = compile_api_spec(self.api_spec)
 
-                except Exception:
-                    raise AttributeError("No such attribute '{}'!".format(item))
+        if item in self.endpoints:
+            api_object = ApiObjectWrapper(self.api_domain, self.api_spec[item], self.session, auth=self.auth, api_name=item, cache=self.cache, retry_policy=self.retry_policy, endpoints=self.endpoints[item], metrics=self.metrics, single_flight=self.single_flight, count_cache=self.count_cache)
+            self.__dict__[item] = api_object  # reused until one of the set_* methods changes what it was built from
+            return api_object
+
+        else:
+            raise AttributeError("No such attribute '{}'!".format(item))
 
     def metadata(self, api, method=None, attribute=None):
         if method:
@@ -187,10 +447,39 @@ class ApiWrapper(object):
             else:
                 return self.api_spec[api]
 
+    def batch(self, max_workers=8):
+        return Batch(self, max_workers=max_workers)
+
     def set_auth(self, auth):
         self.auth = auth
+        self._reset_api_objects()
 
     def set_api_domain(self, api_domain):
         self.api_domain = api_domain
+        self._reset_api_objects()
+
+    def set_cache(self, cache):
+        self.cache = cache
+        self._reset_api_objects()
+
+    def set_retry_policy(self, retry_policy):
+        self.retry_policy = retry_policy
+        self._reset_api_objects()
+
+    def set_metrics(self, metrics):
+        self.metrics = metrics
+        self._reset_api_objects()
+
+    def set_single_flight(self, single_flight):
+        self.single_flight = single_flight
+        self._reset_api_objects()
+
+    def set_count_cache(self, count_cache):
+        self.count_cache = count_cache
+        self._reset_api_objects()
+
+    def _reset_api_objects(self):
+        for api in self.endpoints or ():
+            self.__dict__.pop(api, None)
 
 
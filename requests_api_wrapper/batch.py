@@ -0,0 +1,97 @@
+import time
+from multiprocessing.pool import ThreadPool
+
+
+class BatchItem(object):
+    __slots__ = ('args', 'response', 'error', 'elapsed')
+
+    def __init__(self, args, response=None, error=None, elapsed=0.0):
+        self.args = args
+        self.response = response
+        self.error = error
+        self.elapsed = elapsed
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+class BatchResult(object):
+    def __init__(self, items, elapsed):
+        self.items = items
+        self.elapsed = elapsed
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __getitem__(self, index):
+        return self.items[index]
+
+    @property
+    def responses(self):
+        return [item.response for item in self.items]
+
+    @property
+    def errors(self):
+        return [item for item in self.items if not item.ok]
+
+    def stats(self):
+        call_times = [item.elapsed for item in self.items] or [0.0]
+
+        return {
+            'calls': len(self.items),
+            'failures': len(self.errors),
+            'elapsed': self.elapsed,
+            'call_time_total': sum(call_times),
+            'call_time_max': max(call_times)
+        }
+
+
+def _run_call(call):
+    func, args, kwargs = call
+    start = time.time()
+
+    try:
+        response = func(*args, **kwargs)
+
+    except Exception as e:  # reported per item so one failure doesn't sink the batch
+        return BatchItem(args, error=e, elapsed=time.time() - start)
+
+    return BatchItem(args, response=response, elapsed=time.time() - start)
+
+
+def run_calls(calls, max_workers=8):
+    start = time.time()
+
+    if max_workers > 1 and len(calls) > 1:
+        pool = ThreadPool(min(max_workers, len(calls)))
+
+        try:
+            items = pool.map(_run_call, calls)
+
+        finally:
+            pool.close()
+            pool.join()
+
+    else:
+        items = [_run_call(call) for call in calls]
+
+    return BatchResult(items, time.time() - start)
+
+
+class Batch(object):
+    def __init__(self, client, max_workers=8):
+        self.client = client
+        self.max_workers = max_workers
+        self._calls = []
+
+    def add(self, api, method, *args, **kwargs):
+        self._calls.append((getattr(getattr(self.client, api), method), args, kwargs))
+        return self
+
+    def run(self):
+        calls, self._calls = self._calls, []
+        return run_calls(calls, self.max_workers)
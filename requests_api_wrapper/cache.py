@@ -0,0 +1,72 @@
+import json
+import time
+import threading
+from collections import OrderedDict
+
+
+def request_key(api, http_method, path, params=None, headers=None):
+    return api, http_method.__name__.upper(), path, json.dumps(params, sort_keys=True), json.dumps(headers, sort_keys=True)
+
+
+class ResponseCache(object):
+    def __init__(self, ttl=30, max_size=1024, ttls=None):
+        self.ttl = ttl
+        self.ttls = ttls or {}  # per-api overrides, e.g. {'service_plans': 600}
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def key(self, api, http_method, path, params=None, headers=None):
+        return request_key(api, http_method, path, params, headers)
+
+    def get(self, key):
+        with self._lock:
+            try:
+                expires_at, response = self._entries.pop(key)
+
+            except KeyError:
+                self.misses += 1
+                return None
+
+            if expires_at < time.time():
+                self.misses += 1
+                return None
+
+            self._entries[key] = (expires_at, response)  # re-insert as most recently used
+            self.hits += 1
+
+            return response
+
+    def set(self, key, response):
+        ttl = self.ttls.get(key[0], self.ttl)
+
+        if ttl <= 0:
+            return
+
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.time() + ttl, response)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, api=None):
+        with self._lock:
+            if api is None:
+                self._entries.clear()
+
+            else:
+                for key in [k for k in self._entries.keys() if k[0] == api]:
+                    del self._entries[key]
+
+    def stats(self):
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'size': len(self._entries)
+        }
@@ -0,0 +1,224 @@
+import json
+import gzip
+import time
+import base64
+import threading
+from collections import defaultdict
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    from urlparse import urlsplit, urlunsplit, parse_qsl
+    from urllib import urlencode
+
+except ImportError:
+    from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+
+# requests has already decoded and de-chunked the body we store
+DROPPED_HEADERS = frozenset(['content-encoding', 'transfer-encoding', 'content-length'])
+
+# cassettes get shared, so nothing secret is stored: the UAA login's body (username and password, or a refresh
+# token) is dropped, and wherever these fields appear in a JSON body their values are replaced, at any depth: the
+# tokens the login answers with, service key and binding credentials, and app environment variables (v2 and v3)
+TOKEN_PATH = '/oauth/token'
+SECRET_FIELDS = frozenset([
+    'access_token', 'refresh_token', 'id_token',
+    'credentials',
+    'environment_json', 'system_env_json', 'application_env_json', 'staging_env_json', 'running_env_json',
+    'environment_variables', 'var'
+])
+REDACTED = 'redacted'
+
+
+class CassetteMiss(requests.exceptions.RequestException):
+    pass
+
+
+def _normalize_url(url):
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, query, ''))
+
+
+def _is_token_request(request):
+    return urlsplit(request.url).path.endswith(TOKEN_PATH)
+
+
+def _body(request):
+    if _is_token_request(request):  # token requests are matched without their body
+        return ''
+
+    body = request.body or b''
+
+    if not isinstance(body, bytes):
+        body = body.encode('utf-8')
+
+    return base64.b64encode(_redact_secrets(body)).decode('ascii')  # replayed requests are redacted the same way
+
+
+def _redact(value):
+    # returns a copy of a decoded JSON value with the secret fields replaced, and whether any were
+    if isinstance(value, dict):
+        redacted = {}
+        found = False
+
+        for k, v in value.items():
+            if k in SECRET_FIELDS:
+                redacted[k], found = REDACTED, True
+
+            else:
+                redacted[k], nested = _redact(v)
+                found = found or nested
+
+        return redacted, found
+
+    if isinstance(value, list):
+        items = [_redact(v) for v in value]
+        return [v for v, _ in items], any(nested for _, nested in items)
+
+    return value, False
+
+
+def _redact_secrets(content):
+    # bodies without secret fields (or that aren't JSON) are stored exactly as they were
+    try:
+        data = json.loads(content.decode('utf-8'))
+
+    except ValueError:
+        return content
+
+    data, found = _redact(data)
+
+    return json.dumps(data).encode('utf-8') if found else content
+
+
+def _match_key(request):
+    return request.method.upper(), _normalize_url(request.url), _body(request)
+
+
+class Cassette(object):
+    def __init__(self, interactions=None):
+        self.interactions = interactions or []
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        with gzip.open(path, 'rb') as f:
+            return cls(json.loads(f.read().decode('utf-8')))
+
+    def save(self, path):
+        with self._lock:
+            data = json.dumps(self.interactions)
+
+        with gzip.open(path, 'wb') as f:
+            f.write(data.encode('utf-8'))
+
+    def append(self, request, response, elapsed):
+        method, url, body = _match_key(request)
+        content = _redact_secrets(response.content)
+        interaction = {
+            'request': {'method': method, 'url': url, 'body': body},
+            'response': {
+                'status_code': response.status_code,
+                'reason': response.reason,
+                'headers': dict((k, v) for k, v in response.headers.items() if k.lower() not in DROPPED_HEADERS),
+                'content': base64.b64encode(content).decode('ascii'),
+                'elapsed': elapsed
+            }
+        }
+
+        with self._lock:
+            self.interactions.append(interaction)
+
+
+class RecordingAdapter(BaseAdapter):
+    def __init__(self, cassette, adapter=None):
+        super(RecordingAdapter, self).__init__()
+        self.cassette = cassette
+        self.adapter = adapter or HTTPAdapter()
+
+    def send(self, request, **kwargs):
+        start = time.time()
+        response = self.adapter.send(request, **kwargs)
+        self.cassette.append(request, response, time.time() - start)  # reading .content here loads the body
+
+        return response
+
+    def close(self):
+        self.adapter.close()
+
+
+class ReplayAdapter(BaseAdapter):
+    def __init__(self, cassette, latency=0.0, recorded_latency=False):
+        super(ReplayAdapter, self).__init__()
+        self.latency = latency
+        self.recorded_latency = recorded_latency
+        self._responses = defaultdict(list)
+        self._served = defaultdict(int)
+        self._lock = threading.Lock()
+
+        for interaction in cassette.interactions:
+            request = interaction['request']
+            self._responses[(request['method'], request['url'], request['body'])].append(interaction['response'])
+
+    def send(self, request, **kwargs):
+        key = _match_key(request)
+
+        with self._lock:
+            recorded = self._responses.get(key)
+
+            if not recorded:
+                raise CassetteMiss("No recorded response for {} {}".format(request.method, request.url), request=request)
+
+            # identical requests are answered in recording order, the last answer repeating once they run out
+            recorded = recorded[min(self._served[key], len(recorded) - 1)]
+            self._served[key] += 1
+
+        delay = self.latency + (recorded['elapsed'] if self.recorded_latency else 0)
+
+        if delay > 0:
+            time.sleep(delay)
+
+        response = requests.models.Response()
+        response.status_code = recorded['status_code']
+        response.reason = recorded['reason']
+        response.headers = CaseInsensitiveDict(recorded['headers'])
+        response.encoding = get_encoding_from_headers(response.headers)
+        response._content = base64.b64decode(recorded['content'])
+        response.url = request.url
+        response.request = request
+
+        return response
+
+    def close(self):
+        pass
+
+
+def _mount(client, adapter):
+    session = getattr(client, 'session', client)  # a client, or a requests.Session to build one with
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+
+
+def record(client, cassette=None):
+    # capture every request the client's session makes; call cassette.save(path) when done. To capture the
+    # login as well, pass a requests.Session and build the client with it: CloudFoundry(..., session=session)
+    cassette = cassette if cassette is not None else Cassette()
+    _mount(client, RecordingAdapter(cassette))
+
+    return cassette
+
+
+def replay(client, cassette, latency=0.0, recorded_latency=False):
+    # serve the client's requests from a cassette (or the path of a saved one) instead of the network
+    if not isinstance(cassette, Cassette):
+        cassette = Cassette.load(cassette)
+
+    _mount(client, ReplayAdapter(cassette, latency=latency, recorded_latency=recorded_latency))
+
+    return cassette
@@ -0,0 +1,62 @@
+import os
+import json
+
+try:
+    import orjson
+
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+
+except ImportError:
+    ujson = None
+
+
+def _orjson_dumps(obj):
+    return orjson.dumps(obj).decode('utf-8')
+
+
+BACKENDS = {
+    'json': (json.loads, json.dumps)
+}
+
+if ujson is not None:
+    BACKENDS['ujson'] = (ujson.loads, ujson.dumps)
+
+if orjson is not None:
+    BACKENDS['orjson'] = (orjson.loads, _orjson_dumps)
+
+PREFERRED_BACKENDS = ('orjson', 'ujson', 'json')
+
+backend = None
+loads = None
+dumps = None
+
+
+def set_backend(name=None):
+    # picks the fastest installed backend unless one is named (or set in PYCF_JSON_CODEC)
+    global backend, loads, dumps
+
+    if name is None:
+        name = [b for b in PREFERRED_BACKENDS if b in BACKENDS][0]
+
+    if name not in BACKENDS:
+        raise ValueError("JSON codec '{}' is not available!".format(name))
+
+    backend = name
+    loads, dumps = BACKENDS[name]
+
+
+def decode_response(response):
+    # decodes a response body once, however many times it is asked for
+    try:
+        return response._decoded_json
+
+    except AttributeError:
+        response._decoded_json = loads(response.content)
+        return response._decoded_json
+
+
+set_backend(os.environ.get('PYCF_JSON_CODEC'))
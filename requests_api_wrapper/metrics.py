@@ -0,0 +1,58 @@
+import threading
+from collections import defaultdict
+
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class ClientMetrics(object):
+    label_names = ('api', 'method', 'status', 'attempt')
+
+    def __init__(self, prefix='pycf_api', buckets=DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(sorted(buckets))
+        self._requests = defaultdict(int)
+        self._duration_buckets = defaultdict(lambda: [0] * len(self.buckets))
+        self._duration_sum = defaultdict(float)
+        self._bytes = defaultdict(int)
+        self._lock = threading.Lock()
+
+    def observe(self, api, method, status, attempt, duration, received_bytes=0):
+        key = (api, method, str(status), attempt)
+
+        with self._lock:
+            self._requests[key] += 1
+            self._duration_sum[key] += duration
+            self._bytes[(api, method)] += received_bytes
+
+            counts = self._duration_buckets[key]
+            for i, bound in enumerate(self.buckets):
+                if duration <= bound:
+                    counts[i] += 1
+
+    def _snapshot(self):
+        with self._lock:
+            return sorted(self._requests.items()), dict(self._duration_buckets), dict(self._duration_sum), sorted(self._bytes.items())
+
+    def collect(self, registry):
+        # adds these metrics to a metric family registry (anything with pycf.exposition.MetricRegistry's family()/add())
+        requests, duration_buckets, duration_sum, received = self._snapshot()
+
+        family = registry.family(self.prefix + '_requests_total', 'Requests sent to the API, by endpoint, status and retry attempt', 'counter', self.label_names)
+        for key, count in requests:
+            family.add(key, count)
+
+        family = registry.family(self.prefix + '_request_duration_seconds', 'Latency of requests sent to the API', 'histogram', self.label_names)
+        for key, count in requests:
+            for bound, bucket_count in zip(self.buckets, duration_buckets[key]):
+                family.add(key, bucket_count, '_bucket', (('le', bound),))
+
+            family.add(key, count, '_bucket', (('le', '+Inf'),))
+            family.add(key, duration_sum[key], '_sum')
+            family.add(key, count, '_count')
+
+        family = registry.family(self.prefix + '_response_bytes_total', 'Response body bytes received from the API', 'counter', self.label_names[:2])
+        for key, count in received:
+            family.add(key, count)
+
+        return registry
@@ -0,0 +1,81 @@
+import time
+import random
+import threading
+import requests
+from email.utils import parsedate_tz, mktime_tz
+
+
+IDEMPOTENT_METHODS = frozenset(['GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'])
+TRANSIENT_STATUSES = frozenset([408, 429, 500, 502, 503, 504])
+TRANSIENT_ERRORS = (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+class RetryPolicy(object):
+    def __init__(self, max_retries=3, backoff_factor=0.5, max_backoff=30, retry_statuses=TRANSIENT_STATUSES, retry_methods=IDEMPOTENT_METHODS, transient_errors=TRANSIENT_ERRORS):
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.max_backoff = max_backoff
+        self.retry_statuses = frozenset(retry_statuses)
+        self.retry_methods = frozenset(m.upper() for m in retry_methods)
+        self.transient_errors = tuple(transient_errors)
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def is_success(self, response):
+        # any 2xx; the spec's expected_status is narrower than what the Cloud Controller answers in places
+        # (e.g. 202 for async deletes and accepts_incomplete requests), so it's only used for is_expected()
+        return 200 <= response.status_code < 300
+
+    def is_expected(self, response, expected_status=None):
+        return not expected_status or response.status_code in expected_status
+
+    def should_retry(self, http_method, attempt, response=None, exception=None):
+        if attempt >= self.max_retries or http_method.__name__.upper() not in self.retry_methods:
+            return False
+
+        if exception is not None:
+            return isinstance(exception, self.transient_errors)
+
+        return response.status_code in self.retry_statuses
+
+    def backoff(self, attempt, response=None):
+        retry_after = self._retry_after(response)
+
+        if retry_after is not None:
+            return min(retry_after, self.max_backoff)
+
+        # "full jitter": spread concurrent clients out instead of retrying in lockstep
+        return random.uniform(0, min(self.max_backoff, self.backoff_factor * (2 ** attempt)))
+
+    def record(self, retries, failed=False):
+        with self._lock:
+            self.calls += 1
+            self.retries += retries
+
+            if failed:
+                self.failures += 1
+
+    def stats(self):
+        return {
+            'calls': self.calls,
+            'retries': self.retries,
+            'failures': self.failures
+        }
+
+    def _retry_after(self, response):
+        if response is None or 'Retry-After' not in response.headers:
+            return None
+
+        value = response.headers['Retry-After'].strip()
+
+        if value.isdigit():
+            return float(value)
+
+        parsed = parsedate_tz(value)
+
+        if parsed is None:
+            return None
+
+        return max(0, mktime_tz(parsed) - time.time())
@@ -0,0 +1,60 @@
+import threading
+
+
+class _Call(object):
+    __slots__ = ('event', 'result', 'error')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    def __init__(self):
+        self.calls = 0
+        self.shared = 0
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, func):
+        # runs func once per key at a time; callers arriving meanwhile wait for and share its outcome
+        with self._lock:
+            self.calls += 1
+            call = self._in_flight.get(key)
+            leader = call is None
+
+            if leader:
+                call = self._in_flight[key] = _Call()
+
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.event.wait()
+
+            if call.error is not None:
+                raise call.error
+
+            return call.result
+
+        try:
+            call.result = func()
+
+        except Exception as e:
+            call.error = e
+            raise
+
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+            call.event.set()
+
+        return call.result
+
+    def stats(self):
+        return {
+            'calls': self.calls,
+            'shared': self.shared
+        }
@@ -0,0 +1,123 @@
+import os
+import time
+import bisect
+import socket
+import hashlib
+import threading
+
+from pycf.utils import write_stdout
+
+
+REPLICAS_KEY = 'pycf:exporter:replicas'  # sorted set: replica id -> time of its last heartbeat
+HEARTBEAT_TTL = 180  # seconds without a heartbeat after which a replica is dropped from the ring
+VIRTUAL_NODES = 128  # points per replica on the ring, so slices stay even with few replicas
+
+
+def _hash(key):
+    if isinstance(key, unicode):
+        key = key.encode('utf-8')
+
+    return int(hashlib.md5(key).hexdigest()[:16], 16)
+
+
+def default_replica_id():
+    # unique per app instance on cloudfoundry, per pod on kubernetes
+    return os.environ.get('CF_INSTANCE_GUID') or '{}:{}'.format(socket.gethostname(), os.getpid())
+
+
+class HashRing(object):
+    def __init__(self, members, vnodes=VIRTUAL_NODES):
+        self.members = frozenset(members)
+        points = sorted((_hash('{}#{}'.format(member, i)), member) for member in self.members for i in range(vnodes))
+        self._hashes = [h for h, _ in points]
+        self._owners = [member for _, member in points]
+
+    def owner(self, key):
+        if not self._hashes:
+            return None
+
+        return self._owners[bisect.bisect(self._hashes, _hash(key)) % len(self._hashes)]
+
+
+class ExporterShard(object):
+    # the slice of spaces (and orgs, for org-level metrics) this exporter replica reports on. Replicas announce
+    # themselves in redis, and on every heartbeat() each one builds the same consistent-hash ring from the live
+    # ones, so the replicas' series are disjoint and a replica joining or leaving only moves its own share.
+    # Between heartbeats a keepalive thread (start()) keeps announcing, so a collection that takes longer than
+    # the ttl doesn't drop the replica from the others' rings. Until the replicas have seen the same membership
+    # (at most one collection interval) slices can overlap or miss a space
+    def __init__(self, db, replica_id=None, ttl=HEARTBEAT_TTL, key=REPLICAS_KEY):
+        self.db = db
+        self.replica_id = replica_id or default_replica_id()
+        self.ttl = ttl
+        self.key = key
+        self.ring = HashRing([self.replica_id])  # everything is ours until we've seen the others
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def announce(self):
+        # the live replicas, this one included; None if redis can't be reached
+        now = time.time()
+
+        try:
+            pipe = self.db.pipeline()
+            pipe.zadd(self.key, {self.replica_id: now})
+            pipe.zremrangebyscore(self.key, '-inf', now - self.ttl)
+            pipe.zrange(self.key, 0, -1)
+            members = set(pipe.execute()[-1])
+
+        except Exception as e:
+            write_stdout("WARNING: shard heartbeat failed: {} raised! Message: {}".format(type(e).__name__, e))
+            return None
+
+        members.add(self.replica_id)
+
+        return members
+
+    def heartbeat(self):
+        # announces this replica and rebuilds the ring from the live ones; called when a collection starts
+        members = self.announce()
+
+        with self._lock:
+            if members is None:  # keep the last known ring rather than stop collecting
+                return self.ring
+
+            if members != self.ring.members:
+                write_stdout("Rebalancing metrics across {} replica(s)".format(len(members)))
+                self.ring = HashRing(members)
+
+            return self.ring
+
+    def start(self, interval=None):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._keepalive, args=(interval or self.ttl / 3.0,))
+        self._thread.daemon = True
+        self._thread.start()
+
+        return self
+
+    def stop(self):
+        # hands this replica's slice to the others on their next heartbeat instead of after the ttl
+        self._stop.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        self.leave()
+
+    def leave(self):
+        # best effort: if redis can't be reached the others drop this replica once its heartbeat expires
+        try:
+            self.db.zrem(self.key, self.replica_id)
+
+        except Exception as e:
+            write_stdout("WARNING: shard leave failed: {} raised! Message: {}".format(type(e).__name__, e))
+
+    def owns(self, key):
+        return self.ring.owner(key) == self.replica_id
+
+    def _keepalive(self, interval):
+        while not self._stop.wait(interval):
+            self.announce()
@@ -0,0 +1,35 @@
+import threading
+from collections import defaultdict
+
+from pycf.utils import write_stdout
+
+
+STATS_WORKERS = 16
+STATS_TIMEOUT = 10  # seconds per stats call, retries included
+
+
+class AppStatsCollector(object):
+    # fetches cf.apps.stats() for many apps at once; an app whose call fails or times out maps to None
+    # instead of failing the whole scrape, and is counted in failures
+    def __init__(self, workers=STATS_WORKERS, timeout=STATS_TIMEOUT):
+        self.workers = workers
+        self.timeout = timeout
+        self.failures = defaultdict(int)  # org guid (or None) -> failures, cumulative across scrapes
+        self._lock = threading.Lock()
+
+    def collect(self, cf, app_guids, org_guid=None):
+        results = cf.apps.map('stats', app_guids, max_workers=self.workers, deadline=self.timeout)
+        stats = {}
+
+        for guid, result in zip(app_guids, results):
+            if result.ok:
+                stats[guid] = result.response.json()
+
+            else:
+                write_stdout("WARNING: couldn't get stats for app {}: {} raised! Message: {}".format(guid, type(result.error).__name__, result.error))
+                stats[guid] = None
+
+        with self._lock:
+            self.failures[org_guid] += len(results.errors)
+
+        return stats
@@ -0,0 +1,3 @@
+import logging
+
+logging.disable(logging.INFO)  # the client logs every request's headers at INFO
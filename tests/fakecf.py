@@ -0,0 +1,211 @@
+import re
+import json
+import threading
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+try:
+    from urlparse import urlsplit, parse_qs
+    from urllib import urlencode
+
+except ImportError:
+    from urllib.parse import urlsplit, parse_qs, urlencode
+
+
+API_DOMAIN = 'http://cf.test'
+
+QUERY_PATTERN = re.compile(r'^([a-z_]+)\s*( IN |>=|<=|>|<|:)\s*(.*)$')
+
+
+class FakeAuth(requests.auth.AuthBase):
+    access_token = 'bearer test'
+
+    def __call__(self, r):
+        r.headers['Authorization'] = self.access_token
+        return r
+
+
+def resource(guid, created_at='2026-01-01T00:00:00Z', **entity):
+    return {'metadata': {'guid': guid, 'created_at': created_at}, 'entity': entity}
+
+
+class FakeCloudController(BaseAdapter):
+    # a v2 Cloud Controller answering from in-memory collections, mounted on a client's session in place of the network.
+    # Lists support q filters (':', ' IN ', comparisons), paging, order-direction and after_guid; routes() adds
+    # handlers for anything else, e.g. app stats
+    def __init__(self, page_size=50):
+        super(FakeCloudController, self).__init__()
+        self.data = {}
+        self.calls = []
+        self.timeouts = []  # the timeout each request was sent with
+        self.page_size = page_size
+        self.handlers = []
+        self._lock = threading.Lock()
+
+    def add(self, kind, *resources):
+        self.data.setdefault(kind, []).extend(resources)
+
+    def route(self, method, pattern, handler):
+        # handler(request, match) returns (status, body) or None to fall through to the collections
+        self.handlers.insert(0, (method, re.compile(pattern + '$'), handler))
+
+    def paths(self, prefix=''):
+        return [path for method, path in self.calls if path.startswith(prefix)]
+
+    def send(self, request, **kwargs):
+        url = urlsplit(request.url)
+
+        with self._lock:
+            self.calls.append((request.method, url.path + ('?' + url.query if url.query else '')))
+            self.timeouts.append(kwargs.get('timeout'))
+
+        for method, pattern, handler in self.handlers:
+            match = pattern.match(url.path)
+
+            if method == request.method and match:
+                answer = handler(request, match)
+
+                if answer is not None:
+                    return self._response(request, *answer)
+
+        if request.method != 'GET':
+            return self._response(request, 404, {'code': 10000, 'description': 'not found'})
+
+        return self._response(request, *self._get(url.path, parse_qs(url.query)))
+
+    def close(self):
+        pass
+
+    def _get(self, path, query):
+        parts = path.strip('/').split('/')[1:]
+        resources = self.data.get(parts[0], [])
+
+        if len(parts) == 2:
+            for r in resources:
+                if r['metadata']['guid'] == parts[1]:
+                    return 200, r
+
+            return 404, {'code': 10000, 'description': 'not found'}
+
+        if len(parts) > 2:
+            return 404, {'code': 10000, 'description': 'not found'}
+
+        resources = self._filter(resources, query.get('q', []))
+
+        if 'after_guid' in query:
+            guids = [r['metadata']['guid'] for r in resources]
+            after = query['after_guid'][0]
+            resources = resources[guids.index(after) + 1:] if after in guids else []
+
+        if query.get('order-direction', ['asc'])[0] == 'desc':
+            resources = list(reversed(resources))
+
+        per_page = int(query.get('results-per-page', [self.page_size])[0])
+        page = int(query.get('page', [1])[0])
+        pages = max(1, (len(resources) + per_page - 1) // per_page)
+        next_url = None
+
+        if page < pages:
+            next_query = dict((k, v[0]) for k, v in query.items())
+            next_query.update({'page': str(page + 1), 'results-per-page': str(per_page)})
+            next_url = path + '?' + urlencode(sorted(next_query.items()))
+
+        return 200, {
+            'total_results': len(resources),
+            'total_pages': pages,
+            'next_url': next_url,
+            'prev_url': None,
+            'resources': resources[(page - 1) * per_page:page * per_page]
+        }
+
+    def _filter(self, resources, clauses):
+        for clause in clauses:
+            field, operator, value = QUERY_PATTERN.match(clause).groups()
+            value = value.decode('utf-8') if isinstance(value, bytes) else value  # python 2 parses queries into utf-8 bytes
+            get = lambda r: self._field(r, field)
+
+            if operator == ' IN ':
+                values = set(value.split(','))
+                resources = [r for r in resources if get(r) in values]
+
+            elif operator == ':':
+                resources = [r for r in resources if get(r) == value]
+
+            else:
+                compare = {'>=': lambda a, b: a >= b, '<=': lambda a, b: a <= b, '>': lambda a, b: a > b, '<': lambda a, b: a < b}[operator]
+                resources = [r for r in resources if compare(get(r) or '', value)]
+
+        return resources
+
+    def _field(self, r, field):
+        if field in r['entity']:
+            return r['entity'][field]
+
+        if field == 'timestamp':
+            return r['metadata']['created_at']
+
+        if field == 'organization_guid' and 'space_guid' in r['entity']:
+            for space in self.data.get('spaces', []):
+                if space['metadata']['guid'] == r['entity']['space_guid']:
+                    return space['entity']['organization_guid']
+
+        return r['metadata'].get(field)
+
+    def _response(self, request, status, body):
+        response = requests.models.Response()
+        response.status_code = status
+        response.reason = 'OK' if status < 400 else 'Error'
+        response.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+        response.encoding = 'utf-8'
+        response._content = json.dumps(body).encode('utf-8')
+        response.url = request.url
+        response.request = request
+
+        return response
+
+
+def event(guid, type, actee, actee_type='app', timestamp='2026-01-01T00:00:00Z', actor_name='someone', **entity):
+    entity.update(type=type, actee=actee, actee_type=actee_type, timestamp=timestamp, actor_name=actor_name)
+    return resource(guid, created_at=timestamp, **entity)
+
+
+def foundation(fake=None):
+    # one org with two spaces, three apps and two service instances; no events yet
+    fake = fake if fake is not None else FakeCloudController()
+    fake.add('organizations', resource('org1', name='myorg', quota_definition_guid='q1', quota_definition_url='/v2/quota_definitions/q1'))
+    fake.add('spaces', resource('sp0', name='dev', organization_guid='org1'), resource('sp1', name='prod', organization_guid='org1'))
+    fake.add('apps',
+             resource('app0', name='web', space_guid='sp0', state='STARTED', instances=2),
+             resource('app1', name='batch', space_guid='sp1', state='STOPPED', instances=1),
+             resource('app2', name='api', space_guid='sp1', state='STARTED', instances=1))
+    fake.add('service_plans',
+             resource('plan0', name='small', extra=json.dumps({'costs': [{'amount': {'usd': 10.0}}]})),
+             resource('plan1', name='large', extra=json.dumps({'costs': [{'amount': {'usd': 20.0}}]})))
+    fake.add('service_instances',
+             resource('si0', created_at='2026-01-01T00:00:00Z', name='db', space_guid='sp0', service_plan_guid='plan0'),
+             resource('si1', created_at='2026-01-01T00:00:00Z', name='cache', space_guid='sp1', service_plan_guid='plan1'))
+    fake.add('service_bindings', resource('sb0', app_guid='app0', service_instance_guid='si0'))
+
+    for kind in ('events', 'app_usage_events', 'service_usage_events', 'service_keys', 'routes', 'private_domains'):
+        fake.add(kind)
+
+    return fake
+
+
+def mount(session, fake):
+    session.mount('http://', fake)
+    session.mount('https://', fake)
+
+    return fake
+
+
+def client(fake=None, cls=None, **kwargs):
+    # a CloudFoundry client whose requests all go to fake
+    from pycf.cloudfoundry import CloudFoundry
+
+    cf = (cls or CloudFoundry)(api_domain=API_DOMAIN, auth=FakeAuth(), **kwargs)
+    mount(cf.session, fake if fake is not None else FakeCloudController())
+
+    return cf
@@ -0,0 +1,128 @@
+import sys
+import json
+import threading
+import unittest
+
+try:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+    from urllib.parse import urlsplit, parse_qs
+
+except ImportError:  # python 2: the asyncio client isn't available, see skipIf below
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+    from urlparse import urlsplit, parse_qs
+
+
+APPS = [{'metadata': {'guid': 'app%d' % i}, 'entity': {'name': 'app%d' % i}} for i in range(7)]
+PAGE_SIZE = 3
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlsplit(self.path)
+        self.server.calls.append(self.path)
+
+        if url.path == '/v2/info':
+            return self._reply(200, {'authorization_endpoint': self.server.url})
+
+        if self.headers.get('Authorization') != 'bearer token1':
+            return self._reply(401, {})
+
+        if url.path == '/v2/apps/flaky' and self.server.failures:
+            self.server.failures -= 1
+            return self._reply(503, {})
+
+        if url.path == '/v2/apps':
+            page = int(parse_qs(url.query).get('page', ['1'])[0])
+            pages = (len(APPS) + PAGE_SIZE - 1) // PAGE_SIZE
+            return self._reply(200, {
+                'total_results': len(APPS),
+                'total_pages': pages,
+                'next_url': '/v2/apps?page={}'.format(page + 1) if page < pages else None,
+                'resources': APPS[(page - 1) * PAGE_SIZE:page * PAGE_SIZE]
+            })
+
+        self._reply(200, {'metadata': {'guid': url.path.split('/')[-1]}})
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.calls.append(self.path)
+        self._reply(200, {'token_type': 'bearer', 'access_token': 'token1', 'refresh_token': 'r', 'expires_in': 3600})
+
+    def _reply(self, status, body):
+        body = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+@unittest.skipIf(sys.version_info[0] < 3, 'pycf.aio needs python 3')
+class AsyncCloudFoundryTest(unittest.TestCase):
+    def setUp(self):
+        import asyncio
+        from pycf.aio import AsyncCloudFoundry
+        from pycf.requests_api_wrapper.retry import RetryPolicy
+
+        self.server = Server(('127.0.0.1', 0), Handler)
+        self.server.url = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+        self.server.calls = []
+        self.server.failures = 0
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.cf = AsyncCloudFoundry(api_domain=self.server.url, username='u', password='p', retry_policy=RetryPolicy(backoff_factor=0))
+
+    def tearDown(self):
+        import asyncio
+
+        self.loop.run_until_complete(self.cf.close())
+        self.loop.close()
+        asyncio.set_event_loop(None)
+        self.server.shutdown()
+        self.server.server_close()
+
+    def run_async(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_logs_in_once_and_calls_the_spec_path(self):
+        import asyncio
+
+        responses = self.run_async(asyncio.gather(self.cf.apps.get('a'), self.cf.apps.get('b')))
+
+        self.assertEqual([r.json()['metadata']['guid'] for r in responses], ['a', 'b'])
+        self.assertEqual(self.server.calls.count('/oauth/token'), 1)
+
+    def test_list_all_fetches_every_page(self):
+        resources = self.run_async(self.cf.apps.list_all())
+
+        self.assertEqual([r['metadata']['guid'] for r in resources], ['app%d' % i for i in range(7)])
+
+    def test_transient_errors_are_retried(self):
+        self.server.failures = 2
+
+        response = self.run_async(self.cf.apps.get('flaky'))
+
+        self.assertEqual(response.retries, 2)
+
+    def test_list_params_are_sent_as_repeated_parameters(self):
+        self.run_async(self.cf.apps.list(params={'q': ['name:app1', 'space_guid:s1'], 'results-per-page': 3}))
+
+        query = parse_qs(urlsplit(self.server.calls[-1]).query)
+
+        self.assertEqual(query['q'], ['name:app1', 'space_guid:s1'])
+        self.assertEqual(query['results-per-page'], ['3'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+import time
+import threading
+import unittest
+
+from pycf.app_state import AppStateTracker
+from pycf.prometheus import CollectionState, app_metrics
+from .fakecf import client, event, foundation, resource
+
+
+def usage(guid, app_guid, state, org_guid='org1'):
+    return resource(guid, app_guid=app_guid, state=state, org_guid=org_guid, space_guid='sp0')
+
+
+def app_event(guid, type, actee, timestamp='2026-01-01T00:00:00Z', org_guid='org1'):
+    return event(guid, type, actee, timestamp=timestamp, organization_guid=org_guid, space_guid='sp0')
+
+
+def stats(request, match):
+    return 200, {'0': {'state': 'RUNNING', 'stats': {'usage': {'cpu': 0.5, 'mem': 25, 'disk': 10}, 'mem_quota': 100, 'disk_quota': 100}}}
+
+
+class AppStateTrackerTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = foundation()
+        self.fake.add('events', app_event('c0', 'app.crash', 'app2'))  # before the tracker started; never counted
+        self.cf = client(self.fake)
+        self.tracker = AppStateTracker()
+        self.tracker.sync(self.cf, 'org1')
+
+    def sync(self):
+        return dict((app.guid, app) for app in self.tracker.sync(self.cf, 'org1'))
+
+    def app(self, guid):
+        return [a for a in self.fake.data['apps'] if a['metadata']['guid'] == guid][0]
+
+    def listings(self):
+        return self.fake.paths('/v2/apps?')
+
+    def test_later_syncs_only_fetch_changed_apps(self):
+        self.app('app0')['entity']['state'] = 'STOPPED'
+        self.fake.add('app_usage_events', usage('u1', 'app0', 'STOPPED'), usage('u2', 'appX', 'STARTED', org_guid='other'))
+        listings = len(self.listings())
+
+        apps = self.sync()
+
+        self.assertEqual(len(self.listings()), listings)
+        self.assertEqual(self.fake.paths('/v2/apps/'), ['/v2/apps/app0'])
+        self.assertEqual(apps['app0'].state, 'STOPPED')
+        self.assertEqual(self.tracker.transitions[('app0', 'stop')], 1)
+
+    def test_apps_created_without_starting_appear(self):
+        self.fake.add('apps', resource('app3', name='worker', space_guid='sp0', state='STOPPED', instances=1))
+        self.fake.add('events', app_event('e1', 'audit.app.create', 'app3'), app_event('e2', 'audit.app.create', 'appX', org_guid='other'))
+
+        apps = self.sync()
+
+        self.assertEqual(apps['app3'].name, 'worker')
+        self.assertNotIn('appX', apps)
+
+    def test_renames_are_picked_up(self):
+        self.app('app1')['entity']['name'] = 'nightly'
+        self.fake.add('events', app_event('e1', 'audit.app.update', 'app1'))
+
+        self.assertEqual(self.sync()['app1'].name, 'nightly')
+
+    def test_deleted_apps_are_dropped_without_a_fetch(self):
+        self.fake.add('events', app_event('e1', 'audit.app.delete-request', 'app1'))
+
+        self.assertNotIn('app1', self.sync())
+        self.assertNotIn('/v2/apps/app1', self.fake.paths('/v2/apps/'))
+
+    def test_crashes_are_counted_once(self):
+        self.fake.add('events', app_event('c1', 'app.crash', 'app2'), app_event('c2', 'app.crash', 'app2'))
+
+        self.sync()
+        self.sync()
+
+        self.assertEqual(self.tracker.transitions[('app2', 'crash')], 2)
+
+    def test_orgs_are_relisted_after_the_interval(self):
+        self.fake.add('events', app_event('c1', 'app.crash', 'app2'))
+        self.sync()
+        self.fake.add('apps', resource('app3', name='unannounced', space_guid='sp0', state='STOPPED', instances=1))
+        self.fake.data['apps'] = [a for a in self.fake.data['apps'] if a['metadata']['guid'] != 'app1']
+
+        self.assertIn('app1', self.sync())
+
+        self.tracker.relist_interval = 0
+        apps = self.sync()
+
+        self.assertEqual(sorted(apps), ['app0', 'app2', 'app3'])
+        self.assertEqual(self.tracker.transitions[('app2', 'crash')], 1)
+
+    def test_relists_every_sync_without_usage_event_access(self):
+        self.fake.route('GET', r'/v2/app_usage_events', lambda request, match: (403, {'code': 10003, 'description': 'not authorized'}))
+        tracker = AppStateTracker()
+        tracker.sync(self.cf, 'org1')
+        listings = len(self.listings())
+
+        tracker.sync(self.cf, 'org1')
+
+        self.assertFalse(tracker.incremental)
+        self.assertEqual(len(self.listings()), listings + 1)
+
+    def test_orgs_are_listed_without_holding_the_tracker(self):
+        # org1's listing waits for org2's sync, which would block on the tracker if the listing held it
+        self.fake.add('spaces', resource('sp2', name='dev', organization_guid='org2'))
+        self.fake.add('apps', resource('app3', name='web', space_guid='sp2', state='STARTED', instances=1))
+        listing, released = threading.Event(), threading.Event()
+
+        def slow_listing(request, match):
+            if 'org1' in request.url:
+                listing.set()
+                released.wait(5)
+
+        self.fake.route('GET', r'/v2/apps', slow_listing)
+        tracker = AppStateTracker().advance(self.cf)
+        thread = threading.Thread(target=tracker.sync, args=(self.cf, 'org1'), kwargs={'advance': False})
+        thread.start()
+        listing.wait(5)
+        started = time.time()
+
+        apps = tracker.sync(self.cf, 'org2', advance=False)
+
+        self.assertLess(time.time() - started, 2)
+        released.set()
+        thread.join()
+        self.assertEqual([app.guid for app in apps], ['app3'])
+        self.assertEqual(sorted(app.guid for app in tracker.sync(self.cf, 'org1', advance=False)), ['app0', 'app1', 'app2'])
+
+
+class AppStateMetricsTest(unittest.TestCase):
+    def test_state_carries_the_tracker_to_the_next_collection(self):
+        fake = foundation()
+        fake.route('GET', r'/v2/apps/(\w+)/stats', stats)
+        cf = client(fake)
+        state = CollectionState()
+        app_metrics(cf, 'myorg', state=state)
+        fake.add('events', app_event('c1', 'app.crash', 'app2'))
+        listings = len(fake.paths('/v2/apps?'))
+
+        metrics = app_metrics(cf, 'myorg', state=state)
+
+        self.assertEqual(len(fake.paths('/v2/apps?')), listings)
+        self.assertIn('application_state_transitions_total{space_name="prod", app_name="api", transition="crash"} 1', metrics)
+
+
+if __name__ == '__main__':
+    unittest.main()
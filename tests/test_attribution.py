@@ -0,0 +1,90 @@
+import unittest
+
+from pycf.attribution import ActorIndex
+from pycf.prometheus import CollectionState, app_metrics
+from .fakecf import FakeCloudController, client, event, foundation
+
+
+def stats(request, match):
+    return 200, {'0': {'state': 'RUNNING', 'stats': {'usage': {'cpu': 0.5, 'mem': 10, 'disk': 10}, 'mem_quota': 100, 'disk_quota': 100}}}
+
+
+class ActorIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeCloudController()
+        self.fake.add('events',
+                      event('e1', 'audit.app.create', 'app0', timestamp='2026-01-01T00:00:00Z', actor_name='alice'),
+                      event('e2', 'audit.app.update', 'app0', timestamp='2026-01-02T00:00:00Z', actor_name='bob'),
+                      event('e3', 'audit.app.update', 'app0', timestamp='2026-01-03T00:00:00Z', actor_name='carol'),
+                      event('e4', 'audit.app.ssh-authorized', 'app0', timestamp='2026-01-04T00:00:00Z', actor_name='mallory'),
+                      event('e5', 'audit.app.create', 'app9', actor_name='eve'))
+        self.cf = client(self.fake)
+
+    def test_keeps_the_latest_actor_per_actee_and_type(self):
+        actors = ActorIndex().update(self.cf, ['app0', 'app1'])
+
+        self.assertEqual(actors.actor('app0', 'audit.app.create'), 'alice')
+        self.assertEqual(actors.actor('app0', 'audit.app.update'), 'carol')
+        self.assertEqual(actors.actor('app1', 'audit.app.create'), 'NaN')
+        self.assertEqual(actors.actor('app9', 'audit.app.create'), 'NaN')  # not asked for
+
+    def test_batches_actees(self):
+        ActorIndex(batch_size=2).update(self.cf, ['app0', 'app1', 'app2', 'app3', 'app4'])
+
+        self.assertEqual(len([path for path in self.fake.paths('/v2/events') if 'actee+IN' in path]), 3)
+
+    def test_later_updates_only_ask_for_new_events_and_new_actees(self):
+        actors = ActorIndex().update(self.cf, ['app0'])
+        self.fake.add('events', event('e6', 'audit.app.update', 'app0', timestamp='2099-01-01T00:00:00Z', actor_name='dave'))
+        seen = len(self.fake.paths('/v2/events'))
+
+        actors.update(self.cf, ['app0'])
+
+        paths = self.fake.paths('/v2/events')[seen:]
+        self.assertEqual(len(paths), 1)
+        self.assertIn('timestamp%3E%3D', paths[0])
+        self.assertNotIn('actee', paths[0])
+        self.assertEqual(actors.actor('app0', 'audit.app.update'), 'dave')
+
+    def test_cursor_follows_the_event_timestamps(self):
+        # the events are dated long before the exporter's clock; a cursor taken from that clock would skip e6
+        actors = ActorIndex().update(self.cf, ['app0'])
+        self.fake.add('events', event('e6', 'audit.app.update', 'app0', timestamp='2026-01-05T00:00:00Z', actor_name='dave'))
+
+        actors.update(self.cf, ['app0'])
+
+        self.assertEqual(actors.actor('app0', 'audit.app.update'), 'dave')
+        self.assertEqual(actors.cursor, '2026-01-05T00:00:00Z')
+
+
+class CollectionStateTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = foundation()
+        self.fake.route('GET', r'/v2/apps/(\w+)/stats', stats)
+        self.fake.add('events', event('e1', 'audit.app.create', 'app0', actor_name='alice'))
+        self.cf = client(self.fake)
+
+    def backfills(self):
+        return [path for path in self.fake.paths('/v2/events') if 'actee+IN' in path]
+
+    def test_state_carries_actors_to_the_next_collection(self):
+        state = CollectionState()
+        app_metrics(self.cf, 'myorg', state=state)
+        backfills = len(self.backfills())
+
+        metrics = app_metrics(self.cf, 'myorg', state=state)
+
+        self.assertEqual(len(self.backfills()), backfills)
+        self.assertIn('app_name="web", app_index="0", created_by="alice", last_updated_by="alice"', metrics)
+
+    def test_collections_without_state_start_from_scratch(self):
+        app_metrics(self.cf, 'myorg')
+        backfills = len(self.backfills())
+
+        app_metrics(self.cf, 'myorg')
+
+        self.assertEqual(len(self.backfills()), 2 * backfills)
+
+
+if __name__ == '__main__':
+    unittest.main()
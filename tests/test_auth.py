@@ -0,0 +1,44 @@
+import time
+import unittest
+
+import requests
+
+from pycf.cloudfoundry import CloudFoundry
+from .fakecf import API_DOMAIN, FakeCloudController, mount, resource
+
+
+class CloudFoundryAuthTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeCloudController()
+        self.fake.add('apps', *[resource('app%d' % i, name='app%d' % i) for i in range(8)])
+        self.fake.route('GET', r'/v2/info', lambda request, match: (200, {'authorization_endpoint': API_DOMAIN}))
+        self.tokens = []
+
+        def token(request, match):
+            time.sleep(0.05)  # long enough for every pooled request to reach the auth
+            self.tokens.append('token%d' % len(self.tokens))
+            return 200, {'token_type': 'bearer', 'access_token': self.tokens[-1], 'refresh_token': 'r', 'expires_in': 3600}
+
+        self.fake.route('POST', r'/oauth/token', token)
+        session = requests.Session()
+        mount(session, self.fake)
+        self.cf = CloudFoundry(api_domain=API_DOMAIN, username='u', password='p', session=session)
+
+    def test_concurrent_requests_share_one_login(self):
+        results = self.cf.apps.map('get', ['app%d' % i for i in range(8)], max_workers=8)
+
+        self.assertEqual(len(results.errors), 0)
+        self.assertEqual(self.tokens, ['token0'])
+
+    def test_concurrent_requests_share_one_refresh(self):
+        self.cf.apps.get('app0')
+        self.cf.auth.access_token_expiry = 0
+
+        self.cf.apps.map('get', ['app%d' % i for i in range(8)], max_workers=8)
+
+        self.assertEqual(self.tokens, ['token0', 'token1'])
+        self.assertEqual(self.cf.auth.access_token, 'bearer token1')
+
+
+if __name__ == '__main__':
+    unittest.main()
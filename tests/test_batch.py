@@ -0,0 +1,70 @@
+import time
+import threading
+import unittest
+
+from pycf.requests_api_wrapper.base import ApiError
+from pycf.requests_api_wrapper.batch import run_calls
+from .fakecf import FakeCloudController, client, resource
+
+
+class RunCallsTest(unittest.TestCase):
+    def test_results_keep_call_order(self):
+        calls = [(lambda n: time.sleep(0.01 * (5 - n)) or n, (n,), {}) for n in range(5)]
+
+        self.assertEqual(run_calls(calls, max_workers=5).responses, [0, 1, 2, 3, 4])
+
+    def test_failures_are_reported_per_item(self):
+        def call(n):
+            if n == 2:
+                raise ValueError(n)
+
+            return n
+
+        results = run_calls([(call, (n,), {}) for n in range(4)])
+
+        self.assertEqual([item.ok for item in results], [True, True, False, True])
+        self.assertIsInstance(results[2].error, ValueError)
+        self.assertEqual(results.stats()['failures'], 1)
+
+    def test_concurrency_is_bounded(self):
+        lock = threading.Lock()
+        running = [0, 0]  # now, max
+
+        def call():
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+
+            time.sleep(0.02)
+
+            with lock:
+                running[0] -= 1
+
+        run_calls([(call, (), {})] * 12, max_workers=3)
+
+        self.assertEqual(running[1], 3)
+
+
+class ClientBatchTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeCloudController()
+        self.fake.add('apps', *[resource('app%d' % i, name='app%d' % i) for i in range(4)])
+        self.cf = client(self.fake)
+
+    def test_map_calls_a_method_for_every_item(self):
+        results = self.cf.apps.map('get', ['app3', 'missing', 'app0'])
+
+        self.assertEqual(results[0].response.json()['entity']['name'], 'app3')
+        self.assertIsInstance(results[1].error, ApiError)
+        self.assertEqual(results[2].args, ('app0',))
+
+    def test_batch_mixes_apis(self):
+        self.fake.add('spaces', resource('s1', name='dev'))
+
+        results = self.cf.batch().add('apps', 'get', 'app1').add('spaces', 'get', 's1').run()
+
+        self.assertEqual([r.json()['entity']['name'] for r in results.responses], ['app1', 'dev'])
+
+
+if __name__ == '__main__':
+    unittest.main()
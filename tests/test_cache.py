@@ -0,0 +1,73 @@
+import time
+import unittest
+
+from pycf.requests_api_wrapper.cache import ResponseCache
+from .fakecf import FakeCloudController, client, resource
+
+
+class ResponseCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeCloudController()
+        self.fake.add('apps', resource('a', name='a'), resource('b', name='b'))
+        self.fake.add('spaces', resource('s', name='s'))
+        self.fake.route('PUT', r'/v2/apps/(\w+)', lambda request, match: (201, {'metadata': {'guid': match.group(1)}}))
+
+    def cf(self, **kwargs):
+        return client(self.fake, cache=ResponseCache(**kwargs))
+
+    def test_repeated_get_is_served_from_cache(self):
+        cf = self.cf(ttl=30)
+        first = cf.apps.get('a')
+
+        self.assertIs(cf.apps.get('a'), first)
+        self.assertEqual(len(self.fake.calls), 1)
+        self.assertEqual(cf.cache.stats()['hits'], 1)
+
+    def test_params_are_part_of_the_key(self):
+        cf = self.cf(ttl=30)
+        cf.apps.list(params={'q': 'name:a'})
+        cf.apps.list(params={'q': 'name:b'})
+        cf.apps.list(params={'q': 'name:a'})
+
+        self.assertEqual(len(self.fake.calls), 2)
+
+    def test_entries_expire(self):
+        cf = self.cf(ttl=0.05)
+        cf.apps.get('a')
+        time.sleep(0.1)
+        cf.apps.get('a')
+
+        self.assertEqual(len(self.fake.calls), 2)
+
+    def test_per_api_ttl_of_zero_disables_caching(self):
+        cf = self.cf(ttl=30, ttls={'spaces': 0})
+        cf.spaces.get('s')
+        cf.spaces.get('s')
+
+        self.assertEqual(len(self.fake.calls), 2)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cf = self.cf(ttl=30, max_size=2)
+        cf.apps.get('a')
+        cf.apps.get('b')
+        cf.apps.get('a')  # b is now the least recently used
+        cf.spaces.get('s')
+        cf.apps.get('a')
+        cf.apps.get('b')
+
+        self.assertEqual(len(self.fake.calls), 4)
+        self.assertEqual(cf.cache.stats()['evictions'], 2)
+
+    def test_writes_invalidate_the_api(self):
+        cf = self.cf(ttl=30)
+        cf.apps.get('a')
+        cf.spaces.get('s')
+        cf.apps.update('a', data={'name': 'renamed'})
+        cf.apps.get('a')
+        cf.spaces.get('s')
+
+        self.assertEqual([path for _, path in self.fake.calls], ['/v2/apps/a', '/v2/spaces/s', '/v2/apps/a', '/v2/apps/a'])
+
+
+if __name__ == '__main__':
+    unittest.main()
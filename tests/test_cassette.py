@@ -0,0 +1,137 @@
+import os
+import json
+import base64
+import shutil
+import tempfile
+import unittest
+
+import requests
+
+from pycf.cloudfoundry import CloudFoundry
+from pycf.requests_api_wrapper.cassette import Cassette, CassetteMiss, RecordingAdapter, record, replay
+from .fakecf import API_DOMAIN, FakeCloudController, mount, resource
+
+
+TOKEN = {'token_type': 'bearer', 'access_token': 'token1', 'refresh_token': 'refresh1', 'expires_in': 3600}
+
+
+class CassetteTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeCloudController(page_size=2)
+        self.fake.add('apps', *[resource('app%d' % i, name='app%d' % i) for i in range(3)])
+        self.fake.route('GET', r'/v2/info', lambda request, match: (200, {'authorization_endpoint': API_DOMAIN}))
+        self.fake.route('POST', r'/oauth/token', lambda request, match: (200, TOKEN))
+        self.tmp = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def recorded(self):
+        cassette = Cassette()
+        session = requests.Session()
+        mount(session, RecordingAdapter(cassette, self.fake))
+
+        cf = CloudFoundry(api_domain=API_DOMAIN, username='u', password='p', session=session)
+        names = [app['entity']['name'] for app in cf.apps.iter()]
+        cf.apps.get('app1')
+
+        return cassette, names
+
+    def test_login_and_calls_are_recorded(self):
+        cassette, _ = self.recorded()
+        urls = [i['request']['url'] for i in cassette.interactions]
+
+        self.assertEqual(urls[:2], [API_DOMAIN + '/v2/info', API_DOMAIN + '/oauth/token'])
+        self.assertEqual(len(urls), 5)
+
+    def test_replay_needs_no_network(self):
+        cassette, names = self.recorded()
+        path = os.path.join(self.tmp, 'cassette.json.gz')
+        cassette.save(path)
+
+        session = requests.Session()
+        replay(session, path)
+        cf = CloudFoundry(api_domain=API_DOMAIN, username='u', password='p', session=session)
+
+        self.assertEqual([app['entity']['name'] for app in cf.apps.iter()], names)
+        self.assertEqual(cf.apps.get('app1').json()['entity']['name'], 'app1')
+        self.assertEqual(cf.auth.access_token, 'bearer redacted')
+
+    def test_credentials_and_tokens_are_not_recorded(self):
+        cassette, _ = self.recorded()
+        path = os.path.join(self.tmp, 'cassette.json.gz')
+        cassette.save(path)
+
+        interactions = Cassette.load(path).interactions
+        login = [i for i in interactions if i['request']['url'].endswith('/oauth/token')][0]
+        recorded = json.loads(base64.b64decode(login['response']['content']).decode('utf-8'))
+
+        self.assertEqual(login['request']['body'], '')
+        self.assertEqual((recorded['access_token'], recorded['refresh_token']), ('redacted', 'redacted'))
+        self.assertEqual(recorded['expires_in'], 3600)
+
+        for secret in (b'token1', b'refresh1', b'password=p'):
+            self.assertFalse(any(secret in base64.b64decode(i['request']['body']) + base64.b64decode(i['response']['content']) for i in interactions))
+
+    def test_credentials_and_environment_variables_are_not_recorded(self):
+        self.fake.add('service_keys', resource('sk0', name='key', credentials={'password': 's3cret', 'uri': 'mysql://u:s3cret@db'}))
+        self.fake.route('GET', r'/v2/apps/(\w+)/env', lambda request, match: (200, {
+            'environment_json': {'API_KEY': 's3cret'},
+            'system_env_json': {'VCAP_SERVICES': {'p-mysql': [{'name': 'db', 'credentials': {'password': 's3cret'}}]}},
+            'application_env_json': {'VCAP_APPLICATION': {'name': 'app0'}}
+        }))
+        cassette = Cassette()
+        session = requests.Session()
+        mount(session, RecordingAdapter(cassette, self.fake))
+        cf = CloudFoundry(api_domain=API_DOMAIN, username='u', password='p', session=session)
+
+        keys = cf.service_keys.list().json()
+        cf.apps.env('app0')
+
+        self.assertEqual(keys['resources'][0]['entity']['credentials']['password'], 's3cret')  # the caller still gets them
+        self.assertFalse(any(b's3cret' in base64.b64decode(i['response']['content']) for i in cassette.interactions))
+
+        recorded = json.loads(base64.b64decode(cassette.interactions[-2]['response']['content']).decode('utf-8'))
+        self.assertEqual(recorded['resources'][0]['entity'], {'name': 'key', 'credentials': 'redacted'})
+
+    def test_token_requests_replay_whatever_their_body(self):
+        cassette, names = self.recorded()
+        session = requests.Session()
+        replay(session, cassette)
+        cf = CloudFoundry(api_domain=API_DOMAIN, username='other', password='secret', session=session)
+
+        self.assertEqual([app['entity']['name'] for app in cf.apps.iter()], names)
+
+    def test_unrecorded_request_raises(self):
+        cassette, _ = self.recorded()
+        session = requests.Session()
+        replay(session, cassette)
+        cf = CloudFoundry(api_domain=API_DOMAIN, username='u', password='p', session=session)
+
+        with self.assertRaises(CassetteMiss):
+            cf.apps.get('app2')
+
+    def test_repeated_requests_replay_in_recorded_order(self):
+        statuses = [200, 404]
+        self.fake.route('GET', r'/v2/apps/app0', lambda request, match: (statuses.pop(0), {}) if len(statuses) > 1 else (404, {}))
+        cassette = Cassette()
+        session = requests.Session()
+        mount(session, RecordingAdapter(cassette, self.fake))
+
+        session.get(API_DOMAIN + '/v2/apps/app0')
+        session.get(API_DOMAIN + '/v2/apps/app0')
+
+        replayed = requests.Session()
+        replay(replayed, cassette)
+
+        self.assertEqual([replayed.get(API_DOMAIN + '/v2/apps/app0').status_code for _ in range(3)], [200, 404, 404])
+
+    def test_record_mounts_on_a_client(self):
+        cf = CloudFoundry(api_domain=API_DOMAIN, session=requests.Session())
+        record(cf)
+
+        self.assertIsInstance(cf.session.get_adapter(API_DOMAIN), RecordingAdapter)
+
+
+if __name__ == '__main__':
+    unittest.main()
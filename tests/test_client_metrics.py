@@ -0,0 +1,74 @@
+import unittest
+
+import requests
+
+from pycf.exposition import MetricRegistry
+from pycf.prometheus import client_metrics
+from pycf.requests_api_wrapper.metrics import ClientMetrics
+from pycf.requests_api_wrapper.retry import RetryPolicy
+from .fakecf import FakeCloudController, client, resource
+
+
+def samples(metrics):
+    registry = metrics.collect(MetricRegistry())
+    return dict((name, family.samples) for name, family in registry.families.items())
+
+
+class ClientMetricsTest(unittest.TestCase):
+    def test_buckets_are_cumulative(self):
+        metrics = ClientMetrics(buckets=(0.1, 1.0))
+        metrics.observe('apps', 'get', 200, 0, 0.05)
+        metrics.observe('apps', 'get', 200, 0, 0.5)
+        metrics.observe('apps', 'get', 200, 0, 5)
+
+        histogram = samples(metrics)['pycf_api_request_duration_seconds']
+        buckets = [(dict(extra)['le'], value) for suffix, _, extra, value in histogram if suffix == '_bucket']
+
+        self.assertEqual(buckets, [(0.1, 1), (1.0, 2), ('+Inf', 3)])
+        self.assertIn(('_count', ('apps', 'get', '200', '0'), (), 3), histogram)
+
+    def test_client_requests_are_observed(self):
+        fake = FakeCloudController()
+        fake.add('apps', resource('a', name='a'))
+        failures = [503]
+        fake.route('GET', r'/v2/apps/a', lambda request, match: (failures.pop(), {}) if failures else None)
+        cf = client(fake, retry_policy=RetryPolicy(backoff_factor=0))
+
+        cf.apps.get('a')
+        requests_total = dict((labels, value) for _, labels, _, value in samples(cf.metrics)['pycf_api_requests_total'])
+
+        self.assertEqual(requests_total, {('apps', 'get', '503', '0'): 1, ('apps', 'get', '200', '1'): 1})
+
+    def test_transport_errors_are_counted(self):
+        fake = FakeCloudController()
+
+        def refuse(request, match):
+            raise requests.exceptions.ConnectionError('refused')
+
+        fake.route('GET', r'/v2/apps/a', refuse)
+        cf = client(fake, retry_policy=RetryPolicy(max_retries=0))
+
+        with self.assertRaises(requests.exceptions.ConnectionError):
+            cf.apps.get('a')
+
+        self.assertEqual(samples(cf.metrics)['pycf_api_requests_total'][0][1], ('apps', 'get', 'error', '0'))
+
+    def test_received_bytes_are_summed_per_method(self):
+        metrics = ClientMetrics()
+        metrics.observe('apps', 'get', 200, 0, 0.01, 100)
+        metrics.observe('apps', 'get', 404, 0, 0.01, 20)
+
+        self.assertEqual(samples(metrics)['pycf_api_response_bytes_total'], [('', ('apps', 'get'), (), 120)])
+
+    def test_client_metrics_render_through_the_registry(self):
+        cf = client(FakeCloudController())
+        cf.metrics.observe('apps', 'list "all"\\\n', 200, 0, 0.01, 10)
+
+        rendered = client_metrics(cf)
+
+        self.assertEqual(rendered, cf.metrics.collect(MetricRegistry()).render())
+        self.assertIn('pycf_api_requests_total{api="apps", method="list \\"all\\"\\\\\\n", status="200", attempt="0"} 1\n', rendered)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import json
+import unittest
+
+from pycf.requests_api_wrapper import codec
+from .fakecf import FakeCloudController, client, resource
+
+
+class CodecTest(unittest.TestCase):
+    def setUp(self):
+        self.backend = codec.backend
+
+    def tearDown(self):
+        codec.set_backend(self.backend)
+
+    def test_json_backend_is_always_available(self):
+        codec.set_backend('json')
+
+        self.assertEqual(codec.loads(codec.dumps({'a': [1, 'b']})), {'a': [1, 'b']})
+
+    def test_unknown_backend_is_rejected(self):
+        with self.assertRaises(ValueError):
+            codec.set_backend('no-such-codec')
+
+        self.assertEqual(codec.backend, self.backend)
+
+    def test_default_is_the_fastest_installed_backend(self):
+        codec.set_backend()
+
+        self.assertEqual(codec.backend, [b for b in codec.PREFERRED_BACKENDS if b in codec.BACKENDS][0])
+
+    def test_every_backend_round_trips(self):
+        data = {'name': u'caf\xe9', 'n': 3, 'nested': {'list': [1.5, None, True]}}
+
+        for name in codec.BACKENDS:
+            codec.set_backend(name)
+            self.assertEqual(codec.loads(codec.dumps(data)), data, name)
+
+    def test_response_body_is_decoded_once(self):
+        fake = FakeCloudController()
+        fake.add('apps', resource('a', name='a'))
+        response = client(fake).apps.get('a')
+
+        self.assertIs(response.json(), response.json())
+        self.assertEqual(response.json()['entity']['name'], 'a')
+
+    def test_client_responses_are_decoded_by_the_selected_backend(self):
+        decoded = []
+
+        def loads(content):
+            decoded.append(content)
+            return {'decoded_by': 'test'}
+
+        codec.BACKENDS['test'] = (loads, json.dumps)
+        self.addCleanup(codec.BACKENDS.pop, 'test')
+        codec.set_backend('test')
+
+        fake = FakeCloudController()
+        fake.add('apps', resource('a', name='a'))
+        response = client(fake).apps.get('a')
+
+        self.assertEqual(response.json(), {'decoded_by': 'test'})
+        self.assertEqual(len(decoded), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
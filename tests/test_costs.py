@@ -0,0 +1,182 @@
+import json
+import math
+import time
+import unittest
+import requests
+from datetime import datetime
+
+from pycf import costs
+from pycf.costs import PlanCatalog, month_bounds, plan_cost, prorated_costs
+from pycf.prometheus import CollectionState, app_metrics
+from pycf.records import ServicePlan
+from pycf.requests_api_wrapper.retry import RetryPolicy
+from .fakecf import client, foundation, resource
+
+
+def epoch(*args):
+    return (datetime(*args) - datetime(1970, 1, 1)).total_seconds()
+
+
+def stats(request, match):
+    return 200, {'0': {'state': 'RUNNING', 'stats': {'usage': {'cpu': 0.5, 'mem': 25, 'disk': 10}, 'mem_quota': 100, 'disk_quota': 100}}}
+
+
+class FakeArray(object):
+    # just enough of numpy's elementwise arithmetic for prorated_costs, so its numpy branch runs without numpy
+    def __init__(self, values):
+        self.values = [float(v) for v in values]
+
+    def _pairs(self, other):
+        return zip(self.values, other.values if isinstance(other, FakeArray) else [other] * len(self.values))
+
+    def __rsub__(self, other):
+        return FakeArray([b - a for a, b in self._pairs(other)])
+
+    def __mul__(self, other):
+        return FakeArray([a * b for a, b in self._pairs(other)])
+
+    def __truediv__(self, other):
+        return FakeArray([a / b for a, b in self._pairs(other)])
+
+    __div__ = __truediv__
+
+    def tolist(self):
+        return list(self.values)
+
+
+class FakeNumpy(object):
+    def __init__(self):
+        self.calls = 0
+
+    def asarray(self, values, dtype=None):
+        self.calls += 1
+        return FakeArray(values)
+
+    def maximum(self, array, value):
+        return FakeArray([max(a, b) for a, b in array._pairs(value)])
+
+
+class ProrationTest(unittest.TestCase):
+    now = datetime(2026, 12, 16)  # half of December gone
+
+    def prorate(self, monthly_costs, created_at):
+        return prorated_costs(monthly_costs, created_at, now=self.now)
+
+    def test_plan_cost(self):
+        self.assertEqual(plan_cost(ServicePlan(resource('p', extra=json.dumps({'costs': [{'amount': {'usd': 12.5}}]})))), 12.5)
+        self.assertTrue(math.isnan(plan_cost(ServicePlan(resource('p', extra=None)))))
+        self.assertTrue(math.isnan(plan_cost(ServicePlan(resource('p', extra='{"costs": []}')))))
+
+    def test_month_bounds_roll_over_the_year(self):
+        self.assertEqual(month_bounds(self.now), (epoch(2026, 12, 1), epoch(2027, 1, 1)))
+        self.assertEqual(month_bounds(datetime(2026, 2, 10)), (epoch(2026, 2, 1), epoch(2026, 3, 1)))
+
+    def test_charged_from_the_later_of_creation_and_month_start(self):
+        older, newer = self.prorate([31.0, 31.0], [epoch(2025, 6, 1), epoch(2026, 12, 9)])
+
+        self.assertAlmostEqual(older, 15.0)
+        self.assertAlmostEqual(newer, 7.0)
+
+    def test_unknown_costs_stay_nan(self):
+        known, unknown = self.prorate([31.0, float('nan')], [epoch(2026, 12, 1)] * 2)
+
+        self.assertAlmostEqual(known, 15.0)
+        self.assertTrue(math.isnan(unknown))
+
+    def prorate_with(self, numpy):
+        monthly_costs = [10.0, 20.0, float('nan'), 0.0]
+        created_at = [epoch(2026, 1, 1), epoch(2026, 12, 2), epoch(2026, 12, 3), epoch(2026, 12, 15)]
+        saved, costs.numpy = costs.numpy, numpy
+
+        try:
+            return self.prorate(monthly_costs, created_at)
+
+        finally:
+            costs.numpy = saved
+
+    def assertSameCosts(self, first, second):
+        self.assertEqual(len(first), len(second))
+
+        for a, b in zip(first, second):
+            self.assertTrue(math.isnan(a) and math.isnan(b) or abs(a - b) < 1e-9)
+
+    def test_numpy_branch_matches_the_fallback(self):
+        numpy = FakeNumpy()
+
+        self.assertSameCosts(self.prorate_with(numpy), self.prorate_with(None))
+        self.assertTrue(numpy.calls)
+
+    @unittest.skipIf(costs.numpy is None, 'numpy is not installed')
+    def test_same_result_without_numpy(self):
+        self.assertSameCosts(self.prorate_with(costs.numpy), self.prorate_with(None))
+
+
+class PlanCatalogTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = foundation()
+        self.cf = client(self.fake)
+
+    def test_plans_are_listed_once_per_ttl(self):
+        catalog = PlanCatalog()
+
+        self.assertEqual(catalog.plans(self.cf, ['plan0', 'plan1']), {'plan0': ('small', 10.0), 'plan1': ('large', 20.0)})
+        catalog.plans(self.cf, ['plan0'])
+
+        self.assertEqual(len(self.fake.paths('/v2/service_plans')), 1)
+
+        catalog.loaded_at -= catalog.ttl + 1
+        catalog.plans(self.cf, ['plan0'])
+
+        self.assertEqual(len(self.fake.paths('/v2/service_plans')), 2)
+
+    def test_plans_missing_from_the_listing_are_fetched(self):
+        catalog = PlanCatalog()
+        catalog.plans(self.cf, ['plan0'])
+        self.fake.add('service_plans', resource('plan2', name='huge', extra=json.dumps({'costs': [{'amount': {'usd': 99.0}}]})))
+
+        plans = catalog.plans(self.cf, ['plan2', 'gone'])
+
+        self.assertEqual(plans, {'plan2': ('huge', 99.0), 'gone': None})
+        self.assertEqual(sorted(self.fake.paths('/v2/service_plans/')), ['/v2/service_plans/gone', '/v2/service_plans/plan2'])
+
+    def test_only_missing_plans_are_remembered(self):
+        failures = [1]
+        self.fake.route('GET', r'/v2/service_plans/flaky', lambda request, match: (502, {}) if failures and failures.pop() else None)
+        self.fake.add('service_plans', resource('flaky', name='flaky', extra=json.dumps({'costs': [{'amount': {'usd': 5.0}}]})))
+        catalog = PlanCatalog()
+        catalog._plans, catalog.loaded_at = {}, time.time()  # as if both plans were created after the listing
+        cf = client(self.fake, retry_policy=RetryPolicy(max_retries=0))
+
+        self.assertEqual(catalog.plans(cf, ['flaky', 'gone']), {'flaky': None, 'gone': None})
+        self.assertEqual(catalog.plans(cf, ['flaky', 'gone']), {'flaky': ('flaky', 5.0), 'gone': None})
+        self.assertEqual(self.fake.paths('/v2/service_plans/gone'), ['/v2/service_plans/gone'])
+
+    def test_connection_errors_are_retried_on_the_next_scrape(self):
+        failures = [requests.exceptions.ConnectionError('reset')]
+
+        def flaky(request, match):
+            if failures:
+                raise failures.pop()
+
+        self.fake.route('GET', r'/v2/service_plans/flaky', flaky)
+        self.fake.add('service_plans', resource('flaky', name='flaky', extra=json.dumps({'costs': [{'amount': {'usd': 5.0}}]})))
+        catalog = PlanCatalog()
+        catalog._plans, catalog.loaded_at = {}, time.time()
+        cf = client(self.fake, retry_policy=RetryPolicy(max_retries=0))
+
+        self.assertEqual(catalog.plans(cf, ['flaky']), {'flaky': None})
+        self.assertEqual(catalog.plans(cf, ['flaky']), {'flaky': ('flaky', 5.0)})
+
+    def test_state_carries_the_catalog_to_the_next_collection(self):
+        self.fake.route('GET', r'/v2/apps/(\w+)/stats', stats)
+        state = CollectionState()
+        app_metrics(self.cf, 'myorg', state=state)
+
+        metrics = app_metrics(self.cf, 'myorg', state=state)
+
+        self.assertEqual(len(self.fake.paths('/v2/service_plans')), 1)
+        self.assertIn('service_plan_name="large"', metrics)
+
+
+if __name__ == '__main__':
+    unittest.main()
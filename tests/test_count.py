@@ -0,0 +1,83 @@
+import time
+import threading
+import unittest
+
+from pycf.requests_api_wrapper.cache import ResponseCache
+from .fakecf import FakeCloudController, client, resource
+
+
+class LaggingCache(ResponseCache):
+    # the second lookup only answers once the first caller's count has been stored, with what it read before
+    def __init__(self):
+        super(LaggingCache, self).__init__(ttl=60)
+        self.lookups = 0
+        self.stored = threading.Event()
+
+    def get(self, key):
+        value = super(LaggingCache, self).get(key)
+        self.lookups += 1
+
+        if self.lookups == 2:
+            self.stored.wait(1)
+
+        return value
+
+    def set(self, key, response):
+        super(LaggingCache, self).set(key, response)
+        self.stored.set()
+
+
+class CountTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeCloudController(page_size=2)
+        self.fake.add('spaces', resource('sp0', name='dev', organization_guid='org1'))
+        self.fake.add('routes', *[resource('r%d' % i, host='r%d' % i, space_guid='sp0' if i % 2 else 'spX') for i in range(7)])
+        self.cf = client(self.fake)
+
+    def test_reads_total_results_from_a_one_item_page(self):
+        self.assertEqual(self.cf.routes.count(), 7)
+        self.assertEqual(self.fake.paths('/v2/routes'), ['/v2/routes?results-per-page=1'])
+
+    def test_filters_are_passed_on(self):
+        self.assertEqual(self.cf.routes.count(params={'q': 'organization_guid:org1'}), 3)
+
+    def test_other_list_methods(self):
+        self.fake.route('GET', r'/v2/organizations/org1/private_domains', lambda request, match: (200, {'total_results': 4, 'total_pages': 4, 'resources': []}))
+
+        self.assertEqual(self.cf.organizations.count('org1', method='list_private_domains'), 4)
+        self.assertIn('results-per-page=1', self.fake.paths('/v2/organizations/org1/private_domains')[0])
+
+    def test_counts_are_cached_per_query(self):
+        self.cf.routes.count()
+        self.cf.routes.count()
+        self.cf.routes.count(params={'q': 'organization_guid:org1'})
+
+        self.assertEqual(len(self.fake.paths('/v2/routes')), 2)
+
+    def test_concurrent_counts_share_one_request(self):
+        self.fake.route('GET', r'/v2/routes', lambda request, match: time.sleep(0.1))
+        self.cf.set_count_cache(LaggingCache())
+        threads = [threading.Thread(target=self.cf.routes.count) for _ in range(2)]
+
+        for t in threads:
+            t.start()
+            time.sleep(0.02)
+
+        for t in threads:
+            t.join()
+
+        self.assertEqual(len(self.fake.paths('/v2/routes')), 1)
+
+    def test_cache_can_be_replaced_or_disabled(self):
+        self.cf.set_count_cache(ResponseCache(ttl=0))
+        self.cf.routes.count()
+        self.cf.routes.count()
+
+        self.cf.set_count_cache(None)
+        self.cf.routes.count()
+
+        self.assertEqual(len(self.fake.paths('/v2/routes')), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import unittest
+
+import requests
+
+from pycf.cloudfoundry import CloudFoundry
+from pycf.requests_api_wrapper.base import Endpoint, compile_api_spec
+from .fakecf import FakeCloudController, client, resource
+
+
+SPEC = {
+    'things': {
+        'endpoint': 'v2/things',
+        'api_methods': {
+            'get': {
+                'http_method': requests.get,
+                'path_spec': '%s',
+                'args': ['guid'],
+                'kwargs': ['headers', 'params'],
+                'default_params': {'inline-relations-depth': 0},
+                'expected_status': [200]
+            },
+            'secret': {
+                'http_method': requests.get,
+                'path_spec': '%s/secret',
+                'args': ['guid'],
+                'kwargs': ['headers'],
+                'required_headers': ['X-Token'],
+                'expected_status': [200]
+            },
+            'future': None
+        }
+    }
+}
+
+
+class EndpointTest(unittest.TestCase):
+    def setUp(self):
+        self.endpoints = compile_api_spec(SPEC)['things']
+
+    def test_path_is_built_from_the_template(self):
+        self.assertEqual(self.endpoints['secret'].path('http://cf.test', ('x',)), 'http://cf.test/v2/things/x/secret')
+
+    def test_wrong_argument_count_is_rejected(self):
+        with self.assertRaises(TypeError):
+            self.endpoints['get'].bind((), {})
+
+    def test_unknown_keyword_is_rejected(self):
+        with self.assertRaises(TypeError):
+            self.endpoints['get'].bind(('x',), {'data': {}})
+
+    def test_default_params_are_merged_without_touching_the_spec(self):
+        kwargs = self.endpoints['get'].bind(('x',), {'params': {'q': 'name:a'}})
+
+        self.assertEqual(kwargs['params'], {'q': 'name:a', 'inline-relations-depth': 0})
+        self.assertEqual(SPEC['things']['api_methods']['get']['default_params'], {'inline-relations-depth': 0})
+
+    def test_required_headers_are_enforced(self):
+        with self.assertRaises(Exception):
+            self.endpoints['secret'].bind(('x',), {})
+
+        self.endpoints['secret'].bind(('x',), {'headers': {'X-Token': 't'}})
+
+    def test_unimplemented_method_raises(self):
+        self.assertIsInstance(self.endpoints['future'], Endpoint)
+
+        with self.assertRaises(NotImplementedError):
+            self.endpoints['future'].bind((), {})
+
+
+class CompiledClientTest(unittest.TestCase):
+    def test_clients_share_the_compiled_spec(self):
+        a, b = client(), client()
+
+        self.assertIs(a.apps.endpoints, b.apps.endpoints)
+        self.assertIs(a.apps.endpoints, CloudFoundry.endpoints['apps'])
+
+    def test_bound_methods_are_reused(self):
+        cf = client()
+
+        self.assertIs(cf.apps.get, cf.apps.get)
+        self.assertIs(cf.apps, cf.apps)
+
+    def test_unknown_api_and_method_raise_attribute_error(self):
+        cf = client()
+
+        with self.assertRaises(AttributeError):
+            cf.no_such_api
+
+        with self.assertRaises(AttributeError):
+            cf.apps.no_such_method
+
+    def test_set_auth_rebuilds_api_objects(self):
+        cf = client()
+        apps = cf.apps
+        cf.set_auth(cf.auth)
+
+        self.assertIsNot(cf.apps, apps)
+
+    def test_call_goes_to_the_spec_path(self):
+        fake = FakeCloudController()
+        fake.add('spaces', resource('s1', name='dev'))
+        cf = client(fake)
+
+        self.assertEqual(cf.spaces.get('s1').json()['entity']['name'], 'dev')
+        self.assertEqual(fake.paths(), ['/v2/spaces/s1'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+import gzip
+import threading
+import unittest
+from io import BytesIO
+
+try:
+    import httplib
+
+except ImportError:
+    import http.client as httplib
+
+from pycf.exporter import MetricsExporter, MetricsServer, accepts_gzip
+from pycf.requests_api_wrapper.retry import RetryPolicy
+from .fakecf import client, event, foundation
+
+
+def stats(request, match):
+    return 200, {'0': {'state': 'RUNNING', 'stats': {'usage': {'cpu': 0.5, 'mem': 25, 'disk': 10}, 'mem_quota': 100, 'disk_quota': 100}}}
+
+
+class ExporterTestCase(unittest.TestCase):
+    def setUp(self):
+        self.fake = foundation()
+        self.fake.route('GET', r'/v2/apps/(\w+)/stats', stats)
+        self.fake.route('GET', r'/v2/quota_definitions/q1', lambda request, match: (200, {'entity': {
+            'total_services': 10, 'total_routes': -1, 'total_private_domains': -1, 'memory_limit': -1, 'app_instance_limit': -1, 'total_service_keys': -1
+        }}))
+        self.fake.add('events', event('e1', 'audit.app.create', 'app0', actor_name='alice'))
+        self.cf = client(self.fake, retry_policy=RetryPolicy(max_retries=0))
+        self.exporter = MetricsExporter(self.cf, 'myorg', interval=0.05)
+
+
+class MetricsExporterTest(ExporterTestCase):
+    def test_collect_builds_a_snapshot(self):
+        self.assertFalse(self.exporter.ready)
+
+        snapshot = self.exporter.collect()
+        chunks, length, _ = snapshot.body()
+        body = ''.join(chunks)
+
+        self.assertTrue(self.exporter.ready)
+        self.assertEqual(len(body), length)
+        self.assertIn('application_status{space_name="dev", app_name="web", app_index="0", created_by="alice"', body)
+        self.assertIn('service_instance_quota_usage', body)
+        self.assertIn('pycf_scrape_errors_total 0', body)
+        self.assertIn('pycf_scrape_duration_seconds', body)
+
+    def test_failed_collection_keeps_the_previous_snapshot(self):
+        snapshot = self.exporter.collect()
+        self.fake.route('GET', r'/v2/organizations', lambda request, match: (500, {}))
+
+        self.assertIs(self.exporter.collect(), snapshot)
+        self.assertIs(self.exporter.snapshot, snapshot)
+        self.assertEqual(self.exporter.errors, 1)
+
+        del self.fake.handlers[0]
+        self.assertIn('pycf_scrape_errors_total 1', ''.join(self.exporter.collect().body()[0]))
+
+    def test_loop_recollects_on_the_interval(self):
+        collected = threading.Event()
+        snapshots = []
+        collect = self.exporter.collect
+
+        def counting_collect():
+            snapshots.append(collect())
+
+            if len(snapshots) == 3:
+                collected.set()
+
+        self.exporter.collect = counting_collect
+        self.exporter.start()
+
+        try:
+            self.assertTrue(collected.wait(10))
+
+        finally:
+            self.exporter.stop()
+
+        self.assertEqual(len(set(id(s) for s in snapshots)), len(snapshots))
+
+
+class MetricsServerTest(ExporterTestCase):
+    def setUp(self):
+        super(MetricsServerTest, self).setUp()
+        self.server = MetricsServer(('127.0.0.1', 0), self.exporter)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def connect(self):
+        return httplib.HTTPConnection('127.0.0.1', self.server.server_address[1], timeout=5)
+
+    def request(self, method='GET', path='/metrics', headers=None, connection=None):
+        conn = connection or self.connect()
+
+        try:
+            conn.request(method, path, headers=headers or {})
+            response = conn.getresponse()
+            return response.status, dict(response.getheaders()), response.read()
+
+        finally:
+            if connection is None:
+                conn.close()
+
+    def test_not_ready_until_the_first_collection(self):
+        self.assertEqual(self.request()[0], 503)
+        self.assertEqual(self.request(path='/ready')[0], 503)
+        self.assertEqual(self.request(path='/healthz')[0], 200)
+
+    def test_scrapes_are_served_from_the_snapshot(self):
+        self.exporter.collect()
+        calls = len(self.fake.calls)
+
+        status, headers, body = self.request()
+
+        self.assertEqual(status, 200)
+        self.assertIn('cpu_utilization{space_name="dev", app_name="web", app_index="0"} 0.5', body)
+        self.assertEqual(int(headers['content-length']), len(body))
+        self.assertEqual(len(self.fake.calls), calls)
+        self.assertEqual(self.request(path='/ready')[0], 200)
+
+    def test_gzip_when_accepted(self):
+        self.exporter.collect()
+        plain = self.request()[2]
+
+        status, headers, body = self.request(headers={'Accept-Encoding': 'gzip, deflate'})
+
+        self.assertEqual(headers['content-encoding'], 'gzip')
+        self.assertEqual(gzip.GzipFile(fileobj=BytesIO(body)).read(), plain)
+        self.assertNotIn('content-encoding', self.request(headers={'Accept-Encoding': 'gzip;q=0'})[1])
+
+    def test_accepts_gzip(self):
+        self.assertTrue(accepts_gzip('gzip'))
+        self.assertTrue(accepts_gzip('deflate, *;q=0.5'))
+        self.assertFalse(accepts_gzip('gzip;q=0'))
+        self.assertFalse(accepts_gzip('identity'))
+        self.assertFalse(accepts_gzip(None))
+
+    def test_unchanged_snapshot_answers_304(self):
+        self.exporter.collect()
+        etag = self.request()[1]['etag']
+
+        status, headers, body = self.request(headers={'If-None-Match': etag})
+
+        self.assertEqual((status, body), (304, ''))
+        self.assertEqual(headers['etag'], etag)
+        self.assertNotEqual(self.request(headers={'If-None-Match': etag, 'Accept-Encoding': 'gzip'})[0], 304)
+
+    def test_openmetrics_when_asked_for(self):
+        self.exporter.collect()
+
+        status, headers, body = self.request(headers={'Accept': 'application/openmetrics-text; version=1.0.0'})
+
+        self.assertTrue(headers['content-type'].startswith('application/openmetrics-text'))
+        self.assertTrue(body.endswith('# EOF\n'))
+
+    def test_head_then_get_on_one_connection(self):
+        self.exporter.collect()
+        connection = self.connect()
+
+        try:
+            head = self.request('HEAD', connection=connection)
+            get = self.request('GET', connection=connection)
+
+        finally:
+            connection.close()
+
+        self.assertEqual(head[2], '')
+        self.assertEqual(int(head[1]['content-length']), len(get[2]))
+        self.assertIn('cpu_utilization', get[2])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from pycf.exposition import MetricRegistry, format_value
+
+
+class MetricRegistryTest(unittest.TestCase):
+    def setUp(self):
+        self.registry = MetricRegistry()
+        self.registry.family('app_up', 'Whether an app is up', 'gauge', ('space_name', 'app_name')).add(('dev', 'web'), 1)
+        self.registry.family('crashes_total', 'App crashes', 'counter', ('app_name',)).add(('web',), 3)
+
+    def test_text_format(self):
+        self.assertEqual(self.registry.render(), (
+            '# HELP app_up Whether an app is up\n'
+            '# TYPE app_up gauge\n'
+            'app_up{space_name="dev", app_name="web"} 1\n'
+            '# HELP crashes_total App crashes\n'
+            '# TYPE crashes_total counter\n'
+            'crashes_total{app_name="web"} 3\n'
+        ))
+
+    def test_openmetrics_format(self):
+        rendered = self.registry.render(openmetrics=True)
+
+        self.assertIn('app_up{space_name="dev",app_name="web"} 1\n', rendered)
+        self.assertIn('# TYPE crashes counter\ncrashes_total{app_name="web"} 3\n', rendered)
+        self.assertTrue(rendered.endswith('# EOF\n'))
+
+    def test_label_values_are_escaped(self):
+        self.registry.family('app_up', 'Whether an app is up').add(('a\\b', u'caf\xe9 "new"\nline'), 0)
+
+        self.assertIn('app_up{space_name="a\\\\b", app_name="caf\xc3\xa9 \\"new\\"\\nline"} 0\n', self.registry.render())
+
+    def test_families_are_shared_by_name(self):
+        family = self.registry.family('app_up', 'ignored', 'counter', ())
+
+        self.assertEqual((family.type, family.label_names, len(family)), ('gauge', ('space_name', 'app_name'), 1))
+
+    def test_label_count_is_checked(self):
+        self.assertRaises(ValueError, self.registry.families['app_up'].add, ('dev',), 1)
+
+    def test_extra_labels_and_suffixes(self):
+        family = self.registry.family('latency_seconds', 'Latency', 'histogram', ('api',))
+        family.add(('apps',), 2, '_bucket', (('le', 0.5),))
+        family.add(('apps',), 0.75, '_sum')
+
+        rendered = self.registry.render()
+
+        self.assertIn('latency_seconds_bucket{api="apps", le="0.5"} 2\n', rendered)
+        self.assertIn('latency_seconds_sum{api="apps"} 0.75\n', rendered)
+
+    def test_write_streams_the_same_exposition_in_chunks(self):
+        family = self.registry.family('cpu', 'CPU', 'gauge', ('app_index',))
+        for i in range(10):
+            family.add((str(i),), i)
+
+        chunks = []
+        self.registry.write(chunks.append, chunk_lines=4)
+
+        self.assertGreater(len(chunks), 3)
+        self.assertEqual(''.join(chunks), self.registry.render())
+
+    def test_merge_appends_in_order(self):
+        other = MetricRegistry()
+        other.family('crashes_total', 'App crashes', 'counter', ('app_name',)).add(('api',), 1)
+        other.family('new_metric', 'New').add((), 5)
+
+        self.registry.merge(other)
+
+        self.assertEqual(list(self.registry.families), ['app_up', 'crashes_total', 'new_metric'])
+        self.assertEqual([s[1] for s in self.registry.families['crashes_total'].samples], [('web',), ('api',)])
+
+    def test_format_value(self):
+        self.assertEqual([format_value(v) for v in (float('nan'), float('inf'), float('-inf'), 0.1, 3, 'NaN')],
+                         ['NaN', '+Inf', '-Inf', '0.1', '3', 'NaN'])
+
+
+if __name__ == '__main__':
+    unittest.main()
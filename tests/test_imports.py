@@ -0,0 +1,38 @@
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+import subprocess
+
+import pycf
+
+CHECK = '''
+import sys
+import pycf.cloudfoundry
+import pycf.requests_api_wrapper.base as base
+import pycf.requests_api_wrapper.retry as retry
+
+assert 'requests_api_wrapper' not in sys.modules, 'requests_api_wrapper was imported as a top-level package'
+assert base.RetryPolicy is retry.RetryPolicy
+'''
+
+
+class ImportTest(unittest.TestCase):
+    def test_package_imports_from_outside_the_repo(self):
+        # only the directory holding the pycf package is importable, as for an installed copy
+        env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.dirname(os.path.abspath(pycf.__file__))))
+        cwd = tempfile.mkdtemp()
+
+        try:
+            process = subprocess.Popen([sys.executable, '-c', CHECK], cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
+            output = process.communicate()[0]
+
+        finally:
+            shutil.rmtree(cwd)
+
+        self.assertEqual(process.returncode, 0, output)
+
+
+if __name__ == '__main__':
+    unittest.main()
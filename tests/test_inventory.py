@@ -0,0 +1,172 @@
+import os
+import time
+import shutil
+import tempfile
+import threading
+import unittest
+
+from pycf import inventory as inventory_module
+from pycf.inventory import CFInventory
+from pycf.requests_api_wrapper.retry import RetryPolicy
+from pycf.utils import gather_facts
+from .fakecf import client, event, foundation, resource
+
+
+class InventoryTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = foundation()
+        self.cf = client(self.fake, retry_policy=RetryPolicy(max_retries=0))
+        self.inventory = CFInventory(self.cf).load()
+
+    def test_load_indexes_by_space_and_org(self):
+        self.assertEqual(sorted(a.name for a in self.inventory.find('apps', space_guid='sp1')), ['api', 'batch'])
+        self.assertEqual(len(self.inventory.find('apps', org_guid='org1')), 3)
+        self.assertEqual(self.inventory.get('service_instances', 'si1').name, 'cache')
+
+    def test_attached_inventory_answers_gather_facts(self):
+        expected = gather_facts(self.cf, 'spaces', params={'q': 'organization_guid IN org1'})
+        self.inventory.attach()
+        calls = len(self.fake.calls)
+
+        self.assertEqual(gather_facts(self.cf, 'spaces', params={'q': 'organization_guid IN org1'}), expected)
+        self.assertEqual(len(self.fake.calls), calls)
+
+    def test_refresh_applies_events_and_usage_events(self):
+        self.fake.add('apps', resource('app3', name='new', space_guid='sp0', state='STOPPED', instances=1))
+        self.fake.add('events', event('ev1', 'audit.app.delete-request', 'app1', timestamp='2099-01-01T00:00:00Z'))
+        self.fake.add('app_usage_events', resource('u1', app_guid='app3', state='BUILDPACK_SET'))
+        self.fake.data['apps'] = [a for a in self.fake.data['apps'] if a['metadata']['guid'] != 'app1']
+
+        self.inventory.refresh()
+
+        self.assertEqual(sorted(a.name for a in self.inventory.find('apps')), ['api', 'new', 'web'])
+        self.assertEqual(self.inventory.event_cursor, '2099-01-01T00:00:00Z')
+        self.assertEqual(self.inventory.usage_cursors['app_usage_event'], 'u1')
+
+    def test_event_cursor_follows_the_cloud_controller_clock(self):
+        # the Cloud Controller's clock is well behind ours: its events must still be picked up
+        self.fake.add('events', event('ev0', 'audit.space.create', 'sp1', actee_type='space', timestamp='2026-01-01T00:00:00Z'))
+        inventory = CFInventory(self.cf).load()
+
+        self.assertEqual(inventory.event_cursor, '2026-01-01T00:00:00Z')
+
+        self.fake.data['spaces'][0]['entity']['name'] = 'development'
+        self.fake.add('events', event('ev1', 'audit.space.update', 'sp0', actee_type='space', timestamp='2026-01-01T00:00:05Z'))
+        inventory.refresh()
+
+        self.assertEqual(inventory.get('spaces', 'sp0').name, 'development')
+        self.assertEqual(inventory.event_cursor, '2026-01-01T00:00:05Z')
+
+    def test_refresh_reloads_in_full_once_the_interval_has_passed(self):
+        self.fake.add('service_plans', resource('plan2', name='huge'))  # service plans have no events
+
+        self.inventory.refresh()
+        self.assertIsNone(self.inventory.get('service_plans', 'plan2'))
+
+        self.inventory.last_load -= inventory_module.FULL_RELOAD_INTERVAL
+        self.inventory.refresh()
+
+        self.assertEqual(self.inventory.get('service_plans', 'plan2').name, 'huge')
+
+    def test_failed_fetch_keeps_the_cursors_for_a_retry(self):
+        failures = [1]
+        self.fake.route('GET', r'/v2/apps/app3', lambda request, match: (503, {}) if failures and failures.pop() else None)
+        self.fake.add('apps', resource('app3', name='new', space_guid='sp0'))
+        self.fake.add('app_usage_events', resource('u1', app_guid='app3', state='STARTED'))
+        cursors = dict(self.inventory.usage_cursors)
+
+        self.inventory.refresh()
+
+        self.assertIsNone(self.inventory.get('apps', 'app3'))
+        self.assertEqual(self.inventory.usage_cursors, cursors)
+
+        self.inventory.refresh()
+
+        self.assertEqual(self.inventory.get('apps', 'app3').name, 'new')
+        self.assertEqual(self.inventory.usage_cursors['app_usage_event'], 'u1')
+
+    def test_unreadable_usage_events_fall_back_to_full_refreshes(self):
+        self.fake.route('GET', r'/v2/app_usage_events', lambda request, match: (403, {'code': 10003, 'description': 'not authorized'}))
+        inventory = CFInventory(self.cf).load()
+
+        self.assertIsNone(inventory.usage_cursors)
+        self.assertEqual(len(inventory.find('apps')), 3)
+
+        self.fake.add('apps', resource('app3', name='new', space_guid='sp0'))
+        inventory.refresh()
+
+        self.assertEqual(inventory.get('apps', 'app3').name, 'new')
+        self.assertIsNone(inventory.usage_cursors)
+
+    def test_refreshes_are_serialized(self):
+        lock = threading.Lock()
+        running = [0, 0]  # now, max
+
+        def slow_events(request, match):
+            with lock:
+                running[0] += 1
+                running[1] = max(running)
+
+            time.sleep(0.05)
+
+            with lock:
+                running[0] -= 1
+
+        self.fake.route('GET', r'/v2/events', slow_events)
+        threads = [threading.Thread(target=self.inventory.refresh) for _ in range(3)]
+
+        for t in threads:
+            t.start()
+
+        for t in threads:
+            t.join()
+
+        self.assertEqual(running[1], 1)
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = foundation()
+        self.cf = client(self.fake)
+        self.tmp = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp, 'inventory.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp)
+
+    def test_warm_start_serves_the_snapshot_and_catches_up(self):
+        CFInventory(self.cf).load().save(self.path)
+        self.fake.add('apps', resource('app3', name='new', space_guid='sp0'))
+        self.fake.add('app_usage_events', resource('u1', app_guid='app3', state='STARTED'))
+
+        inventory = CFInventory(self.cf).warm_start(self.path)
+        self.assertTrue(inventory.reconciled.wait(5))
+
+        self.assertEqual(inventory.get('apps', 'app3').name, 'new')
+        self.assertEqual(CFInventory(self.cf).restore(self.path).usage_cursors['app_usage_event'], 'u1')
+
+    def test_refreshes_keep_the_snapshot_current(self):
+        inventory = CFInventory(self.cf).warm_start(self.path)
+        self.assertTrue(inventory.reconciled.wait(5))
+
+        self.fake.add('apps', resource('app3', name='new', space_guid='sp0'))
+        self.fake.add('app_usage_events', resource('u1', app_guid='app3', state='STARTED'))
+        inventory.saved_at -= inventory_module.SNAPSHOT_INTERVAL
+        inventory.refresh()
+
+        self.assertEqual(CFInventory(self.cf).restore(self.path).get('apps', 'app3').name, 'new')
+
+    def test_snapshot_writes_are_rate_limited(self):
+        inventory = CFInventory(self.cf).warm_start(self.path)
+        self.assertTrue(inventory.reconciled.wait(5))
+        saved_at = inventory.saved_at
+
+        self.fake.add('app_usage_events', resource('u1', app_guid='app0', state='STARTED'))
+        inventory.refresh()
+
+        self.assertEqual(inventory.saved_at, saved_at)
+        self.assertIsNone(CFInventory(self.cf).restore(self.path).usage_cursors['app_usage_event'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import copy
+import time
+import unittest
+
+from pycf.cloudfoundry import API_SPEC, CloudFoundry
+from pycf.records import App
+from pycf.requests_api_wrapper.base import compile_api_spec
+from .fakecf import FakeCloudController, client, resource
+
+
+class IterTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeCloudController(page_size=5)
+        self.fake.add('apps', *[resource('app%02d' % i, name='app%02d' % i) for i in range(12)])
+        self.cf = client(self.fake)
+
+    def test_yields_every_resource_across_pages(self):
+        guids = [r['metadata']['guid'] for r in self.cf.apps.iter()]
+
+        self.assertEqual(guids, ['app%02d' % i for i in range(12)])
+        self.assertEqual(len(self.fake.calls), 3)
+
+    def test_requests_pages_only_as_they_are_consumed(self):
+        resources = self.cf.apps.iter()
+        self.assertEqual(self.fake.calls, [])
+
+        for _ in range(5):
+            next(resources)
+
+        self.assertEqual(len(self.fake.calls), 1)
+
+        next(resources)
+        self.assertEqual(len(self.fake.calls), 2)
+
+    def test_prefetch_requests_the_next_page_ahead(self):
+        resources = self.cf.apps.iter(prefetch=True)
+        next(resources)
+
+        deadline = time.time() + 5
+        while len(self.fake.calls) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+
+        self.assertEqual(len(self.fake.calls), 2)
+        resources.close()
+
+    def test_passes_query_params_to_every_page(self):
+        list(self.cf.apps.iter(params={'q': 'name IN app01,app07,app11', 'results-per-page': 1}))
+
+        self.assertEqual(len(self.fake.calls), 3)
+        self.assertTrue(all('q=name+IN+app01%2Capp07%2Capp11' in path for _, path in self.fake.calls))
+
+    def test_record_projection(self):
+        apps = list(self.cf.apps.iter(record=App))
+
+        self.assertEqual([a.name for a in apps][:2], ['app00', 'app01'])
+
+    def test_pages_yields_whole_pages(self):
+        self.assertEqual([len(page['resources']) for page in self.cf.apps.pages()], [5, 5, 2])
+
+    def test_spec_default_headers_are_sent_with_every_page(self):
+        spec = copy.deepcopy(API_SPEC)
+        spec['apps']['api_methods']['list']['default_headers'] = {'X-Test': 'yes'}
+        cls = type('HeaderedCloudFoundry', (CloudFoundry,), {'api_spec': spec, 'endpoints': compile_api_spec(spec)})
+        sent = []
+        self.fake.route('GET', r'/v2/apps', lambda request, match: sent.append(request.headers.get('X-Test')))
+
+        list(client(self.fake, cls=cls).apps.iter(prefetch=True))
+
+        self.assertEqual(sent, ['yes', 'yes', 'yes'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+import unittest
+
+from pycf.exceptions import CloudFoundryError
+from pycf.exposition import MetricRegistry
+from pycf.prometheus import CollectionState, collect_org_metrics, quota_metrics
+from pycf.requests_api_wrapper.retry import RetryPolicy
+from .fakecf import client, foundation, resource
+
+
+def quota(guid, total_services=-1, total_routes=-1):
+    return resource(guid, name=guid, total_services=total_services, total_routes=total_routes, total_private_domains=-1,
+                    memory_limit=-1, app_instance_limit=-1, total_service_keys=-1)
+
+
+def stats(request, match):
+    return 200, {'0': {'state': 'RUNNING', 'stats': {'usage': {'cpu': 0.5, 'mem': 25, 'disk': 10}, 'mem_quota': 100, 'disk_quota': 100}}}
+
+
+class OrgMetricsTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = foundation()
+        self.fake.add('organizations', resource('org2', name='otherorg', quota_definition_url='/v2/quota_definitions/q2'))
+        self.fake.add('spaces', resource('sp2', name='dev', organization_guid='org2'))
+        self.fake.add('apps', resource('app3', name='web', space_guid='sp2', state='STARTED', instances=1))
+        self.fake.add('service_instances', resource('si2', name='db', space_guid='sp2', service_plan_guid='plan0'))
+        self.fake.add('routes', *[resource('r%d' % i, host='r%d' % i, space_guid='sp2') for i in range(3)])
+        self.fake.add('quota_definitions', quota('q1', total_services=10, total_routes=10), quota('q2', total_services=4, total_routes=100))
+        self.fake.route('GET', r'/v2/apps/(\w+)/stats', stats)
+        self.cf = client(self.fake, retry_policy=RetryPolicy(max_retries=0))
+
+    def collect(self, orgs=None):
+        registry = MetricRegistry()
+        failed = collect_org_metrics(self.cf, registry, orgs, state=CollectionState())
+
+        return failed, registry.render()
+
+    def test_every_org_is_labelled(self):
+        failed, metrics = self.collect()
+
+        self.assertEqual(failed, [])
+        self.assertIn('cpu_utilization{org_name="myorg", space_name="dev", app_name="web", app_index="0"} 0.5', metrics)
+        self.assertIn('cpu_utilization{org_name="otherorg", space_name="dev", app_name="web", app_index="0"} 0.5', metrics)
+        self.assertIn('service_instance_status{org_name="otherorg", space_name="dev", service_instance_name="db"', metrics)
+
+    def test_lookups_are_shared_between_orgs(self):
+        self.collect()
+
+        self.assertEqual(self.fake.paths('/v2/organizations').count('/v2/organizations'), 1)
+        self.assertEqual(len(self.fake.paths('/v2/spaces')), 1)
+        self.assertEqual(len(self.fake.paths('/v2/service_plans')), 1)
+        self.assertEqual(len(self.fake.paths('/v2/service_instances?results-per-page=1')), 1)  # the counts are cached
+
+    def test_quota_usage_counts_the_whole_foundation(self):
+        metrics = self.collect()[1]
+
+        # 3 service instances and 3 routes across both orgs
+        self.assertIn('service_instance_quota_usage{org_name="myorg"} 0.3', metrics)
+        self.assertIn('service_instance_quota_usage{org_name="otherorg"} 0.75', metrics)
+        self.assertIn('routes_quota_usage{org_name="otherorg"} 0.03', metrics)
+        self.assertIn('service_instance_quota_usage 0.3', quota_metrics(self.cf, 'myorg'))
+
+    def test_event_feeds_are_read_once_per_collection(self):
+        state = CollectionState()
+        collect_org_metrics(self.cf, MetricRegistry(), state=state)
+        calls = len(self.fake.calls)
+
+        collect_org_metrics(self.cf, MetricRegistry(), state=state)
+
+        paths = [path for method, path in self.fake.calls[calls:]]
+        self.assertEqual(len([path for path in paths if path.startswith('/v2/app_usage_events')]), 1)
+        self.assertEqual(len([path for path in paths if path.startswith('/v2/events') and 'timestamp' in path]), 2)  # app and actor events
+        self.assertEqual([path for path in paths if path.startswith('/v2/apps?')], [])
+
+    def test_a_failing_org_is_left_out(self):
+        self.fake.route('GET', r'/v2/organizations/org2', lambda request, match: (500, {}))
+
+        failed, metrics = self.collect(['myorg', 'otherorg'])
+
+        self.assertEqual(failed, ['otherorg'])
+        self.assertIn('org_name="myorg"', metrics)
+        self.assertNotIn('org_name="otherorg"', metrics)
+
+    def test_raises_when_every_org_fails(self):
+        self.fake.route('GET', r'/v2/quota_definitions/\w+', lambda request, match: (500, {}))
+
+        self.assertRaises(CloudFoundryError, self.collect)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from pycf.records import App
+from pycf.requests_api_wrapper.base import ApiError
+from pycf.requests_api_wrapper.retry import RetryPolicy
+from pycf.utils import get_paginated_results, page_url
+from .fakecf import API_DOMAIN, FakeCloudController, client, resource
+
+
+class GetPaginatedResultsTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeCloudController(page_size=5)
+        self.fake.add('apps', *[resource('app%02d' % i, name='app%02d' % i) for i in range(23)])
+        self.cf = client(self.fake)
+
+    def results(self, **kwargs):
+        first = self.cf.apps.list().json()
+        return get_paginated_results(API_DOMAIN, self.cf.auth.access_token, first, api=self.cf.apps, **kwargs)
+
+    def test_returns_every_page_in_order(self):
+        guids = [r['metadata']['guid'] for r in self.results()]
+
+        self.assertEqual(guids, ['app%02d' % i for i in range(23)])
+
+    def test_fetches_each_remaining_page_once(self):
+        self.results()
+        pages = sorted(path for path in self.fake.paths('/v2/apps') if 'page=' in path)
+
+        self.assertEqual(len(pages), 4)
+        self.assertEqual(len(set(pages)), 4)
+
+    def test_sequential_fetch_matches_concurrent_one(self):
+        self.assertEqual(self.results(workers=1), self.results(workers=8))
+
+    def test_projects_resources_into_records(self):
+        records = self.results(record=App)
+
+        self.assertTrue(all(isinstance(r, App) for r in records))
+        self.assertEqual(records[-1].name, 'app22')
+
+    def test_single_page_makes_no_further_requests(self):
+        fake = FakeCloudController()
+        fake.add('apps', resource('only', name='only'))
+        cf = client(fake)
+
+        results = get_paginated_results(API_DOMAIN, cf.auth.access_token, cf.apps.list().json(), api=cf.apps)
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(len(fake.calls), 1)
+
+    def test_unicode_filters_survive_page_addressing(self):
+        self.fake.add('apps', *[resource('cafe%02d' % i, name=u'café') for i in range(12)])
+        first = self.cf.apps.list(params={'q': u'name:café'}).json()
+
+        results = get_paginated_results(API_DOMAIN, self.cf.auth.access_token, first, api=self.cf.apps)
+
+        self.assertEqual([r['metadata']['guid'] for r in results], ['cafe%02d' % i for i in range(12)])
+
+    def test_page_url_only_replaces_the_page_number(self):
+        url = u'http://cf.test/v2/apps?order-direction=asc&page=2&q=name%3Acaf%C3%A9&results-per-page=5'
+
+        self.assertEqual(page_url(url, 4), u'http://cf.test/v2/apps?order-direction=asc&page=4&q=name%3Acaf%C3%A9&results-per-page=5')
+
+    def test_failed_pages_are_retried(self):
+        failures = []
+
+        def flaky(request, match):
+            if 'page=3' in request.url and not failures:
+                failures.append(request.url)
+                return 503, {}
+
+        self.fake.route('GET', r'/v2/apps', flaky)
+        self.cf = client(self.fake, retry_policy=RetryPolicy(backoff_factor=0))
+
+        self.assertEqual(len(self.results()), 23)
+        self.assertEqual(len(failures), 1)
+
+    def test_failed_pages_raise_api_errors(self):
+        self.fake.route('GET', r'/v2/apps', lambda request, match: (403, {}) if 'page=2' in request.url else None)
+
+        with self.assertRaises(ApiError) as raised:
+            self.results()
+
+        self.assertEqual(raised.exception.status_code, 403)
+
+
+if __name__ == '__main__':
+    unittest.main()
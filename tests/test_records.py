@@ -0,0 +1,43 @@
+import unittest
+
+from pycf.records import App, ServiceInstance
+from .fakecf import FakeCloudController, client, resource
+
+
+APP = resource('g1', name='web', space_guid='s1', state='STARTED', instances=2, memory=256, disk_quota=1024, buildpack='ignored')
+
+
+class RecordTest(unittest.TestCase):
+    def test_projects_the_declared_fields(self):
+        app = App(APP)
+
+        self.assertEqual((app.guid, app.name, app.space_guid, app.instances), ('g1', 'web', 's1', 2))
+        self.assertFalse(hasattr(app, 'buildpack'))
+
+    def test_records_have_no_instance_dict(self):
+        with self.assertRaises(AttributeError):
+            App(APP).__dict__
+
+    def test_missing_paths_are_none(self):
+        instance = ServiceInstance(resource('si1', name='db'))
+
+        self.assertIsNone(instance.last_operation_state)
+        self.assertIsNone(instance.space_guid)
+
+    def test_round_trips_through_a_dict(self):
+        app = App(APP)
+        copy = App.from_dict(app.as_dict())
+
+        self.assertEqual(copy.as_dict(), app.as_dict())
+
+    def test_listings_project_into_records(self):
+        fake = FakeCloudController(page_size=1)
+        fake.add('apps', APP, resource('g2', name='worker', space_guid='s1'))
+
+        apps = list(client(fake).apps.iter(record=App))
+
+        self.assertEqual([a.name for a in apps], ['web', 'worker'])
+
+
+if __name__ == '__main__':
+    unittest.main()
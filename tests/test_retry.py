@@ -0,0 +1,120 @@
+import time
+import unittest
+
+import requests
+
+from pycf.requests_api_wrapper.base import ApiError
+from pycf.requests_api_wrapper.retry import RetryPolicy
+from .fakecf import FakeCloudController, client, resource
+
+
+def answers(*responses):
+    # a route handler giving the responses in turn, the last one repeating
+    responses = list(responses)
+
+    def handler(request, match):
+        answer = responses.pop(0) if len(responses) > 1 else responses[0]
+
+        if isinstance(answer, Exception):
+            raise answer
+
+        return answer
+
+    return handler
+
+
+class RetryTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeCloudController()
+        self.fake.add('apps', resource('a', name='a'))
+        self.policy = RetryPolicy(max_retries=3, backoff_factor=0)
+        self.cf = client(self.fake, retry_policy=self.policy)
+
+    def test_transient_status_is_retried(self):
+        self.fake.route('GET', r'/v2/apps/a', answers((503, {}), (502, {}), None))
+
+        response = self.cf.apps.get('a')
+
+        self.assertEqual(response.retries, 2)
+        self.assertEqual(len(self.fake.calls), 3)
+        self.assertEqual(self.policy.stats(), {'calls': 1, 'retries': 2, 'failures': 0})
+
+    def test_gives_up_after_max_retries(self):
+        self.fake.route('GET', r'/v2/apps/a', answers((503, {})))
+
+        with self.assertRaises(ApiError) as raised:
+            self.cf.apps.get('a')
+
+        self.assertEqual(raised.exception.status_code, 503)
+        self.assertEqual(len(self.fake.calls), 4)
+        self.assertEqual(self.policy.failures, 1)
+
+    def test_client_errors_are_not_retried(self):
+        with self.assertRaises(ApiError) as raised:
+            self.cf.apps.get('missing')
+
+        self.assertEqual(raised.exception.status_code, 404)
+        self.assertEqual(len(self.fake.calls), 1)
+
+    def test_non_idempotent_methods_are_not_retried(self):
+        self.fake.route('POST', r'/v2/apps', answers((503, {})))
+
+        with self.assertRaises(ApiError):
+            self.cf.apps.create(data={'name': 'new'})
+
+        self.assertEqual(len(self.fake.calls), 1)
+
+    def test_connection_errors_are_retried(self):
+        self.fake.route('GET', r'/v2/apps/a', answers(requests.exceptions.ConnectionError('reset'), None))
+
+        self.assertEqual(self.cf.apps.get('a').retries, 1)
+
+    def test_any_2xx_is_success(self):
+        # async deletes answer 202 although the spec expects 204
+        self.fake.route('DELETE', r'/v2/apps/a', answers((202, {'entity': {'status': 'queued'}})))
+
+        response = self.cf.apps.remove('a')
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(self.policy.failures, 0)
+
+    def test_deadline_caps_each_attempt_timeout(self):
+        self.cf.apps.get('a', timeout=30, deadline=5)
+        self.cf.apps.get('a', timeout=2, deadline=5)
+
+        self.assertTrue(4 < self.fake.timeouts[0] <= 5)
+        self.assertEqual(self.fake.timeouts[1], 2)
+
+    def test_deadline_stops_the_retries(self):
+        self.fake.route('GET', r'/v2/apps/a', answers((503, {})))
+        cf = client(self.fake, retry_policy=RetryPolicy(max_retries=10, backoff_factor=0.2, max_backoff=0.2))
+        started = time.time()
+
+        with self.assertRaises(ApiError) as raised:
+            cf.apps.get('a', deadline=0.5)
+
+        self.assertEqual(raised.exception.status_code, 503)
+        self.assertLess(time.time() - started, 0.5)
+        self.assertLess(len(self.fake.calls), 11)
+
+    def test_deadline_reraises_the_last_transport_error(self):
+        self.fake.route('GET', r'/v2/apps/a', answers(requests.exceptions.ConnectionError('reset')))
+        cf = client(self.fake, retry_policy=RetryPolicy(max_retries=10, backoff_factor=0.2, max_backoff=0.2))
+
+        self.assertRaises(requests.exceptions.ConnectionError, cf.apps.get, 'a', deadline=0.5)
+
+    def test_backoff_honours_retry_after(self):
+        response = requests.models.Response()
+        response.headers['Retry-After'] = '7'
+
+        self.assertEqual(RetryPolicy(max_backoff=30).backoff(0, response), 7)
+        self.assertEqual(RetryPolicy(max_backoff=5).backoff(0, response), 5)
+
+    def test_backoff_is_capped(self):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=2)
+
+        self.assertTrue(all(0 <= policy.backoff(10) <= 2 for _ in range(50)))
+
+
+if __name__ == '__main__':
+    unittest.main()
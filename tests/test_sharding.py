@@ -0,0 +1,215 @@
+import time
+import unittest
+
+from pycf import app_state, prometheus
+from pycf.prometheus import CollectionState, app_metrics, quota_metrics
+from pycf.requests_api_wrapper.retry import RetryPolicy
+from pycf.attribution import ACTEE_BATCH_SIZE
+from pycf.sharding import ExporterShard, HashRing
+from .fakecf import client, foundation, resource
+
+
+class FakeRedis(object):
+    # the sorted set commands ExporterShard uses
+    def __init__(self):
+        self.sets = {}
+        self.down = False
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+    def zadd(self, key, mapping):
+        self._check()
+        self.sets.setdefault(key, {}).update(mapping)
+
+    def zremrangebyscore(self, key, low, high):
+        self._check()
+        zset = self.sets.get(key, {})
+
+        for member, score in list(zset.items()):
+            if score <= high:
+                del zset[member]
+
+    def zrange(self, key, start, end):
+        self._check()
+        return sorted(self.sets.get(key, {}), key=self.sets.get(key, {}).get)
+
+    def zrem(self, key, member):
+        self._check()
+        self.sets.get(key, {}).pop(member, None)
+
+    def _check(self):
+        if self.down:
+            raise IOError('connection refused')
+
+
+class FakePipeline(object):
+    def __init__(self, db):
+        self.db = db
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((name, args))
+
+    def execute(self):
+        return [getattr(self.db, name)(*args) for name, args in self.commands]
+
+
+def stats(request, match):
+    return 200, {'0': {'state': 'RUNNING', 'stats': {'usage': {'cpu': 0.5, 'mem': 25, 'disk': 10}, 'mem_quota': 100, 'disk_quota': 100}}}
+
+
+class HashRingTest(unittest.TestCase):
+    def test_a_leaving_member_only_moves_its_own_keys(self):
+        keys = ['space%d' % i for i in range(500)]
+        before = HashRing(['a', 'b', 'c'])
+        after = HashRing(['a', 'b'])
+
+        moved = [k for k in keys if before.owner(k) != after.owner(k)]
+
+        self.assertTrue(moved)
+        self.assertTrue(all(before.owner(k) == 'c' for k in moved))
+
+    def test_keys_are_spread_over_the_members(self):
+        ring = HashRing(['a', 'b', 'c'])
+        owners = [ring.owner('space%d' % i) for i in range(300)]
+
+        self.assertTrue(all(60 < owners.count(m) < 140 for m in 'abc'))
+
+
+class ExporterShardTest(unittest.TestCase):
+    def setUp(self):
+        self.db = FakeRedis()
+        self.a = ExporterShard(self.db, replica_id='a')
+        self.b = ExporterShard(self.db, replica_id='b')
+
+    def test_replicas_split_the_keys(self):
+        self.a.heartbeat()
+        self.b.heartbeat()
+        self.a.heartbeat()
+        keys = ['space%d' % i for i in range(100)]
+
+        self.assertEqual(self.a.ring.members, frozenset(['a', 'b']))
+        self.assertTrue(all(self.a.owns(k) != self.b.owns(k) for k in keys))
+
+    def test_silent_replicas_drop_out(self):
+        self.b.heartbeat()
+        self.db.sets[self.b.key]['b'] -= self.b.ttl + 1
+
+        self.assertEqual(self.a.heartbeat().members, frozenset(['a']))
+
+    def test_leaving_replicas_drop_out_at_once(self):
+        self.b.heartbeat()
+        self.b.stop()
+
+        self.assertEqual(self.a.heartbeat().members, frozenset(['a']))
+
+    def test_keeps_the_ring_while_redis_is_down(self):
+        self.b.heartbeat()
+        ring = self.a.heartbeat()
+        self.db.down = True
+
+        self.assertIs(self.a.heartbeat(), ring)
+
+    def test_stops_while_redis_is_down(self):
+        self.b.heartbeat()
+        self.db.down = True
+
+        self.b.stop()
+
+        self.db.down = False
+        self.assertIn('b', self.db.sets[self.b.key])  # left for the ttl to drop
+
+    def test_keepalive_announces_between_heartbeats(self):
+        self.b.heartbeat()
+        announced = self.db.sets[self.b.key]['b']
+        self.b.start(interval=0.01)
+
+        try:
+            time.sleep(0.1)
+            self.assertGreater(self.db.sets[self.b.key]['b'], announced)
+
+        finally:
+            self.b.stop()
+
+        self.assertNotIn('b', self.db.sets[self.b.key])
+
+
+class ShardedCollectionTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = foundation()
+        for i in range(2, 12):
+            self.fake.add('spaces', resource('sp%d' % i, name='space%d' % i, organization_guid='org1'))
+            self.fake.add('apps', resource('app%d' % (i + 1), name='app%d' % (i + 1), space_guid='sp%d' % i, state='STOPPED', instances=0))
+
+        self.fake.add('quota_definitions', resource('q1', total_services=10, total_routes=-1, total_private_domains=-1, memory_limit=-1, app_instance_limit=-1, total_service_keys=-1))
+        self.fake.route('GET', r'/v2/apps/(\w+)/stats', stats)
+        self.cf = client(self.fake, retry_policy=RetryPolicy(max_retries=0))
+
+        db = FakeRedis()
+        self.shards = [ExporterShard(db, replica_id=r) for r in ('a', 'b')]
+        for shard in self.shards + self.shards:
+            shard.heartbeat()
+
+    def app_names(self, metrics):
+        return set(line.split('app_name="')[1].split('"')[0] for line in metrics.splitlines() if line.startswith('application_status{'))
+
+    def test_each_replica_lists_only_its_spaces(self):
+        names = []
+
+        for shard in self.shards:
+            del self.fake.calls[:]
+            names.append(self.app_names(app_metrics(self.cf, 'myorg', state=CollectionState(shard))))
+            owned = set('sp%d' % i for i in range(12) if shard.owns('sp%d' % i))
+
+            for path in self.fake.paths('/v2/apps?') + self.fake.paths('/v2/service_instances?'):
+                self.assertIn('space_guid+IN', path)
+                self.assertEqual(set(path.split('space_guid+IN+')[1].split('&')[0].split('%2C')), owned)
+
+        self.assertEqual(names[0] & names[1], set())
+        self.assertEqual(names[0] | names[1], self.app_names(app_metrics(self.cf, 'myorg')))
+
+    def test_space_and_instance_filters_are_batched(self):
+        for i in range(2, 12):
+            self.fake.add('service_instances', resource('si%d' % i, created_at='2026-01-01T00:00:00Z', name='svc%d' % i, space_guid='sp%d' % i, service_plan_guid='plan0'))
+            self.fake.add('service_bindings', resource('sb%d' % i, app_guid='app%d' % (i + 1), service_instance_guid='si%d' % i))
+
+        def series(metrics):
+            return sorted(line for line in metrics.splitlines() if line.startswith(('application_status{', 'service_instance_status{')))
+
+        shard = self.shards[0]
+        expected = series(app_metrics(self.cf, 'myorg', state=CollectionState(shard)))
+        del self.fake.calls[:]
+        app_state.ACTEE_BATCH_SIZE = prometheus.ACTEE_BATCH_SIZE = 2
+
+        try:
+            metrics = app_metrics(self.cf, 'myorg', state=CollectionState(shard))
+
+        finally:
+            app_state.ACTEE_BATCH_SIZE = prometheus.ACTEE_BATCH_SIZE = ACTEE_BATCH_SIZE
+
+        self.assertEqual(series(metrics), expected)
+        paths = self.fake.paths('/v2/apps?') + self.fake.paths('/v2/service_instances?') + self.fake.paths('/v2/service_bindings?')
+        self.assertGreater(len(paths), 3)
+
+        for path in paths:
+            self.assertLessEqual(len(path.split('+IN+')[1].split('&')[0].split('%2C')), 2)
+
+    def test_a_replica_without_spaces_lists_nothing(self):
+        shard = ExporterShard(FakeRedis(), replica_id='c')
+        shard.owns = lambda key: False
+        del self.fake.calls[:]
+
+        metrics = app_metrics(self.cf, 'myorg', state=CollectionState(shard))
+
+        self.assertEqual(self.app_names(metrics), set())
+        self.assertEqual(self.fake.paths('/v2/apps?') + self.fake.paths('/v2/service_instances?') + self.fake.paths('/v2/service_bindings'), [])
+
+    def test_one_replica_reports_the_org_quota(self):
+        reports = ['service_instance_quota_usage' in quota_metrics(self.cf, 'myorg', state=CollectionState(shard)) for shard in self.shards]
+
+        self.assertEqual(sorted(reports), [False, True])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import time
+import threading
+import unittest
+
+from pycf.requests_api_wrapper.singleflight import SingleFlight
+from .fakecf import FakeCloudController, client, resource
+
+
+def concurrently(n, func):
+    results = [None] * n
+    errors = [None] * n
+
+    def run(i):
+        try:
+            results[i] = func()
+
+        except Exception as e:
+            errors[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(n)]
+
+    for t in threads:
+        t.start()
+
+    for t in threads:
+        t.join()
+
+    return results, errors
+
+
+class SingleFlightTest(unittest.TestCase):
+    def test_concurrent_callers_share_one_call(self):
+        flight = SingleFlight()
+        runs = []
+
+        def slow():
+            runs.append(1)
+            time.sleep(0.1)
+            return 'result'
+
+        results, _ = concurrently(5, lambda: flight.do('key', slow))
+
+        self.assertEqual(results, ['result'] * 5)
+        self.assertEqual(len(runs), 1)
+        self.assertEqual(flight.stats(), {'calls': 5, 'shared': 4})
+
+    def test_errors_are_shared_too(self):
+        flight = SingleFlight()
+
+        def failing():
+            time.sleep(0.1)
+            raise ValueError('boom')
+
+        _, errors = concurrently(3, lambda: flight.do('key', failing))
+
+        self.assertTrue(all(isinstance(e, ValueError) for e in errors))
+
+    def test_later_calls_run_again(self):
+        flight = SingleFlight()
+        runs = []
+
+        flight.do('key', lambda: runs.append(1))
+        flight.do('key', lambda: runs.append(1))
+
+        self.assertEqual(len(runs), 2)
+
+    def test_identical_client_gets_are_coalesced(self):
+        fake = FakeCloudController()
+        fake.add('apps', resource('a', name='a'))
+        fake.route('GET', r'/v2/apps/a', lambda request, match: time.sleep(0.1))
+        cf = client(fake)
+
+        results, _ = concurrently(4, lambda: cf.apps.get('a'))
+
+        self.assertEqual(len(fake.calls), 1)
+        self.assertTrue(all(r.json()['entity']['name'] == 'a' for r in results))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+from pycf.prometheus import CollectionState, app_metrics
+from pycf.requests_api_wrapper.retry import RetryPolicy
+from pycf.stats import AppStatsCollector
+from .fakecf import client, foundation
+
+
+def stats(request, match):
+    if match.group(1) == 'app2':
+        return 500, {'code': 10001, 'description': 'boom'}
+
+    return 200, {'0': {'state': 'RUNNING', 'stats': {'usage': {'cpu': 0.5, 'mem': 25, 'disk': 10}, 'mem_quota': 100, 'disk_quota': 100}}}
+
+
+class AppStatsCollectorTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = foundation()
+        self.fake.route('GET', r'/v2/apps/(\w+)/stats', stats)
+        self.cf = client(self.fake, retry_policy=RetryPolicy(max_retries=0))
+
+    def test_failed_calls_map_to_none_and_are_counted(self):
+        collector = AppStatsCollector()
+
+        result = collector.collect(self.cf, ['app0', 'app2'], 'org1')
+
+        self.assertEqual(result['app0']['0']['stats']['usage']['cpu'], 0.5)
+        self.assertIsNone(result['app2'])
+        self.assertEqual(collector.failures['org1'], 1)
+
+    def test_every_call_gets_the_deadline(self):
+        AppStatsCollector(timeout=3).collect(self.cf, ['app0', 'app2'])
+
+        self.assertTrue(all(0 < t <= 3 for t in self.fake.timeouts))
+
+    def test_failed_app_gets_nan_samples_and_failures_accumulate(self):
+        state = CollectionState()
+        app_metrics(self.cf, 'myorg', state=state)
+
+        metrics = app_metrics(self.cf, 'myorg', state=state)
+
+        self.assertIn('cpu_utilization{space_name="prod", app_name="api", app_index="0"} NaN', metrics)
+        self.assertIn('mem_utilization{space_name="dev", app_name="web", app_index="0"} 0.25', metrics)
+        self.assertIn('app_stats_failures_total 2', metrics)
+
+
+if __name__ == '__main__':
+    unittest.main()
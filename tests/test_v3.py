@@ -0,0 +1,105 @@
+import unittest
+
+from pycf.cloudfoundry import CloudFoundryV3, included_resources
+from pycf.requests_api_wrapper.base import encode_query
+from pycf.utils import get_paginated_results
+from .fakecf import API_DOMAIN, FakeCloudController, client
+
+try:
+    from urlparse import parse_qs, urlsplit
+
+except ImportError:
+    from urllib.parse import parse_qs, urlsplit
+
+
+def v3_apps(count, per_page):
+    # a v3 /v3/apps listing of count apps, each in space 'sp<i % 2>', sideloading the spaces when include=space
+    def handler(request, match):
+        query = dict((k, v[0]) for k, v in parse_qs(urlsplit(request.url).query).items())
+        size = min(int(query.get('per_page', per_page)), per_page)
+        page = int(query.get('page', 1))
+        pages = max(1, (count + size - 1) // size)
+        apps = [{'guid': 'app%02d' % i, 'name': 'app%02d' % i, 'relationships': {'space': {'data': {'guid': 'sp%d' % (i % 2)}}}}
+                for i in range(count)][(page - 1) * size:page * size]
+
+        body = {
+            'pagination': {
+                'total_results': count,
+                'total_pages': pages,
+                'next': {'href': '{}/v3/apps?page={}&per_page={}'.format(API_DOMAIN, page + 1, size)} if page < pages else None
+            },
+            'resources': apps
+        }
+
+        if query.get('include') == 'space':
+            body['included'] = {'spaces': [{'guid': 'sp0', 'name': 'dev'}, {'guid': 'sp1', 'name': 'prod'}]}
+
+        return 200, body
+
+    return handler
+
+
+class QueryKwargsTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeCloudController()
+        self.fake.route('GET', r'/v3/apps', v3_apps(3, 50))
+        self.cf = client(self.fake, cls=CloudFoundryV3)
+
+    def query(self):
+        return parse_qs(self.fake.paths('/v3/apps')[-1].split('?', 1)[1])
+
+    def test_encode_query(self):
+        self.assertEqual(encode_query('names', ['a', 'b']), [('names', 'a,b')])
+        self.assertEqual(encode_query('fields', {'space': ['name', 'guid'], 'org': ['name']}),
+                         [('fields[org]', 'name'), ('fields[space]', 'name,guid')])
+        self.assertEqual(encode_query('per_page', 10), [('per_page', '10')])
+
+    def test_list_sends_query_kwargs_and_the_default_page_size(self):
+        self.cf.apps.list(include='space', fields={'space': ['name']}, space_guids=['sp0', 'sp1'])
+
+        self.assertEqual(self.query(), {'include': ['space'], 'fields[space]': ['name'], 'space_guids': ['sp0,sp1'], 'per_page': ['5000']})
+
+    def test_query_kwargs_merge_with_params(self):
+        self.cf.apps.list(params={'order_by': 'name'}, per_page=2)
+
+        self.assertEqual(self.query(), {'order_by': ['name'], 'per_page': ['2']})
+
+    def test_unknown_keyword_is_rejected(self):
+        self.assertRaises(TypeError, self.cf.apps.list, stack='cflinuxfs4')
+
+    def test_included_resources_are_indexed_by_guid(self):
+        page = self.cf.apps.list(include='space').json()
+
+        spaces = included_resources(page, 'spaces')
+
+        self.assertEqual(dict((guid, s['name']) for guid, s in spaces.items()), {'sp0': 'dev', 'sp1': 'prod'})
+        self.assertEqual(included_resources(page, 'organizations'), {})
+
+
+class V3PaginationTest(unittest.TestCase):
+    def setUp(self):
+        self.fake = FakeCloudController()
+        self.fake.route('GET', r'/v3/apps', v3_apps(23, 5))
+        self.cf = client(self.fake, cls=CloudFoundryV3)
+
+    def test_iter_follows_pagination_next(self):
+        guids = [app['guid'] for app in self.cf.apps.iter(prefetch=True)]
+
+        self.assertEqual(guids, ['app%02d' % i for i in range(23)])
+        self.assertEqual(len(self.fake.paths('/v3/apps')), 5)
+
+    def test_count_reads_total_results(self):
+        self.assertEqual(self.cf.apps.count(), 23)
+        self.assertIn('per_page=1', self.fake.paths('/v3/apps')[-1])
+
+    def test_get_paginated_results_fetches_the_remaining_pages(self):
+        first = self.cf.apps.list().json()
+
+        results = get_paginated_results(API_DOMAIN, self.cf.auth.access_token, first, api=self.cf.apps)
+
+        self.assertEqual([app['guid'] for app in results], ['app%02d' % i for i in range(23)])
+        self.assertEqual(len(self.fake.paths('/v3/apps')), 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
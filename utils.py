@@ -7,11 +7,17 @@ import subprocess
 import SimpleHTTPServer
 import SocketServer
 from time import sleep
+from multiprocessing.pool import ThreadPool
 from requests import get
 from datetime import datetime, timedelta
 from pycf.exceptions import CloudFoundryError
+from pycf.requests_api_wrapper.base import ApiError, next_page_url, page_number, page_url, total_pages as page_count
 #from jinja2 import Template
 
+TIMESTAMP_FORMAT = '%Y-%m-%dT%H:%M:%SZ'  # how the Cloud Controller writes timestamps
+RESULTS_PER_PAGE = 100  # the v2 maximum
+EARLIEST_TIMESTAMP = '1970-01-01T00:00:00Z'  # an event cursor that precedes every event
+
 
 def write_stdout(s):
     sys.stdout.write(s + '\n')
@@ -20,13 +26,13 @@ def write_stdout(s):
 
 def utc_to_epoch(ts):
     epoch_time = datetime(1970, 1, 1)
-    utc_time = datetime.strptime(ts, "%Y-%m-%dT%H:%M:%SZ")
+    utc_time = datetime.strptime(ts, TIMESTAMP_FORMAT)
     return (utc_time - epoch_time).total_seconds()
 
 
 def epoch_to_utc(s):
     epoch_time = datetime(1970, 1, 1)
-    return datetime.strftime(epoch_time + timedelta(seconds=int(s)), "%Y-%m-%dT%H:%M:%SZ")
+    return datetime.strftime(epoch_time + timedelta(seconds=int(s)), TIMESTAMP_FORMAT)
 
 
 def get_service_credentials(retries=5, interval=15):
@@ -125,27 +131,85 @@ def dictionary_dot_lookup(d, dot_string):
     return r
 
 
-def get_paginated_results(api_domain, auth_token, current_page):
+PAGINATION_WORKERS = 8
+
+
+def latest_event_timestamp(cf, q=None):
+    # the timestamp of the newest audit event (matching q), to start an event cursor on the Cloud Controller's
+    # clock rather than ours; EARLIEST_TIMESTAMP when there are none
+    params = {'order-by': 'timestamp', 'order-direction': 'desc', 'results-per-page': 1}
+
+    if q:
+        params['q'] = q
+
+    resources = cf.events.list(params=params).json()['resources']
+
+    return resources[0]['entity']['timestamp'] if resources else EARLIEST_TIMESTAMP
+
+
+def get_paginated_results(api_domain, auth_token, current_page, workers=PAGINATION_WORKERS, api=None, record=None):
     headers = {
         'Authorization': auth_token
     }
 
-    results = current_page['resources']
-    total_pages = current_page['total_pages']
+    # projecting each page into records as it arrives lets the full page dicts be freed straight away
+    project = (lambda resources: [record(r) for r in resources]) if record else list
+
+    results = project(current_page['resources'])  # a copy: the page may be memoized on a (cached) response
+    total_pages = page_count(current_page)
+    next_url = next_page_url(api_domain, current_page)  # v2 and v3 pages link to the next one differently
+
+    if total_pages <= 1 or not next_url:
+        return results
+
+    # every remaining page can be addressed directly once the first page tells us how many there are
+    urls = [page_url(next_url, page) for page in range(page_number(next_url), total_pages + 1)]
+
+    def fetch_page(url):
+        if api is not None:  # the api object the first page came from: its status checks, retries and session adapters apply
+            return project(api._get_page(url, headers, 'list')['resources'])
+
+        response = get(url, headers=headers)
 
-    while total_pages > 1:
-        current_page = get(api_domain + current_page['next_url'], headers=headers).json()
-        results.extend(current_page['resources'])
-        total_pages -= 1
+        if not 200 <= response.status_code < 300:
+            raise ApiError(response)
+
+        return project(response.json()['resources'])
+
+    if workers > 1 and len(urls) > 1:
+        pool = ThreadPool(min(workers, len(urls)))
+
+        try:
+            pages = pool.map(fetch_page, urls)  # map() preserves page order
+
+        finally:
+            pool.close()
+            pool.join()
+
+    else:
+        pages = map(fetch_page, urls)
+
+    for page in pages:
+        results.extend(page)
 
     return results
 
 
 def gather_facts(cf, api, mapping_schema='entity.name:metadata.guid', params=None):
+    inventory = getattr(cf, 'inventory', None)
+
+    if inventory is not None:
+        facts = inventory.facts(api, mapping_schema, params)
+
+        if facts is not None:
+            return facts
+
     nlookup, glookup = mapping_schema.split(':')
 
+    api_object = getattr(cf, api)
+
     resources = {}
-    for resource in get_paginated_results(cf.api_domain, cf.auth.access_token, getattr(cf, api).list(params=params).json()):
+    for resource in get_paginated_results(cf.api_domain, cf.auth.access_token, api_object.list(params=params).json(), api=api_object):
         l = dictionary_dot_lookup(resource, nlookup)
         r = dictionary_dot_lookup(resource, glookup)
 
@@ -168,7 +232,7 @@ def gather_facts(cf, api, mapping_schema='entity.name:metadata.guid', params=Non
 
 def serve_endpoint(component):
     write_stdout("Preparing to serve data for {} on port {}...".format(component, os.environ['PORT']))
-    SocketServer.TCPServer(('0.0.0.0', int(os.environ['PORT'])), SimpleHTTPServer.SimpleHTTPRequestHandler).serve_forever()
+    SocketServer.ThreadingTCPServer(('0.0.0.0', int(os.environ['PORT'])), SimpleHTTPServer.SimpleHTTPRequestHandler).serve_forever()
 
 
 def wait_on_service_creation(cf, service_guid):